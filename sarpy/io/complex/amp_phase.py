@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Encoding and decoding of `AMP8I_PHS8I` SICD pixel data. Each pixel is stored as
+an unsigned 8-bit amplitude code, which is mapped to amplitude by the amplitude
+lookup table (the SICD `ImageData.AmpTable`), followed by an unsigned 8-bit phase
+code :math:`p` representing the phase :math:`2\\pi p/256`.
+
+Decoding uses a precomputed table of the complex value for each of the
+:math:`2^{16}` (amplitude, phase) code pairs, so conversion is a single gather
+with no trigonometry. Encoding determines the nearest amplitude code and phase
+code. Both operate on blocks of rows, so that intermediate memory use is bounded,
+and both may write into a provided output array.
+
+Examples
+--------
+.. code-block:: python
+
+    from sarpy.io.complex.amp_phase import AmpPhaseCodec
+
+    codec = AmpPhaseCodec(reader.sicd_meta.ImageData.AmpTable)
+    raw_data = reader.read_chip((0, 4096), (0, 4096), raw=True)
+    complex_data = codec.decode(raw_data)
+    codes = codec.encode(complex_data)
+"""
+
+import sys
+
+import numpy
+
+__classification__ = "UNCLASSIFIED"
+__author__ = "Thomas McCullough"
+
+
+# the number of pixels processed at once, which bounds the temporary memory
+_BLOCK_PIXELS = 2**20
+# the maximum number of bins of the amplitude search grid
+_MAX_GRID_BINS = 2**16
+
+
+def _validate_lookup(lookup_table):
+    """
+    Validates the amplitude lookup table.
+
+    Parameters
+    ----------
+    lookup_table : None|numpy.ndarray|list|tuple
+        The 256 element lookup table. If `None`, then the amplitude is the
+        amplitude code itself.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+
+    if lookup_table is None:
+        return numpy.arange(256, dtype=numpy.float64)
+    if isinstance(lookup_table, (list, tuple)):
+        lookup_table = numpy.array(lookup_table, dtype=numpy.float64)
+    if not isinstance(lookup_table, numpy.ndarray):
+        raise ValueError('requires a numpy.ndarray, got {}'.format(type(lookup_table)))
+    if lookup_table.dtype.name != 'float64':
+        raise ValueError('requires a numpy.ndarray of float64 dtype, got {}'.format(lookup_table.dtype))
+    if lookup_table.shape != (256, ):
+        raise ValueError('Requires a one-dimensional numpy.ndarray with 256 elements, '
+                         'got shape {}'.format(lookup_table.shape))
+    if not numpy.all(numpy.isfinite(lookup_table)):
+        raise ValueError('The amplitude lookup table must contain only finite values')
+    return lookup_table
+
+
+def _get_search_grid(boundaries):
+    """
+    Constructs a uniform grid for finding the position of values among the given
+    increasing boundaries, which is much faster than bisection for large arrays.
+    The number of bins is increased until each bin (extended by one bin on the
+    lower side, to allow for rounding) contains at most one boundary, if possible.
+
+    Parameters
+    ----------
+    boundaries : numpy.ndarray
+
+    Returns
+    -------
+    None|(float, numpy.ndarray, int)
+        The scale, the number of boundaries below the lower edge of the preceding
+        bin for each bin, and the number of correction steps. `None` if no useful
+        grid is possible.
+    """
+
+    upper = boundaries[-1]
+    if not upper > 0:
+        return None
+    bins = 2**10
+    while True:
+        scale = bins/upper
+        counts = numpy.searchsorted(boundaries, numpy.arange(-1, bins + 2)/scale, side='left')
+        steps = int(numpy.max(counts[2:] - counts[:-2]))
+        if steps <= 1 or bins >= _MAX_GRID_BINS:
+            break
+        bins *= 2
+    if steps > 4:
+        return None
+    return scale, counts[:-2].astype(numpy.uint16), steps
+
+
+def _get_block_rows(shape):
+    """
+    Gets the number of rows of the given shape processed at once.
+
+    Parameters
+    ----------
+    shape : tuple
+
+    Returns
+    -------
+    int
+    """
+
+    row_pixels = int(numpy.prod(shape[1:], dtype=numpy.int64))
+    return max(1, _BLOCK_PIXELS//max(row_pixels, 1))
+
+
+class AmpPhaseCodec(object):
+    """
+    Converts between `AMP8I_PHS8I` data and complex data, for the given amplitude
+    lookup table. Instances are immutable, and may be shared between threads or
+    pickled.
+    """
+
+    __slots__ = ('_amplitude_table', '_decode_table', '_midpoints', '_order', '_grid')
+
+    def __init__(self, lookup_table=None):
+        """
+
+        Parameters
+        ----------
+        lookup_table : None|numpy.ndarray
+            The 256 element amplitude lookup table. If `None`, then the amplitude
+            is given by the amplitude code itself.
+        """
+
+        self._amplitude_table = _validate_lookup(lookup_table)
+
+        # the decode table is indexed by amplitude_code + 256*phase_code, which is
+        #   the value of the little endian uint16 view of each pixel
+        phase = numpy.exp((2j*numpy.pi/256)*numpy.arange(256))
+        self._decode_table = numpy.outer(phase, self._amplitude_table).astype(numpy.complex64).ravel()
+
+        # the nearest amplitude code is found by searching the table midpoints
+        if numpy.all(numpy.diff(self._amplitude_table) >= 0):
+            self._order = None
+            values = self._amplitude_table
+        else:
+            self._order = numpy.argsort(self._amplitude_table, kind='mergesort').astype(numpy.uint8)
+            values = self._amplitude_table[self._order]
+        self._midpoints = 0.5*(values[:-1] + values[1:])
+        self._grid = _get_search_grid(self._midpoints)
+
+    @property
+    def amplitude_table(self):
+        """
+        numpy.ndarray: The amplitude lookup table.
+        """
+
+        return self._amplitude_table.copy()
+
+    def __getstate__(self):
+        # the derived tables are simply recomputed
+        return {'lookup_table': self._amplitude_table}
+
+    def __setstate__(self, state):
+        self.__init__(state['lookup_table'])
+
+    def _get_amplitude_codes(self, amplitude):
+        """
+        Gets the nearest amplitude code for each amplitude.
+
+        Parameters
+        ----------
+        amplitude : numpy.ndarray
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        if self._grid is None:
+            codes = numpy.searchsorted(self._midpoints, amplitude)
+        else:
+            # start from a lower bound for the position, given by the grid bin
+            scale, starts, steps = self._grid
+            bins = amplitude*scale
+            numpy.minimum(bins, starts.size - 1, out=bins)
+            bins = bins.astype(numpy.intp)
+            numpy.clip(bins, 0, starts.size - 1, out=bins)
+            codes = starts[bins]
+            boundaries = numpy.append(self._midpoints, numpy.inf)
+            for _ in range(steps):
+                codes += boundaries[codes] < amplitude
+        if self._order is not None:
+            codes = self._order[codes]
+        return codes
+
+    def _get_codes(self, block):
+        """
+        Gets the combined uint16 codes for the block of raw data.
+
+        Parameters
+        ----------
+        block : numpy.ndarray
+            uint8 data with (amplitude, phase) pairs in the final dimension.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        if sys.byteorder == 'little':
+            try:
+                return block.view(numpy.uint16)
+            except ValueError:
+                # the final dimension is not contiguous
+                pass
+        codes = block[..., 1::2].astype(numpy.uint16)
+        codes <<= 8
+        codes |= block[..., 0::2]
+        return codes
+
+    def decode(self, data, out=None):
+        """
+        Converts `AMP8I_PHS8I` data to complex64 data.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            uint8 data of shape `(rows, columns, 2*bands)`, with amplitude and
+            phase codes in adjacent bands, as read by :code:`read_chip(..., raw=True)`.
+        out : None|numpy.ndarray
+            If provided, the complex64 array of shape `(rows, columns, bands)`
+            into which the result is written.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        if not isinstance(data, numpy.ndarray):
+            raise ValueError('requires a numpy.ndarray, got {}'.format(type(data)))
+        if data.dtype.name != 'uint8':
+            raise ValueError('requires a numpy.ndarray of uint8 dtype, got {}'.format(data.dtype.name))
+        if data.ndim != 3 or data.shape[2] % 2 != 0:
+            raise ValueError(
+                'Requires a three-dimensional numpy.ndarray with an even number of bands '
+                'in the final dimension, got shape {}'.format(data.shape))
+
+        shape = data.shape[:2] + (data.shape[2]//2, )
+        if out is None:
+            out = numpy.empty(shape, dtype=numpy.complex64)
+        elif not isinstance(out, numpy.ndarray) or out.shape != shape or out.dtype.name != 'complex64':
+            raise ValueError(
+                'out must be a complex64 numpy.ndarray of shape {}, got {}'.format(
+                    shape, getattr(out, 'shape', type(out))))
+
+        block_rows = _get_block_rows(shape)
+        for start in range(0, shape[0], block_rows):
+            stop = min(start + block_rows, shape[0])
+            codes = self._get_codes(data[start:stop])
+            if out.flags.c_contiguous:
+                # the codes are always within the table, so there is no need to check
+                numpy.take(self._decode_table, codes, out=out[start:stop], mode='clip')
+            else:
+                out[start:stop] = self._decode_table[codes]
+        return out
+
+    def encode(self, data, out=None):
+        """
+        Converts complex data to `AMP8I_PHS8I` data, using the nearest amplitude
+        code and the nearest phase code.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            The complex data of shape `(rows, columns)`.
+        out : None|numpy.ndarray
+            If provided, the uint8 array of shape `(rows, columns, 2)` into which
+            the result is written.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        if not isinstance(data, numpy.ndarray):
+            raise ValueError('Requires a numpy.ndarray, got {}'.format(type(data)))
+        if data.dtype.name not in ('complex64', 'complex128'):
+            raise ValueError('Requires a numpy.ndarray of complex dtype, got {}'.format(data.dtype.name))
+        if data.ndim != 2:
+            raise ValueError('Requires a two-dimensional numpy.ndarray, got {}'.format(data.shape))
+
+        shape = data.shape + (2, )
+        if out is None:
+            out = numpy.empty(shape, dtype=numpy.uint8)
+        elif not isinstance(out, numpy.ndarray) or out.shape != shape or out.dtype.name != 'uint8':
+            raise ValueError(
+                'out must be a uint8 numpy.ndarray of shape {}, got {}'.format(
+                    shape, getattr(out, 'shape', type(out))))
+
+        phase_scale = numpy.array(256/(2*numpy.pi), dtype=data.real.dtype)
+        block_rows = _get_block_rows(data.shape)
+        for start in range(0, data.shape[0], block_rows):
+            stop = min(start + block_rows, data.shape[0])
+            block, out_block = data[start:stop], out[start:stop]
+
+            out_block[:, :, 0] = self._get_amplitude_codes(numpy.abs(block))
+
+            phase = numpy.angle(block)
+            phase *= phase_scale
+            numpy.rint(phase, out=phase)
+            # NB: the phase is in [-128, 128], and negative codes wrap around
+            out_block[:, :, 1] = phase.astype(numpy.int16) & 255
+        return out
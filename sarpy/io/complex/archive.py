@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+"""
+A chunked, losslessly compressed archive format for SICD data, using HDF5. The
+pixel data is stored with the storage data type of the SICD pixel type (so no
+precision is lost relative to the SICD), in chunks of rows and columns which are
+byte shuffled and deflate compressed. The chunks are compressed concurrently
+on write, and reads only decompress the chunks overlapping the request, so tiles
+are served efficiently.
+
+The file layout is the root attributes :code:`format = 'SICD_ARCHIVE'` and
+:code:`version = 1`, the scalar bytes dataset :code:`sicd_xml` containing the
+SICD xml, and the dataset :code:`image` of shape `(rows, columns, 2)` containing
+the little endian pixel data, i.e. (real, imaginary) or (amplitude, phase) pairs.
+
+Examples
+--------
+.. code-block:: python
+
+    from sarpy.io.complex.converter import conversion_utility, open_complex
+
+    conversion_utility(input_file, output_directory, output_format='ARCHIVE')
+    reader = open_complex(archive_file)
+    tile = reader[1024:1536, 2048:2560]
+"""
+
+import os
+import logging
+import threading
+import zlib
+
+import numpy
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+from .base import BaseReader, BaseWriter, int_func, string_types, _call_concurrently, _validate_max_workers
+from .hdf5 import HDF5Chipper
+from .sicd import complex_to_amp_phase, complex_to_int, amp_phase_to_complex
+from .sicd_elements.SICD import SICDType
+from .utils import parse_xml_from_string
+# noinspection PyProtectedMember
+from ..nitf.des import _SICD_SPECIFICATION_NAMESPACE
+
+__classification__ = "UNCLASSIFIED"
+__author__ = "Thomas McCullough"
+
+
+_ARCHIVE_FORMAT = 'SICD_ARCHIVE'
+_ARCHIVE_VERSION = 1
+_IMAGE_DATASET = 'image'
+_XML_DATASET = 'sicd_xml'
+# the default chunk shape, of the form (rows, columns)
+_DEFAULT_CHUNK_SHAPE = (256, 256)
+# the default deflate compression level, which balances speed and size
+_DEFAULT_COMPRESSION_LEVEL = 4
+# the largest default number of worker threads for compressing chunks
+_MAX_DEFAULT_WORKERS = 8
+
+
+def is_a(file_name):
+    """
+    Tests whether a given file_name corresponds to a SICD archive file. Returns a
+    reader instance, if so.
+
+    Parameters
+    ----------
+    file_name : str
+        the file_name to check
+
+    Returns
+    -------
+    SICDArchiveReader|None
+        `SICDArchiveReader` instance if SICD archive file, `None` otherwise
+    """
+
+    if h5py is None:
+        return None
+
+    try:
+        reader = SICDArchiveReader(file_name)
+        print('File {} is determined to be a SICD archive file.'.format(file_name))
+        return reader
+    except (IOError, KeyError, ValueError):
+        return None
+
+
+def _get_storage_details(sicd_meta):
+    """
+    Gets the storage details for the pixel type of the sicd.
+
+    Parameters
+    ----------
+    sicd_meta : SICDType
+
+    Returns
+    -------
+    (numpy.dtype, bool|callable, bool|callable)
+        The storage data type, the complex type for writing (see
+        :class:`sarpy.io.complex.bip.BIPWriter`) and the complex type for
+        reading (see :class:`sarpy.io.complex.base.BaseChipper`).
+    """
+
+    pixel_type = sicd_meta.ImageData.PixelType
+    if pixel_type == 'RE32F_IM32F':
+        return numpy.dtype('<f4'), True, True
+    elif pixel_type == 'RE16I_IM16I':
+        return numpy.dtype('<i2'), complex_to_int, True
+    elif pixel_type == 'AMP8I_PHS8I':
+        amp_table = sicd_meta.ImageData.AmpTable
+        return numpy.dtype('u1'), complex_to_amp_phase(amp_table), amp_phase_to_complex(amp_table)
+    raise ValueError('Pixel Type {} not recognized.'.format(pixel_type))
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class SICDArchiveReader(BaseReader):
+    """
+    A reader object for a SICD archive file.
+    """
+
+    __slots__ = ('_file_name', )
+
+    def __init__(self, file_name, chunk_cache_bytes=None):
+        """
+
+        Parameters
+        ----------
+        file_name : str
+        chunk_cache_bytes : None|int
+            The size in bytes of the HDF5 raw data chunk cache, see
+            :class:`sarpy.io.complex.hdf5.HDF5Chipper`.
+        """
+
+        if h5py is None:
+            raise ImportError("Can't read SICD archive files, because the h5py dependency is missing.")
+        if not isinstance(file_name, string_types):
+            raise TypeError('file_name must be a string, got {}'.format(type(file_name)))
+
+        try:
+            with h5py.File(file_name, 'r') as hf:
+                if _decode(hf.attrs.get('format', None)) != _ARCHIVE_FORMAT:
+                    raise IOError('File {} is not a SICD archive file.'.format(file_name))
+                version = int_func(hf.attrs['version'])
+                if version > _ARCHIVE_VERSION:
+                    raise IOError(
+                        'SICD archive file {} has version {}, and only versions up to {} '
+                        'are supported.'.format(file_name, version, _ARCHIVE_VERSION))
+                sicd_xml = bytes(hf[_XML_DATASET][()])
+                shape = hf[_IMAGE_DATASET].shape
+        except OSError as e:
+            # h5py raises OSError for a file which is not HDF5
+            raise IOError('File {} is not a SICD archive file, with error {}'.format(file_name, e))
+
+        root_node, xml_ns = parse_xml_from_string(sicd_xml.decode('utf-8'))
+        the_sicd = SICDType.from_node(root_node, xml_ns)
+        _, _, complex_type = _get_storage_details(the_sicd)
+        self._file_name = file_name
+        chipper = HDF5Chipper(
+            file_name, _IMAGE_DATASET, shape[:2], symmetry=(False, False, False),
+            complex_type=complex_type, chunk_cache_bytes=chunk_cache_bytes)
+        super(SICDArchiveReader, self).__init__(the_sicd, chipper)
+
+    @property
+    def file_name(self):
+        """
+        str: The file name.
+        """
+
+        return self._file_name
+
+
+class SICDArchiveWriter(BaseWriter):
+    """
+    Writer object for a SICD archive file. The data is stored in chunks, each of
+    which is compressed once fully written, so blocks of data need not be aligned
+    with the chunks. The compression of the chunks overlapping each block of data
+    may be performed concurrently using a pool of worker threads. See the
+    `max_workers` property.
+
+    **Thread safety:** blocks may be written in any order, and concurrently from
+    multiple producer threads, provided that the blocks do not overlap.
+    """
+
+    __slots__ = (
+        '_file_name', '_sicd_meta', '_shape', '_chunk_shape', '_compression_level', '_shuffle',
+        '_dtype', '_complex_type', '_handle', '_dataset', '_pending', '_pixels_written',
+        '_max_workers', '_lock', '_file_lock')
+
+    def __init__(self, file_name, sicd_meta, chunk_shape=None, compression_level=None, shuffle=True,
+                 max_workers=None):
+        """
+
+        Parameters
+        ----------
+        file_name : str
+        sicd_meta : SICDType
+        chunk_shape : None|Tuple[int, int]
+            The chunk shape of the form `(rows, columns)`, defaults to `(256, 256)`,
+            and restricted to the image size.
+        compression_level : None|int
+            The deflate compression level from 0 (no compression) to 9, defaults to 4.
+        shuffle : bool
+            Byte shuffle the data before compression, which generally improves
+            compression of floating point and integer data.
+        max_workers : None|int
+            The default maximum number of worker threads for compressing chunks
+            concurrently. See the `max_workers` property. If not provided, this
+            is the number of cpus, up to 8.
+        """
+
+        if h5py is None:
+            raise ImportError("Can't write SICD archive files, because the h5py dependency is missing.")
+
+        self._handle = None
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._max_workers = None
+        if max_workers is None:
+            max_workers = min(_MAX_DEFAULT_WORKERS, getattr(os, 'cpu_count', lambda: 1)() or 1)
+        self.max_workers = max_workers
+        super(SICDArchiveWriter, self).__init__(file_name, sicd_meta)
+        self._shape = (int_func(self._sicd_meta.ImageData.NumRows), int_func(self._sicd_meta.ImageData.NumCols))
+        self._dtype, self._complex_type, _ = _get_storage_details(self._sicd_meta)
+
+        if chunk_shape is None:
+            chunk_shape = _DEFAULT_CHUNK_SHAPE
+        chunk_shape = (int_func(chunk_shape[0]), int_func(chunk_shape[1]))
+        if chunk_shape[0] < 1 or chunk_shape[1] < 1:
+            raise ValueError('chunk_shape entries must be positive, got {}'.format(chunk_shape))
+        self._chunk_shape = (min(chunk_shape[0], self._shape[0]), min(chunk_shape[1], self._shape[1]))
+
+        if compression_level is None:
+            compression_level = _DEFAULT_COMPRESSION_LEVEL
+        compression_level = int_func(compression_level)
+        if not (0 <= compression_level <= 9):
+            raise ValueError('compression_level must be between 0 and 9, got {}'.format(compression_level))
+        self._compression_level = compression_level
+        self._shuffle = bool(shuffle)
+        self._pending = {}
+        self._pixels_written = 0
+
+        self._handle = h5py.File(file_name, 'w')
+        self._handle.attrs['format'] = _ARCHIVE_FORMAT
+        self._handle.attrs['version'] = _ARCHIVE_VERSION
+        sicd_xml = self._sicd_meta.to_xml_string(urn=_SICD_SPECIFICATION_NAMESPACE, tag='SICD')
+        self._handle.create_dataset(_XML_DATASET, data=numpy.bytes_(sicd_xml.encode('utf-8')))
+        self._dataset = self._handle.create_dataset(
+            _IMAGE_DATASET, shape=self._shape + (2, ), dtype=self._dtype, chunks=self._chunk_shape + (2, ),
+            compression='gzip' if compression_level > 0 else None,
+            compression_opts=compression_level if compression_level > 0 else None,
+            shuffle=self._shuffle, fillvalue=0)
+
+    @property
+    def chunk_shape(self):
+        """
+        Tuple[int, int]: The chunk shape of the form `(rows, columns)`.
+        """
+
+        return self._chunk_shape
+
+    @property
+    def max_workers(self):
+        """
+        None|int: The default maximum number of worker threads used to compress
+        the chunks overlapping each block of data. A value of `None` or `1` means
+        that chunks will be compressed serially in the calling thread. This may be
+        overridden for a single block using the `max_workers` argument of :func:`__call__`.
+        """
+
+        return self._max_workers
+
+    @max_workers.setter
+    def max_workers(self, value):
+        self._max_workers = _validate_max_workers(value)
+
+    @property
+    def fully_written(self):
+        """
+        bool: Whether every pixel has been written.
+        """
+
+        with self._lock:
+            return self._pixels_written >= self._shape[0]*self._shape[1]
+
+    def convert(self, data):
+        """
+        Converts the complex data to the storage data type of the pixel type,
+        without writing. The result may be written using the `raw` argument of
+        :func:`__call__`.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            The complex data.
+
+        Returns
+        -------
+        numpy.ndarray
+            Of shape `(rows, columns, 2)`.
+        """
+
+        if not isinstance(data, numpy.ndarray):
+            raise TypeError('Requires data is a numpy.ndarray, got {}'.format(type(data)))
+        if data.dtype.name not in ('complex64', 'complex128'):
+            raise ValueError('Writer expects complex data, and got data of type {}.'.format(data.dtype))
+        if callable(self._complex_type):
+            return self._complex_type(numpy.ascontiguousarray(data))
+        data = numpy.ascontiguousarray(data, dtype=numpy.complex64)
+        return data.view(numpy.float32).reshape((data.shape[0], data.shape[1], 2))
+
+    def _write_chunk(self, index, data):
+        """
+        Compresses and writes the given chunk.
+
+        Parameters
+        ----------
+        index : Tuple[int, int]
+            The chunk index.
+        data : numpy.ndarray
+            The chunk data, which may be smaller than the chunk shape at the
+            boundary of the image.
+
+        Returns
+        -------
+        None
+        """
+
+        offset = (index[0]*self._chunk_shape[0], index[1]*self._chunk_shape[1], 0)
+        if not hasattr(self._dataset.id, 'write_direct_chunk'):
+            # older h5py, so let HDF5 compress the chunk (holding the h5py lock)
+            with self._file_lock:
+                self._dataset[offset[0]:offset[0]+data.shape[0], offset[1]:offset[1]+data.shape[1]] = data
+            return
+
+        chunk_shape = self._chunk_shape + (2, )
+        if data.shape == chunk_shape:
+            chunk = numpy.ascontiguousarray(data, dtype=self._dtype)
+        else:
+            # HDF5 stores the full chunk at the image boundary
+            chunk = numpy.zeros(chunk_shape, dtype=self._dtype)
+            chunk[:data.shape[0], :data.shape[1]] = data
+        if self._shuffle and self._dtype.itemsize > 1:
+            # the HDF5 shuffle filter groups the bytes by their position in each element
+            chunk = chunk.reshape((-1, )).view(numpy.uint8).reshape((-1, self._dtype.itemsize)).T
+        chunk_bytes = chunk.tobytes()
+        if self._compression_level > 0:
+            chunk_bytes = zlib.compress(chunk_bytes, self._compression_level)
+        with self._file_lock:
+            self._dataset.id.write_direct_chunk(offset, chunk_bytes)
+
+    def __call__(self, data, start_indices=(0, 0), max_workers=None, raw=False):
+        """
+        Write the data to the file.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            the complex data
+        start_indices : Tuple[int, int]
+            the starting index for the data.
+        max_workers : None|int
+            The maximum number of worker threads to use for compressing the chunks
+            completed by this block. The default (`None`) defers to the `max_workers`
+            property.
+        raw : bool
+            If `True`, then `data` is already of the storage data type, as returned
+            by :func:`convert`.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._handle is None:
+            raise ValueError('The writer for file {} has been closed.'.format(self._file_name))
+        max_workers = self._max_workers if max_workers is None else _validate_max_workers(max_workers)
+        if not raw:
+            data = self.convert(data)
+        elif data.dtype.name != self._dtype.name or data.ndim != 3 or data.shape[2] != 2:
+            raise ValueError(
+                'Writer expects raw data of type {} and shape (rows, columns, 2), and got data of '
+                'type {} and shape {}.'.format(self._dtype, data.dtype, data.shape))
+
+        start_indices = (int_func(start_indices[0]), int_func(start_indices[1]))
+        rows = (start_indices[0], start_indices[0] + data.shape[0])
+        cols = (start_indices[1], start_indices[1] + data.shape[1])
+        if rows[0] < 0 or cols[0] < 0 or rows[1] > self._shape[0] or cols[1] > self._shape[1]:
+            raise ValueError(
+                'The block of shape {} at start indices {} exceeds the image of shape {}'.format(
+                    data.shape[:2], start_indices, self._shape))
+        if data.shape[0] == 0 or data.shape[1] == 0:
+            return
+
+        chunk_rows, chunk_cols = self._chunk_shape
+        writes = []
+        for i in range(rows[0]//chunk_rows, (rows[1] - 1)//chunk_rows + 1):
+            c_rows = (i*chunk_rows, min((i + 1)*chunk_rows, self._shape[0]))
+            o_rows = (max(c_rows[0], rows[0]), min(c_rows[1], rows[1]))
+            for j in range(cols[0]//chunk_cols, (cols[1] - 1)//chunk_cols + 1):
+                c_cols = (j*chunk_cols, min((j + 1)*chunk_cols, self._shape[1]))
+                o_cols = (max(c_cols[0], cols[0]), min(c_cols[1], cols[1]))
+                block = data[o_rows[0]-rows[0]:o_rows[1]-rows[0], o_cols[0]-cols[0]:o_cols[1]-cols[0]]
+                if o_rows == c_rows and o_cols == c_cols:
+                    writes.append(((i, j), block))
+                    continue
+                # accumulate the partial chunk, until complete
+                with self._lock:
+                    if (i, j) not in self._pending:
+                        self._pending[(i, j)] = [
+                            numpy.zeros((c_rows[1] - c_rows[0], c_cols[1] - c_cols[0], 2), dtype=self._dtype), 0]
+                    entry = self._pending[(i, j)]
+                    entry[0][o_rows[0]-c_rows[0]:o_rows[1]-c_rows[0], o_cols[0]-c_cols[0]:o_cols[1]-c_cols[0]] = block
+                    entry[1] += block.shape[0]*block.shape[1]
+                    if entry[1] == entry[0].shape[0]*entry[0].shape[1]:
+                        del self._pending[(i, j)]
+                        writes.append(((i, j), entry[0]))
+        _call_concurrently(self._write_chunk, writes, max_workers)
+        with self._lock:
+            self._pixels_written += data.shape[0]*data.shape[1]
+
+    def close(self):
+        """
+        Writes any incomplete chunks, logging at error level if data appears not
+        to be fully written, and closes the file.
+
+        Returns
+        -------
+        None
+        """
+
+        if not hasattr(self, '_handle') or self._handle is None:
+            return
+        try:
+            if not self.fully_written:
+                logging.error(
+                    'Attempting to create file {}, which will be corrupt. {} pixels were expected, '
+                    'but only {} were written.'.format(
+                        self._file_name, self._shape[0]*self._shape[1], self._pixels_written))
+            with self._lock:
+                pending = list(self._pending.items())
+                self._pending = {}
+            for index, (data, _) in pending:
+                self._write_chunk(index, data)
+        finally:
+            handle = self._handle
+            self._handle = None
+            self._dataset = None
+            handle.close()
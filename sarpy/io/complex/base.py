@@ -7,14 +7,29 @@ import os
 import re
 import sys
 import logging
+import threading
 from typing import Union, Tuple
 
 import numpy
 
 from .sicd_elements.SICD import SICDType
 from .sicd_elements.ImageCreation import ImageCreationType
+from .tile_cache import TileCache
+from .overview import Overviews, OverviewImage
 from ...__about__ import __title__, __version__
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # this is python 2 without the futures backport
+    ThreadPoolExecutor = None
+
+if sys.version_info[0] < 3:
+    # noinspection PyUnresolvedReferences
+    import Queue as queue
+else:
+    import queue
+
 integer_types = (int, )
 string_types = (str, )
 int_func = int
@@ -30,6 +45,174 @@ __classification__ = "UNCLASSIFIED"
 __author__ = "Thomas McCullough"
 
 
+def _validate_max_workers(max_workers):  # type: (Union[None, int]) -> Union[None, int]
+    if max_workers is None:
+        return None
+    max_workers = int_func(max_workers)
+    if max_workers < 1:
+        raise ValueError('max_workers must be a positive integer, got {}'.format(max_workers))
+    if max_workers > 1 and ThreadPoolExecutor is None:
+        logging.warning(
+            'max_workers={} was requested, but concurrent.futures is not available. '
+            'This will be performed serially.'.format(max_workers))
+    return max_workers
+
+
+def _call_concurrently(function, arguments, max_workers):
+    """
+    Calls `function(*entry)` for each entry of `arguments`, using a pool of at
+    most `max_workers` threads. This is performed serially if `max_workers`
+    is `None` or 1, or if `concurrent.futures` is not available.
+
+    Parameters
+    ----------
+    function : callable
+    arguments : list
+    max_workers : None|int
+
+    Returns
+    -------
+    None
+    """
+
+    workers = 1 if max_workers is None else min(max_workers, len(arguments))
+    if workers < 2 or ThreadPoolExecutor is None:
+        for entry in arguments:
+            function(*entry)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(function, *entry) for entry in arguments]
+        for future in futures:
+            future.result()  # raises any exception from the worker
+
+
+# read_points groups points within this many rows of one another
+_POINT_BLOCK_ROWS = 256
+# read_points reads points in the same row block using one read, unless separated
+#   by a column gap of more than this
+_POINT_COLUMN_GAP = 256
+
+
+def _get_point_groups(rows, cols, segment_starts):
+    """
+    Groups the points by image segment and row block, and then into clusters of
+    nearby columns, each of which will be satisfied by a single read.
+
+    Parameters
+    ----------
+    rows : numpy.ndarray
+    cols : numpy.ndarray
+    segment_starts : numpy.ndarray
+        The (increasing) first row of each image segment.
+
+    Returns
+    -------
+    List[numpy.ndarray]
+        The indices of the points in each group.
+    """
+
+    segments = numpy.searchsorted(segment_starts, rows, side='right') - 1
+    row_blocks = rows//_POINT_BLOCK_ROWS
+    order = numpy.lexsort((cols, row_blocks, segments))
+    if order.size == 0:
+        return []
+    # a new group begins with a new segment, a new row block, or a large column gap
+    sorted_cols = cols[order]
+    breaks = numpy.flatnonzero(
+        (numpy.diff(segments[order]) != 0) | (numpy.diff(row_blocks[order]) != 0) |
+        (numpy.diff(sorted_cols) > _POINT_COLUMN_GAP)) + 1
+    return numpy.split(order, breaks)
+
+
+def _get_slot_names(the_type):
+    """
+    Gets the names of all slots defined for the given class and its parents.
+
+    Parameters
+    ----------
+    the_type : type
+
+    Returns
+    -------
+    List[str]
+    """
+
+    names = []
+    for klass in reversed(the_type.__mro__):
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, string_types):
+            slots = (slots, )
+        for name in slots:
+            if name not in names and name not in ('__dict__', '__weakref__'):
+                names.append(name)
+    return names
+
+
+def _get_slot_state(instance):
+    """
+    Gets the populated slot values of the given instance, for pickling.
+
+    Parameters
+    ----------
+    instance : object
+
+    Returns
+    -------
+    dict
+    """
+
+    return dict(
+        (name, getattr(instance, name)) for name in _get_slot_names(instance.__class__) if hasattr(instance, name))
+
+
+def _set_slot_state(instance, state):
+    """
+    Sets the slot values of the given instance, for unpickling.
+
+    Parameters
+    ----------
+    instance : object
+    state : dict
+
+    Returns
+    -------
+    None
+    """
+
+    for name, value in state.items():
+        setattr(instance, name, value)
+
+
+def _validate_limits(limits, size, name):
+    """
+    Validate the `(start, stop)` limits for the given axis size, where `None`
+    is interpreted as the full extent.
+    """
+
+    if limits is None:
+        return 0, size
+    limits = (int_func(limits[0]), int_func(limits[1]))
+    if not ((0 <= limits[0] < size) and (limits[0] < limits[1] <= size)):
+        raise ValueError(
+            'Entries of {} must be monotonically increasing '
+            'and in the range [0, {}]'.format(name, size))
+    return limits
+
+
+def _get_block_slices(limits, block_size, overlap):
+    """
+    Gets the slices for the blocks covering the limits, extended by the overlap
+    on each side (and restricted to the limits).
+    """
+
+    slices = []
+    for start in range(limits[0], limits[1], block_size):
+        stop = min(start + block_size, limits[1])
+        slices.append(slice(max(limits[0], start - overlap), min(limits[1], stop + overlap)))
+    return slices
+
+
 class BaseChipper(object):
     """
     Base class defining basic functionality for the literal extraction of data
@@ -50,8 +233,21 @@ class BaseChipper(object):
     **Extension Consideration:** It is possible that the basic functionality for
     conversion of raw data to complex data requires something more nuanced than
     the default provided in the `_data_to_complex` method.
+
+    Reads may optionally be served from fixed size tiles held in a least recently
+    used cache. See the `tile_cache` property. Decimated reads may optionally be
+    served from reduced resolution overviews. See the `overview` property.
+
+    Data may also be read in the storage data type, without complex conversion,
+    using the `raw` argument of :func:`__call__`, and converted later (perhaps
+    in sub-blocks) using :func:`raw_to_complex`.
+
+    Chippers may be pickled, for example for use in a process pool. Any open file
+    handles or memory maps are not pickled, and are reopened upon first use.
+    **Extension Consideration:** an extension holding such resources should
+    exclude them in :func:`__getstate__`.
     """
-    __slots__ = ('_data_size', '_complex_type', '_symmetry')
+    __slots__ = ('_data_size', '_complex_type', '_symmetry', '_tile_cache', '_overview')
 
     def __init__(self, data_size, symmetry=(False, False, False), complex_type=False):
         """
@@ -74,6 +270,8 @@ class BaseChipper(object):
         if not (isinstance(complex_type, bool) or callable(complex_type)):
             raise ValueError('complex-type must be a boolean or a callable')
         self._complex_type = complex_type
+        self._tile_cache = None
+        self._overview = None
 
         if not isinstance(symmetry, tuple):
             symmetry = tuple(symmetry)
@@ -95,6 +293,12 @@ class BaseChipper(object):
         else:
             self._data_size = data_size
 
+    def __getstate__(self):
+        return _get_slot_state(self)
+
+    def __setstate__(self, state):
+        _set_slot_state(self, state)
+
     @property
     def symmetry(self):
         """
@@ -121,7 +325,91 @@ class BaseChipper(object):
 
         return self._data_size
 
-    def __call__(self, range1, range2):
+    @property
+    def tile_cache(self):
+        """
+        None|TileCache: The tile cache used for reading, if any. When set, every
+        read is assembled from fixed size tiles, which are read from the file once
+        and held (in the raw data type, before complex conversion and axis swap)
+        subject to the byte budget of the cache. The cache may be shared between
+        chippers.
+        """
+
+        return self._tile_cache
+
+    @tile_cache.setter
+    def tile_cache(self, value):
+        if not (value is None or isinstance(value, TileCache)):
+            raise TypeError('tile_cache requires a TileCache instance, got type {}'.format(type(value)))
+        self._tile_cache = value
+
+    @property
+    def overview(self):
+        """
+        None|OverviewImage: The reduced resolution overviews used for reading, if
+        any. When set, any read whose step is at least the smallest overview level
+        in both dimensions is served from the nearest overview level, rather than
+        from the file. Note that such data is the block averaged amplitude (or
+        the complex multilooked data), rather than the decimated complex data.
+        """
+
+        return self._overview
+
+    @overview.setter
+    def overview(self, value):
+        if value is None:
+            self._overview = None
+            return
+        if not isinstance(value, OverviewImage):
+            raise TypeError('overview requires an OverviewImage instance, got type {}'.format(type(value)))
+        if value.data_size != self._data_size:
+            raise ValueError(
+                'The overview is for data of size {}, but this chipper has data size '
+                '{}'.format(value.data_size, self._data_size))
+        self._overview = value
+
+    def _get_segment_row_starts(self):
+        """
+        Gets the first row of each independently stored image segment, in the
+        output orientation, so that reads may be grouped to avoid spanning segments.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        return numpy.zeros((1, ), dtype=numpy.int64)
+
+    def _read_overview(self, range1, range2, out):
+        """
+        Serves the read from the overview, if possible.
+
+        Parameters
+        ----------
+        range1 : None|int|tuple
+        range2 : None|int|tuple
+        out : None|numpy.ndarray
+
+        Returns
+        -------
+        None|numpy.ndarray
+            `None` if no overview level is suitable.
+        """
+
+        if self._overview is None:
+            return None
+        data = self._overview.read(*self._validate_arguments(range1, range2))
+        if data is None or out is None:
+            return data
+        if not isinstance(out, numpy.ndarray):
+            raise TypeError('out must be a numpy.ndarray, got type {}'.format(type(out)))
+        if out.shape != data.shape:
+            raise ValueError(
+                'out has shape {}, but the requested data has shape {}'.format(out.shape, data.shape))
+        out[:] = data
+        return out
+
+    def __call__(self, range1, range2, max_workers=None, out=None, copy=True, raw=False):
         """
         Reads and fetches data. Note that :code:`chipper(range1, range2)` is an alias
         for :code:`chipper.read_chip(range1, range2)`.
@@ -130,21 +418,235 @@ class BaseChipper(object):
         ----------
         range1 : None|int|tuple
         range2 : none|int|tuple
+        max_workers : None|int
+            The maximum number of worker threads to use for reading. This is only
+            used by chippers which support concurrent reading (i.e. those composed
+            of several child chippers), and is otherwise ignored.
+        out : None|numpy.ndarray
+            If provided, the output array into which the data will be written.
+            This must have exactly the shape of the output, and will be returned.
+        copy : bool
+            If `False`, then a read-only view of the underlying storage will be
+            returned, where the storage layout permits. Otherwise, this falls back
+            to returning a copy. This is ignored if `out` is provided.
+        raw : bool
+            If `True`, then the data is returned in the storage data type, without
+            complex conversion, of shape `(rows, columns, bands)`. See :func:`_read_raw`.
 
         Returns
         -------
         numpy.ndarray
         """
 
-        data = self._read_raw_fun(range1, range2)
-        data = self._data_to_complex(data)
+        if raw:
+            return self._read_raw(range1, range2, out=out, copy=copy)
+
+        data = self._read_overview(range1, range2, out)
+        if data is not None:
+            return data
+
+        if self._tile_cache is None:
+            data = self._read_raw_fun(range1, range2)
+        else:
+            data = self._read_raw_cached(range1, range2)
+
+        if out is None and not copy:
+            view = self._get_complex_view(data)
+            if view is not None:
+                if view.ndim == 3 and view.shape[2] == 1:
+                    view = numpy.reshape(view, view.shape[:-1])
+                view = self._reorder_data(view)
+                view.flags.writeable = False
+                return view
+            logging.debug(
+                'No view of the raw data of type {} is possible for {}, '
+                'so a copy is returned'.format(data.dtype, self.__class__.__name__))
+
+        if out is None:
+            data = self._data_to_complex(data)
+            if not data.flags.owndata:
+                # the raw data may be a view into the file storage
+                data = numpy.array(data)
+            # make a one band image flat
+            if data.ndim == 3 and data.shape[2] == 1:
+                data = numpy.reshape(data, data.shape[:-1])
+            return self._reorder_data(data)
+
+        # construct the view of out in raw orientation, and populate it directly
+        self._data_to_complex(data, out=self._get_raw_oriented_view(out, data))
+        return out
+
+    def _read_raw(self, range1, range2, out=None, copy=True):
+        """
+        Reads the data in the storage data type, without complex conversion. The
+        result has the output orientation, with the (raw) bands in the final
+        dimension, so that real/imaginary or amplitude/phase pairs are adjacent.
+        Any overview is not used.
 
-        # make a one band image flat
-        if data.ndim == 3 and data.shape[2] == 1:
-            data = numpy.reshape(data, data.shape[:-1])
+        Parameters
+        ----------
+        range1 : None|int|tuple
+        range2 : None|int|tuple
+        out : None|numpy.ndarray
+            If provided, the array of exactly the output shape into which the
+            data will be written.
+        copy : bool
+            If `False`, then a read-only view of the underlying storage, which
+            preserves the file byte order, will be returned where possible.
+            Otherwise, a copy in native byte order is returned.
 
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        if self._tile_cache is None:
+            data = self._read_raw_fun(range1, range2)
+        else:
+            data = self._read_raw_cached(range1, range2)
+        if data.ndim == 2:
+            data = numpy.reshape(data, data.shape + (1, ))
         data = self._reorder_data(data)
-        return data
+
+        if out is not None:
+            if not isinstance(out, numpy.ndarray):
+                raise TypeError('out must be a numpy.ndarray, got type {}'.format(type(out)))
+            if out.shape != data.shape:
+                raise ValueError(
+                    'out has shape {}, but the requested data has shape {}'.format(out.shape, data.shape))
+            out[:] = data
+            return out
+        if not copy:
+            data = data.view()
+            data.flags.writeable = False
+            return data
+        return numpy.array(data, dtype=data.dtype.newbyteorder('='))
+
+    def raw_to_complex(self, data, out=None):
+        """
+        Converts data read using the `raw` argument of :func:`__call__` to complex
+        data. The conversion is element-wise, so this may be applied to any
+        block of the raw data, for example as it is processed.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            The raw data, of shape `(rows, columns, bands)`.
+        out : None|numpy.ndarray
+            If provided, the array into which the result will be written, of the
+            same shape as the result of :func:`__call__`.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        if not isinstance(data, numpy.ndarray) or data.ndim != 3:
+            raise ValueError(
+                'data must be a three-dimensional numpy.ndarray, got {}'.format(getattr(data, 'shape', type(data))))
+        shape = self._get_complex_shape(data)
+        if out is not None:
+            if not isinstance(out, numpy.ndarray):
+                raise TypeError('out must be a numpy.ndarray, got type {}'.format(type(out)))
+            expected_shape = shape[:2] if len(shape) == 3 and shape[2] == 1 else shape
+            if out.shape != expected_shape:
+                raise ValueError(
+                    'out has shape {}, but the converted data has shape {}'.format(out.shape, expected_shape))
+            # NB: this reshape only appends a trailing axis, so is always a view
+            self._data_to_complex(data, out=numpy.reshape(out, shape))
+            return out
+
+        result = self._data_to_complex(data)
+        if not result.flags.owndata:
+            result = numpy.array(result)
+        if result.ndim == 3 and result.shape[2] == 1:
+            result = numpy.reshape(result, result.shape[:-1])
+        return result
+
+    def _get_complex_view(self, data):
+        """
+        Gets a view of the raw data as complex data, if possible without copying.
+        This is only possible when no conversion is required, or when real and
+        imaginary components are stored as adjacent float32 (or float64) bands.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            The raw data.
+
+        Returns
+        -------
+        None|numpy.ndarray
+            The view, or `None` if not possible.
+        """
+
+        if self._complex_type is False:
+            return data
+        elif self._complex_type is True and data.ndim == 3 and \
+                data.dtype.kind == 'f' and data.dtype.itemsize in (4, 8):
+            # NB: this preserves the byte order of the raw data
+            complex_type = numpy.dtype('c{}'.format(2*data.dtype.itemsize)).newbyteorder(data.dtype.byteorder)
+            try:
+                return data.view(complex_type)
+            except ValueError:
+                # the final axis is not contiguous
+                return None
+        return None
+
+    def _get_complex_shape(self, data):
+        """
+        Gets the shape of the result of complex conversion for the given raw data.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+
+        Returns
+        -------
+        tuple
+        """
+
+        if self._complex_type is True:
+            return data.shape[:2] + (int_func(data.shape[2]/2), )
+        elif callable(self._complex_type):
+            # the general callable is opaque, so we assume complex bands are pairs of raw bands
+            if data.ndim == 3:
+                return data.shape[:2] + (int_func(data.shape[2]/2), )
+            return data.shape
+        else:
+            return data.shape
+
+    def _get_raw_oriented_view(self, out, data):
+        """
+        Validates the provided output array, and gets the view of it which
+        corresponds to the complex conversion of `data`, i.e. before any axis swap.
+
+        Parameters
+        ----------
+        out : numpy.ndarray
+        data : numpy.ndarray
+            The raw data.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        if not isinstance(out, numpy.ndarray):
+            raise TypeError('out must be a numpy.ndarray, got type {}'.format(type(out)))
+        if not out.flags.writeable:
+            raise ValueError('out must be a writeable numpy.ndarray')
+
+        shape = self._get_complex_shape(data)
+        expected_shape = (shape[1], shape[0]) + shape[2:] if self._symmetry[2] else shape
+        if len(expected_shape) == 3 and expected_shape[2] == 1:
+            expected_shape = expected_shape[:2]
+        if out.shape != expected_shape:
+            raise ValueError(
+                'out has shape {}, but the requested data has shape {}'.format(out.shape, expected_shape))
+
+        view = numpy.swapaxes(out, 0, 1) if self._symmetry[2] else out
+        return numpy.reshape(view, shape)
 
     def __getitem__(self, item):
         """
@@ -181,10 +683,11 @@ class BaseChipper(object):
         else:
             return parse(item), None
 
-    def _reorder_arguments(self, range1, range2):
+    def _validate_arguments(self, range1, range2):
         """
-        Reinterpret the range arguments into actual "physical" arguments of memory,
-        in light of the symmetry attribute.
+        Validate the range arguments, and reinterpret them as explicit
+        `(start, stop, step)` ranges with respect to `data_size`, **before** any
+        consideration of symmetry.
 
         Parameters
         ----------
@@ -198,15 +701,17 @@ class BaseChipper(object):
 
         Returns
         -------
-        None|int|tuple
-            actual range 1 - in light of `range1`, `range2` and symmetry
-        None|int|tuple
-            actual range 2 - in light of `range1`, `range2` and symmetry
+        Tuple[int, int, int]
+            range 1 - with respect to `data_size[0]`
+        Tuple[int, int, int]
+            range 2 - with respect to `data_size[1]`
         """
 
         def extract(arg, siz):
             start, stop, step = None, None, None
-            if isinstance(arg, integer_types):
+            if arg is None:
+                pass
+            elif isinstance(arg, integer_types):
                 step = arg
             else:
                 # NB: following this pattern to avoid confused pycharm inspection
@@ -244,11 +749,6 @@ class BaseChipper(object):
                 stop += siz
             return start, stop, step
 
-        def reverse_arg(arg, siz):
-            start, stop, step = extract(arg, siz)
-            # read backwards
-            return (siz - 1) - start, (siz - 1) - stop, -step
-
         if isinstance(range1, (numpy.ndarray, list)):
             range1 = tuple(range1)
         if isinstance(range2, (numpy.ndarray, list)):
@@ -266,32 +766,167 @@ class BaseChipper(object):
         if isinstance(range2, tuple) and len(range2) > 3:
             raise TypeError('range2 must have no more than 3 entries, received {}.'.format(range2))
 
-        # validate the first range
+        return extract(range1, self._data_size[0]), extract(range2, self._data_size[1])
+
+    def _reorder_arguments(self, range1, range2):
+        """
+        Reinterpret the range arguments into actual "physical" arguments of memory,
+        in light of the symmetry attribute.
+
+        Parameters
+        ----------
+        range1 : None|int|tuple
+            * if `None`, then the range is not limited in first axis
+            * if `int` = step size
+            * if (`int`, `int`) = `end`, `step size`
+            * if (`int`, `int`, `int`) = `start`, `stop`, `step size`
+        range2 : None|int|tuple
+            same as `range1`, except for the second axis.
+
+        Returns
+        -------
+        None|int|tuple
+            actual range 1 - in light of `range1`, `range2` and symmetry
+        None|int|tuple
+            actual range 2 - in light of `range1`, `range2` and symmetry
+        """
+
+        def reverse_arg(arg, siz):
+            start, stop, step = arg
+            # read backwards
+            return (siz - 1) - start, (siz - 1) - stop, -step
+
+        real_arg1, real_arg2 = self._validate_arguments(range1, range2)
         if self._symmetry[0]:
-            real_arg1 = reverse_arg(range1, self._data_size[0])
-        else:
-            real_arg1 = extract(range1, self._data_size[0])
-        # validate the second range
+            real_arg1 = reverse_arg(real_arg1, self._data_size[0])
         if self._symmetry[1]:
-            real_arg2 = reverse_arg(range2, self._data_size[1])
-        else:
-            real_arg2 = extract(range2, self._data_size[1])
+            real_arg2 = reverse_arg(real_arg2, self._data_size[1])
 
         # switch the axes symmetry dictates
         real_arg1, real_arg2 = (real_arg2, real_arg1) if self._symmetry[2] else (real_arg1, real_arg2)
         return real_arg1, real_arg2
 
-    def _data_to_complex(self, data):
-        # type: (numpy.ndarray) -> numpy.ndarray
+    def _read_raw_cached(self, range1, range2):
+        """
+        Assembles the same result as :func:`_read_raw_fun` from tiles fetched
+        from `tile_cache`.
+
+        Parameters
+        ----------
+        range1 : None|int|tuple
+        range2 : None|int|tuple
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        def get_blocks(rng, tile_size):
+            # for each tile, get (tile index, output slice, slice within the tile)
+            inds = numpy.arange(*rng, dtype=numpy.int64)
+            tile_inds = inds // tile_size
+            blocks = []
+            for tile_ind in numpy.unique(tile_inds):
+                locs = numpy.nonzero(tile_inds == tile_ind)[0]
+                first = int_func(inds[locs[0]] - tile_ind*tile_size)
+                last = int_func(inds[locs[-1]] - tile_ind*tile_size)
+                step = rng[2]
+                tile_slice = slice(first, None if last + step < 0 else last + step, step)
+                blocks.append((int_func(tile_ind), slice(locs[0], locs[-1] + 1), tile_slice))
+            return inds.size, blocks
+
+        def fetch(tile_row, tile_col):
+            start1 = tile_row*tile_shape[0]
+            start2 = tile_col*tile_shape[1]
+            return self._read_raw_fun(
+                (start1, min(start1 + tile_shape[0], self._data_size[0]), 1),
+                (start2, min(start2 + tile_shape[1], self._data_size[1]), 1))
+
+        arg1, arg2 = self._validate_arguments(range1, range2)
+        tile_shape = self._tile_cache.tile_shape
+        rows, row_blocks = get_blocks(arg1, tile_shape[0])
+        cols, col_blocks = get_blocks(arg2, tile_shape[1])
+        if rows == 0 or cols == 0:
+            # an empty range touches no tiles, so the (empty) uncached read determines the output
+            return self._read_raw_fun(range1, range2)
+
+        out = None
+        for tile_row, out_rows, tile_rows in row_blocks:
+            for tile_col, out_cols, tile_cols in col_blocks:
+                tile = self._tile_cache.get_tile(
+                    self, (tile_row, tile_col), lambda: fetch(tile_row, tile_col))
+                if out is None:
+                    shape = (cols, rows) if self._symmetry[2] else (rows, cols)
+                    out = numpy.empty(shape + tile.shape[2:], dtype=tile.dtype)
+                # the raw data is not yet axis swapped
+                if self._symmetry[2]:
+                    out[out_cols, out_rows] = tile[tile_cols, tile_rows]
+                else:
+                    out[out_rows, out_cols] = tile[tile_rows, tile_cols]
+        return out
+
+    def get_raw_layout(self):
+        """
+        Gets the layout of the raw data in the file, if the complex data is stored
+        band interleaved by pixel, in rectangular regions of contiguous rows, and
+        requires no symmetry transformation. This permits the raw bytes to be
+        copied directly, see :func:`sarpy.io.complex.converter.Converter.transcode_data`.
+
+        Returns
+        -------
+        None|Tuple[str, numpy.dtype, Tuple[Tuple[int, int, int, int, int], ...]]
+            `None` if the data is not stored in this way. Otherwise, the file name,
+            the storage data type (including byte order) of each of the two
+            components of a pixel, and the regions of the form `(offset, row_start,
+            row_end, col_start, col_end)`, where `offset` is the file offset in bytes
+            of the first pixel.
+        """
+
+        return None
+
+    def _data_to_complex(self, data, out=None):
+        """
+        Converts the raw data to complex data.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            The raw data.
+        out : None|numpy.ndarray
+            If provided, the array into which the result will be written, which
+            must have the appropriate shape. This may be a non-contiguous view.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
         if callable(self._complex_type):
-            return self._complex_type(data)  # is this actually necessary?
+            if out is None:
+                return self._complex_type(data)  # is this actually necessary?
+            out[:] = self._complex_type(data)
+            return out
         elif self._complex_type:
-            out = numpy.zeros((data.shape[0], data.shape[1], int_func(data.shape[2]/2)), dtype=numpy.complex64)
-            out.real = data[:, :, 0::2]
-            out.imag = data[:, :, 1::2]
+            if out is None:
+                out = numpy.empty(self._get_complex_shape(data), dtype=numpy.complex64)
+            try:
+                # the real/imaginary interleaved view of out matches the layout of
+                #   the raw data, so the conversion is a single assignment pass
+                view = out.view(numpy.float32 if out.dtype.itemsize == 8 else numpy.float64)
+            except ValueError:
+                # the final axis of out is not contiguous, so no such view is possible
+                view = None
+            if view is not None and view.shape == data.shape:
+                view[:] = data
+            else:
+                out.real = data[:, :, 0::2]
+                out.imag = data[:, :, 1::2]
             return out
         else:
             # nothing to be done
+            if out is not None:
+                out[:] = data
+                return out
             return data
 
     def _reorder_data(self, data):
@@ -392,14 +1027,54 @@ class SubsetChipper(BaseChipper):
         arange2 = _get_range(range2, self.shift2, self._data_size[1])
         return arange1, arange2
 
-    def _read_raw_fun(self, range1, range2):
+    @property
+    def tile_cache(self):
+        """
+        None|TileCache: The tile cache of the parent chipper. Note that setting
+        this modifies the parent chipper.
+        """
+
+        return self.parent_chipper.tile_cache
+
+    @tile_cache.setter
+    def tile_cache(self, value):
+        self.parent_chipper.tile_cache = value
+
+    def _get_segment_row_starts(self):
+        # noinspection PyProtectedMember
+        starts = self.parent_chipper._get_segment_row_starts() - self.shift1
+        starts = starts[(starts > 0) & (starts < self._data_size[0])]
+        return numpy.concatenate(([0, ], starts)).astype(numpy.int64)
+
+    def __call__(self, range1, range2, max_workers=None, out=None, copy=True, raw=False):
+        if not raw:
+            data = self._read_overview(range1, range2, out)
+            if data is not None:
+                return data
+        # no complex conversion or reorientation happens at this level
+        return self._read_raw_fun(range1, range2, max_workers=max_workers, out=out, copy=copy, raw=raw)
+
+    def raw_to_complex(self, data, out=None):
+        return self.parent_chipper.raw_to_complex(data, out=out)
+
+    def _read_raw_fun(self, range1, range2, max_workers=None, out=None, copy=True, raw=False):
         arange1, arange2 = self._reformat_bounds(range1, range2)
-        return self.parent_chipper.__call__(arange1, arange2)
+        return self.parent_chipper.__call__(
+            arange1, arange2, max_workers=max_workers, out=out, copy=copy, raw=raw)
 
 
 class BaseReader(object):
     """
-    Abstract file reader class
+    Abstract file reader class. Readers may be pickled, for example for use in a
+    process pool, and this preserves the parsed metadata while any file handles
+    are reopened upon first use in the unpickled reader.
+
+    **Thread safety:** a single reader instance may serve concurrent reads from
+    multiple threads, for example for a threaded chip server, without any global
+    lock. Data is read using memory maps, positional reads (i.e. `pread`) which do
+    not modify any shared file position, per-thread handles (gdal) or an internally
+    locked handle (HDF5). Only on platforms without positional reads is a seek and
+    read serialized, using a lock per file handle. Any tile cache is thread-safe.
     """
 
     __slots__ = ('_sicd_meta', '_chipper', '_data_size')
@@ -454,6 +1129,12 @@ class BaseReader(object):
         self._chipper = chipper
         self._data_size = data_size
 
+    def __getstate__(self):
+        return _get_slot_state(self)
+
+    def __setstate__(self, state):
+        _set_slot_state(self, state)
+
     @property
     def sicd_meta(self):
         """
@@ -479,13 +1160,13 @@ class BaseReader(object):
         Tuple[SICDType]
         """
 
-        if self._sicd_meta is None:
+        if self.sicd_meta is None:
             return None
-        elif isinstance(self._sicd_meta, tuple):
-            return self._sicd_meta
+        elif isinstance(self.sicd_meta, tuple):
+            return self.sicd_meta
         else:
             # noinspection PyRedundantParentheses
-            return (self._sicd_meta, )
+            return (self.sicd_meta, )
 
     def get_data_size_as_tuple(self):
         """
@@ -528,7 +1209,7 @@ class BaseReader(object):
                 return item[:2], index
         return item, 0
 
-    def __call__(self, range1, range2, index=0):
+    def __call__(self, range1, range2, index=0, max_workers=None, out=None, copy=True, raw=False):
         """
         Reads and fetches data. Note that :code:`reader(range1, range2, index)` is an alias
         for :code:`reader.read_chip(range1, range2, index)`.
@@ -538,17 +1219,18 @@ class BaseReader(object):
         range1 : None|int|tuple
         range2 : None|int|tuple
         index : None|int
+        max_workers : None|int
+        out : None|numpy.ndarray
+        copy : bool
+        raw : bool
 
         Returns
         -------
         numpy.ndarray
         """
 
-        if isinstance(self._chipper, tuple):
-            index = self._validate_index(index)
-            return self._chipper[index](range1, range2)
-        else:
-            return self._chipper(range1, range2)
+        return self.read_chip(
+            range1, range2, index=index, max_workers=max_workers, out=out, copy=copy, raw=raw)
 
     def __getitem__(self, item):
         """
@@ -570,7 +1252,7 @@ class BaseReader(object):
         else:
             return self._chipper.__getitem__(item)
 
-    def read_chip(self, dim1range, dim2range, index=None):
+    def read_chip(self, dim1range, dim2range, index=None, max_workers=None, out=None, copy=True, raw=False):
         """
         Read the given section of data as an array.
 
@@ -585,6 +1267,32 @@ class BaseReader(object):
         index : int|None
             Relative to which sicd/chipper, and only used in the event of multiple
             sicd/chippers. Defaults to `0`, if not provided.
+        max_workers : None|int
+            The maximum number of worker threads to use for reading. This is only
+            relevant for chippers which support concurrent reading, for example
+            the multiple image segment SICD chipper. The default (`None`) defers to
+            the value set on the chipper, if any.
+        out : None|numpy.ndarray
+            If provided, a preallocated array (generally of dtype complex64) of
+            exactly the output shape, into which the data will be written directly.
+            This avoids any intermediate allocation for repeated reads of the
+            same size, and `out` is returned.
+        copy : bool
+            If `False`, then a read-only view of the underlying file storage
+            (i.e. the memory map) will be returned whenever the storage layout
+            permits, for example `RE32F_IM32F` SICD data within a single image
+            segment. The view preserves the file byte order, so may be of dtype
+            `>c8`. Otherwise, this falls back to returning a copy, in the same
+            manner as the `copy` argument of :func:`numpy.ndarray.astype`.
+            This is ignored if `out` is provided.
+        raw : bool
+            If `True`, then the data is returned in the storage data type without
+            complex conversion, for example int16 for `RE16I_IM16I` or uint8 for
+            `AMP8I_PHS8I` SICD data, which avoids the memory cost of complex64.
+            The result has shape `(rows, columns, bands)`, where the component
+            pairs are adjacent in the final dimension. A copy is in native byte
+            order, while a view (`copy=False`) preserves the file byte order. Any
+            overviews are not used. See :func:`raw_to_complex` for conversion.
 
         Returns
         -------
@@ -616,9 +1324,358 @@ class BaseReader(object):
 
         if isinstance(self._chipper, tuple):
             index = self._validate_index(index)
-            return self._chipper[index](dim1range, dim2range)
+            return self._chipper[index](
+                dim1range, dim2range, max_workers=max_workers, out=out, copy=copy, raw=raw)
+        else:
+            return self._chipper(dim1range, dim2range, max_workers=max_workers, out=out, copy=copy, raw=raw)
+
+    def raw_to_complex(self, data, index=None, out=None):
+        """
+        Converts data read using :code:`read_chip(..., raw=True)` to complex64
+        data. The conversion is element-wise, so this may be applied to any block
+        of the raw data, and only that block is inflated.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            The raw data, of shape `(rows, columns, bands)`.
+        index : None|int
+            Relative to which sicd/chipper the data was read.
+        out : None|numpy.ndarray
+            If provided, the array into which the result will be written.
+
+        Returns
+        -------
+        numpy.ndarray
+
+        Examples
+        --------
+        .. code-block:: python
+
+            raw_data = reader.read_chip((0, 4096), (0, 4096), raw=True)
+            complex_block = reader.raw_to_complex(raw_data[:512, :512])
+        """
+
+        index = self._validate_index(index)
+        return self._get_chippers_as_tuple()[index].raw_to_complex(data, out=out)
+
+    def read_points(self, rows, cols, window=None, index=None, max_workers=None, fill_value=0):
+        """
+        Read the complex values at many scattered pixel locations, optionally with
+        a neighborhood around each. The points are grouped by image segment and
+        block of rows, and then into clusters of nearby columns, and each cluster
+        is satisfied by a single read of its bounding region. This is much more
+        efficient than reading each point separately.
+
+        Parameters
+        ----------
+        rows : int|numpy.ndarray|list|tuple
+            The row indices of the points.
+        cols : int|numpy.ndarray|list|tuple
+            The column indices of the points, of the same shape as `rows`.
+        window : None|int|Tuple[int, int]
+            The neighborhood shape of the form `(height, width)`. The window for
+            the point `(row, col)` begins at `(row - height//2, col - width//2)`,
+            so is centered on odd sizes. If `None`, then only the point values are
+            read.
+        index : None|int
+            Relative to which sicd/chipper, and only used in the event of multiple
+            sicd/chippers. Defaults to `0`, if not provided.
+        max_workers : None|int
+            Passed through to :func:`read_chip` for each region.
+        fill_value : complex
+            The value for any neighborhood pixels which lie outside of the image.
+
+        Returns
+        -------
+        numpy.ndarray
+            Of dtype complex64 and shape `rows.shape` if `window` is `None`, and
+            `rows.shape + (height, width)` otherwise.
+        """
+
+        index = self._validate_index(index)
+        data_size = self._get_chippers_as_tuple()[index].data_size
+        rows = numpy.asarray(rows)
+        cols = numpy.asarray(cols)
+        if rows.size == 0 and cols.size == 0:
+            rows, cols = rows.astype(numpy.int64), cols.astype(numpy.int64)
+        if rows.shape != cols.shape:
+            raise ValueError('rows has shape {}, and cols has shape {}'.format(rows.shape, cols.shape))
+        if not (numpy.issubdtype(rows.dtype, numpy.integer) and numpy.issubdtype(cols.dtype, numpy.integer)):
+            raise TypeError('rows and cols must be integer valued, got types {} and {}'.format(rows.dtype, cols.dtype))
+        out_shape = rows.shape
+        rows = numpy.reshape(rows, (-1, )).astype(numpy.int64)
+        cols = numpy.reshape(cols, (-1, )).astype(numpy.int64)
+        if rows.size > 0 and (rows.min() < 0 or rows.max() >= data_size[0] or
+                              cols.min() < 0 or cols.max() >= data_size[1]):
+            raise ValueError('All points must lie in the image of size {}'.format(data_size))
+
+        if window is None:
+            height, width = 1, 1
         else:
-            return self._chipper(dim1range, dim2range)
+            if isinstance(window, integer_types):
+                window = (window, window)
+            height, width = int_func(window[0]), int_func(window[1])
+            if height < 1 or width < 1:
+                raise ValueError('window entries must be positive, got {}'.format(window))
+            out_shape = out_shape + (height, width)
+        # the first row and column of each neighborhood, and the offsets within it
+        first_rows = rows - height//2
+        first_cols = cols - width//2
+        row_offsets = numpy.arange(height, dtype=numpy.int64)
+        col_offsets = numpy.arange(width, dtype=numpy.int64)
+
+        out = numpy.empty((rows.size, height, width), dtype=numpy.complex64)
+        # noinspection PyProtectedMember
+        segment_starts = self._get_chippers_as_tuple()[index]._get_segment_row_starts()
+        for group in _get_point_groups(rows, cols, segment_starts):
+            # the bounding region of the neighborhoods, restricted to the image
+            row_start = max(0, int_func(first_rows[group].min()))
+            row_end = min(data_size[0], int_func(first_rows[group].max()) + height)
+            col_start = max(0, int_func(first_cols[group].min()))
+            col_end = min(data_size[1], int_func(first_cols[group].max()) + width)
+            region = self.read_chip(
+                (row_start, row_end, 1), (col_start, col_end, 1), index=index, max_workers=max_workers)
+
+            # the neighborhood pixel locations, with those outside the image masked
+            the_rows = first_rows[group, numpy.newaxis] + row_offsets
+            the_cols = first_cols[group, numpy.newaxis] + col_offsets
+            valid = ((the_rows >= 0) & (the_rows < data_size[0]))[:, :, numpy.newaxis] & \
+                ((the_cols >= 0) & (the_cols < data_size[1]))[:, numpy.newaxis, :]
+            local_rows = numpy.clip(the_rows - row_start, 0, row_end - row_start - 1)
+            local_cols = numpy.clip(the_cols - col_start, 0, col_end - col_start - 1)
+            values = region[local_rows[:, :, numpy.newaxis], local_cols[:, numpy.newaxis, :]]
+            values[~valid] = fill_value
+            out[group] = values
+        return numpy.reshape(out, out_shape)
+
+    def iter_blocks(self, block_shape=None, max_bytes=None, overlap=0, index=None,
+                    row_limits=None, col_limits=None, prefetch=1, raw=False):
+        r"""
+        Iterate over the image (or the given portion of the image) in blocks. The
+        subsequent block(s) are read on a background thread while the consumer
+        processes the current block, so that reading and processing overlap.
+
+        Parameters
+        ----------
+        block_shape : None|Tuple[None|int, None|int]
+            The block shape of the form `(rows, columns)`, where a `None` entry
+            indicates the full extent. If not provided, then each block consists
+            of full rows, with the number of rows determined by `max_bytes`.
+        max_bytes : None|int
+            The (nominal) maximum size in bytes of each block of complex64 data,
+            which is only used if `block_shape` is not provided. Default value is
+            :math:`2^{26} = 64~\text{MB}`.
+        overlap : int|Tuple[int, int]
+            The number of rows and columns by which each block is extended on each
+            side, restricted to the row and column limits.
+        index : None|int
+            Relative to which sicd/chipper, and only used in the event of multiple
+            sicd/chippers. Defaults to `0`, if not provided.
+        row_limits : None|Tuple[int, int]
+            Row start/stop. Default is all.
+        col_limits : None|Tuple[int, int]
+            Column start/stop. Default is all.
+        prefetch : int
+            The maximum number of blocks read ahead of the consumer, so this bounds
+            the memory usage. If `0`, then each block is read only when requested.
+        raw : bool
+            If `True`, then the blocks are read in the storage data type. See
+            the `raw` argument of :func:`read_chip`.
+
+        Yields
+        ------
+        (slice, slice, numpy.ndarray)
+            The row slice and column slice of the block, and the block data.
+
+        Examples
+        --------
+        .. code-block:: python
+
+            for row_slice, col_slice, data in reader.iter_blocks(max_bytes=2**24):
+                process(data)
+        """
+
+        index = self._validate_index(index)
+        data_size = self._get_chippers_as_tuple()[index].data_size
+        row_limits = _validate_limits(row_limits, data_size[0], 'row_limits')
+        col_limits = _validate_limits(col_limits, data_size[1], 'col_limits')
+        if isinstance(overlap, integer_types):
+            overlap = (overlap, overlap)
+        overlap = (int_func(overlap[0]), int_func(overlap[1]))
+        if overlap[0] < 0 or overlap[1] < 0:
+            raise ValueError('overlap entries must be non-negative, got {}'.format(overlap))
+        prefetch = int_func(prefetch)
+        if prefetch < 0:
+            raise ValueError('prefetch must be non-negative, got {}'.format(prefetch))
+
+        if block_shape is None:
+            if max_bytes is None:
+                max_bytes = 2**26
+            block_shape = (max(1, int_func(max_bytes/(8*(col_limits[1] - col_limits[0])))), None)
+        block_rows = row_limits[1] - row_limits[0] if block_shape[0] is None else int_func(block_shape[0])
+        block_cols = col_limits[1] - col_limits[0] if block_shape[1] is None else int_func(block_shape[1])
+        if block_rows < 1 or block_cols < 1:
+            raise ValueError('block_shape entries must be positive, got {}'.format(block_shape))
+
+        col_slices = _get_block_slices(col_limits, block_cols, overlap[1])
+        blocks = [(row_slice, col_slice) for row_slice in _get_block_slices(row_limits, block_rows, overlap[0])
+                  for col_slice in col_slices]
+
+        def read_block(row_slice, col_slice):
+            return row_slice, col_slice, self.read_chip(
+                (row_slice.start, row_slice.stop, 1), (col_slice.start, col_slice.stop, 1), index=index, raw=raw)
+
+        if prefetch == 0:
+            for entry in blocks:
+                yield read_block(*entry)
+            return
+
+        results = queue.Queue(maxsize=prefetch)
+        stopped = threading.Event()
+
+        def put(item):
+            # NB: give up if the consumer has stopped, so the thread terminates
+            while not stopped.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce():
+            try:
+                for entry in blocks:
+                    if stopped.is_set():
+                        return
+                    put(read_block(*entry))
+            except Exception as e:
+                put(e)
+                return
+            put(None)  # signals completion
+
+        thread = threading.Thread(target=produce)
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+            thread.join()
+
+    def enable_tile_cache(self, tile_shape=(512, 512), max_bytes=2**28):
+        """
+        Enables caching of data tiles for all chippers of this reader, so that
+        repeated or overlapping reads are served from memory. A single cache,
+        and so a single byte budget, is shared by all chippers.
+
+        Parameters
+        ----------
+        tile_shape : Tuple[int, int]
+            The tile shape of the form `(rows, columns)`.
+        max_bytes : int
+            The maximum number of bytes held in cached tiles.
+
+        Returns
+        -------
+        TileCache
+            The cache, which provides hit/miss statistics.
+        """
+
+        cache = TileCache(tile_shape=tile_shape, max_bytes=max_bytes)
+        for chipper in self._get_chippers_as_tuple():
+            chipper.tile_cache = cache
+        return cache
+
+    def disable_tile_cache(self):
+        """
+        Disables, and releases, any tile cache for the chippers of this reader.
+
+        Returns
+        -------
+        None
+        """
+
+        for chipper in self._get_chippers_as_tuple():
+            chipper.tile_cache = None
+
+    def enable_overviews(self, file_name, serve_complex=False, source_file=None):
+        """
+        Enables serving decimated reads for all chippers of this reader from the
+        given overview sidecar file, see
+        :func:`sarpy.io.complex.overview.build_overviews`.
+
+        Parameters
+        ----------
+        file_name : str
+            The overview sidecar file name.
+        serve_complex : bool
+            Serve reads from the complex multilooked data, rather than the
+            detected amplitude. This requires that the complex data is present.
+        source_file : None|str
+            If provided, the source image file, whose size and modification time
+            must match those recorded in the sidecar, or an `IOError` is raised.
+
+        Returns
+        -------
+        Overviews
+        """
+
+        overviews = Overviews(file_name, serve_complex=serve_complex, source_file=source_file)
+        chippers = self._get_chippers_as_tuple()
+        if len(overviews) != len(chippers):
+            raise ValueError(
+                'The overview file {} has {} images, but this reader has {}'.format(
+                    file_name, len(overviews), len(chippers)))
+        for chipper, overview in zip(chippers, overviews.images):
+            chipper.overview = overview
+        return overviews
+
+    def disable_overviews(self):
+        """
+        Disables serving reads from overviews for the chippers of this reader.
+
+        Returns
+        -------
+        None
+        """
+
+        for chipper in self._get_chippers_as_tuple():
+            chipper.overview = None
+
+    def close(self):
+        """
+        Closes the open file resources of the chippers of this reader, where
+        supported. Any subsequent read reopens the file.
+
+        Returns
+        -------
+        None
+        """
+
+        for chipper in self._get_chippers_as_tuple():
+            if hasattr(chipper, 'close'):
+                chipper.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    def _get_chippers_as_tuple(self):
+        # type: () -> Tuple[BaseChipper, ...]
+        if isinstance(self._chipper, tuple):
+            return self._chipper
+        else:
+            # noinspection PyRedundantParentheses
+            return (self._chipper, )
 
     def get_suggestive_name(self, frame=None):
         """
@@ -638,7 +1695,8 @@ class BaseReader(object):
             frame = 0
         else:
             frame = int_func(frame)
-        the_sicd = self._sicd_meta if isinstance(self._sicd_meta, SICDType) else self._sicd_meta[frame]
+        sicd_meta = self.sicd_meta
+        the_sicd = sicd_meta if isinstance(sicd_meta, SICDType) else sicd_meta[frame]
         core_name = ''
         try:
             core_name += the_sicd.CollectionInfo.CoreName
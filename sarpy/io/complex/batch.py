@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""
+Batch conversion of many complex data products (for example, Sentinel SAFE
+directories, RadarSat/RCM products, Cosmo SkyMed HDF5 files or SIO files) to
+SICD, SIO or SICD archive format, using a pool of processes.
+
+Each output is written to a temporary file with the suffix :code:`.partial`,
+which is renamed to the final name only once the writer reports that it has
+been fully written (see :attr:`sarpy.io.complex.sicd.SICDWriter.fully_written`).
+A small json marker file with the suffix :code:`.complete` is then written next
+to the output, recording its size. When the batch is rerun, an existing output
+is skipped only if it has a matching marker, and is otherwise reconverted.
+
+Examples
+--------
+.. code-block:: python
+
+    from sarpy.io.complex.batch import get_jobs, batch_conversion
+
+    jobs = get_jobs('/data/output', patterns=['/data/input/*.SAFE', '/data/input/*.h5'])
+    summary = batch_conversion(jobs, max_workers=4, memory_limit=2**33, summary_file='summary.json')
+"""
+
+import os
+import glob
+import json
+import logging
+import traceback
+from collections import OrderedDict
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    # this is python 2 without the futures backport
+    ProcessPoolExecutor = None
+
+try:
+    import resource
+except ImportError:
+    # resource is unavailable on windows
+    resource = None
+
+from .base import int_func
+# noinspection PyProtectedMember
+from .converter import open_complex, Converter, timer, _writer_types
+
+__classification__ = "UNCLASSIFIED"
+__author__ = "Thomas McCullough"
+
+
+# the suffix of an output file which is still being written
+_PARTIAL_SUFFIX = '.partial'
+# the suffix of the marker file written once an output is complete
+_COMPLETE_SUFFIX = '.complete'
+# whether the memory limit has been applied to this (worker) process
+_MEMORY_LIMIT_SET = False
+# the fraction of the memory limit used for each block of data being converted
+_MEMORY_BLOCK_FRACTION = 16
+
+
+def load_manifest(file_name, output_directory=None, output_format='SICD'):
+    """
+    Loads the job manifest. This is either a json file containing a list whose
+    entries are input file names or job dictionaries (see :func:`get_jobs`), or
+    a text file with one input file name per line, where blank lines and lines
+    starting with `#` are ignored.
+
+    Parameters
+    ----------
+    file_name : str
+    output_directory : None|str
+        The output directory for any job which does not specify one.
+    output_format : str
+        The output format for any job which does not specify one.
+
+    Returns
+    -------
+    List[dict]
+    """
+
+    with open(file_name, 'r') as fi:
+        contents = fi.read()
+    try:
+        entries = json.loads(contents)
+    except ValueError:
+        entries = [line.strip() for line in contents.splitlines()]
+        entries = [entry for entry in entries if len(entry) > 0 and not entry.startswith('#')]
+    if not isinstance(entries, list):
+        raise ValueError('The manifest {} must contain a list of jobs.'.format(file_name))
+    return get_jobs(output_directory, entries=entries, output_format=output_format)
+
+
+def get_jobs(output_directory, entries=None, patterns=None, output_format='SICD'):
+    """
+    Gets the validated job dictionaries. Each job has keys `'input_file'`,
+    `'output_directory'`, `'frames'` (`None` for all) and `'output_format'`.
+
+    Parameters
+    ----------
+    output_directory : None|str
+        The output directory for any job which does not specify one.
+    entries : None|List[str|dict]
+        The input file names, or job dictionaries which must have the key
+        `'input_file'`, and may have any of the other keys.
+    patterns : None|List[str]
+        Glob patterns for input files (or directories), each matching input
+        yielding a job.
+    output_format : str
+        The output format for any job which does not specify one, from
+        {'SICD', 'SIO', 'ARCHIVE'}.
+
+    Returns
+    -------
+    List[dict]
+    """
+
+    entries = [] if entries is None else list(entries)
+    if patterns is not None:
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern))
+            if len(matches) == 0:
+                logging.warning('The pattern {} matches no files.'.format(pattern))
+            entries.extend(matches)
+
+    jobs = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            entry = {'input_file': entry}
+        if 'input_file' not in entry:
+            raise ValueError('Each job requires an input_file, got {}'.format(entry))
+        job = {
+            'input_file': entry['input_file'],
+            'output_directory': entry.get('output_directory', output_directory),
+            'frames': entry.get('frames', None),
+            'output_format': entry.get('output_format', output_format).upper()}
+        if job['output_directory'] is None:
+            raise ValueError('No output directory is given for job {}'.format(entry))
+        if job['output_format'] not in _writer_types:
+            raise ValueError('Got unexpected output_format {}'.format(job['output_format']))
+        if isinstance(job['frames'], int):
+            job['frames'] = [job['frames'], ]
+        jobs.append(job)
+    return jobs
+
+
+def _is_complete(file_name, data_size):
+    """
+    Checks whether the output file has a completion marker, written by this batch
+    once the output was fully written, which matches the expected image size and
+    the present size of the output file.
+
+    Parameters
+    ----------
+    file_name : str
+    data_size : Tuple[int, int]
+
+    Returns
+    -------
+    bool
+    """
+
+    if not os.path.isfile(file_name):
+        return False
+    marker_file = file_name + _COMPLETE_SUFFIX
+    if not os.path.isfile(marker_file):
+        logging.warning('The existing output {} has no completion marker, and will be replaced.'.format(file_name))
+        return False
+    try:
+        with open(marker_file, 'r') as fi:
+            marker = json.load(fi)
+    except (IOError, OSError, ValueError):
+        logging.warning('The completion marker for {} can not be read, and will be replaced.'.format(file_name))
+        return False
+    if not isinstance(marker, dict) or \
+            marker.get('data_size', None) != [int_func(entry) for entry in data_size] or \
+            marker.get('file_size', None) != os.path.getsize(file_name):
+        logging.warning(
+            'The existing output {} does not match its completion marker, and will be replaced.'.format(file_name))
+        return False
+    return True
+
+
+def _write_marker(file_name, data_size):
+    """
+    Writes the completion marker for the fully written output file.
+
+    Parameters
+    ----------
+    file_name : str
+    data_size : Tuple[int, int]
+
+    Returns
+    -------
+    None
+    """
+
+    marker = OrderedDict([
+        ('data_size', [int_func(entry) for entry in data_size]),
+        ('file_size', os.path.getsize(file_name))])
+    with open(file_name + _COMPLETE_SUFFIX, 'w') as fi:
+        json.dump(marker, fi)
+
+
+def _remove(file_name):
+    if os.path.exists(file_name):
+        os.remove(file_name)
+
+
+def _convert_frame(reader, frame, output_directory, output_file, output_format, max_block_size, transcode=False):
+    """
+    Converts (or transcodes, if requested and possible) the given frame to a
+    temporary file, which is renamed to the output file if fully written.
+
+    Returns
+    -------
+    dict
+        The output description.
+    """
+
+    file_name = os.path.join(output_directory, output_file)
+    partial_file = output_file + _PARTIAL_SUFFIX
+    # remove anything left by an interrupted conversion
+    _remove(os.path.join(output_directory, partial_file))
+
+    start = timer()
+    with Converter(
+            reader, output_directory, output_file=partial_file, frame=frame,
+            output_format=output_format) as converter:
+        if transcode and converter.can_transcode:
+            stats = converter.transcode_data(max_block_size=max_block_size)
+        else:
+            stats = converter.write_data(max_block_size=max_block_size)
+        writer = converter.writer
+        # NB: the SIO writer provides no such check
+        complete = getattr(writer, 'fully_written', True)
+    if not complete:
+        _remove(os.path.join(output_directory, partial_file))
+        raise IOError('The output {} was not fully written.'.format(file_name))
+    os.rename(os.path.join(output_directory, partial_file), file_name)
+    _write_marker(file_name, reader.get_data_size_as_tuple()[frame])
+
+    rows, cols = reader.get_data_size_as_tuple()[frame]
+    output = OrderedDict([
+        ('frame', frame), ('output_file', file_name), ('status', 'converted'),
+        ('elapsed', timer() - start), ('bytes_read', 8*rows*cols),
+        ('bytes_written', os.path.getsize(file_name))])
+    if 'methods' in stats:
+        output['bytes_read'] = stats['bytes']
+        output['transcode'] = stats
+    else:
+        output['stages'] = OrderedDict((stage, stats[stage]) for stage in ['read', 'convert', 'write'])
+    return output
+
+
+def run_job(job, max_block_size=None, transcode=False):
+    """
+    Performs the conversion job, skipping any output which is already complete.
+    Any exception is recorded in the result, rather than raised.
+
+    Parameters
+    ----------
+    job : dict
+        See :func:`get_jobs`.
+    max_block_size : None|int
+        (nominal) maximum block size in bytes, see :func:`Converter.write_data`.
+    transcode : bool
+        Copy the raw data directly, without decoding, where possible. See
+        :func:`sarpy.io.complex.converter.Converter.transcode_data`.
+
+    Returns
+    -------
+    OrderedDict
+        The job result, with the status `'converted'`, `'skipped'` (all outputs
+        were already complete) or `'failed'`.
+    """
+
+    start = timer()
+    result = OrderedDict([
+        ('input_file', job['input_file']), ('status', None), ('elapsed', None),
+        ('bytes_read', 0), ('bytes_written', 0), ('outputs', []), ('error', None)])
+    # noinspection PyBroadException
+    try:
+        reader = open_complex(job['input_file'])
+        sizes = reader.get_data_size_as_tuple()
+        frames = range(len(sizes)) if job['frames'] is None else [int_func(entry) for entry in job['frames']]
+        for frame in frames:
+            output_file = reader.get_suggestive_name(frame=frame)
+            file_name = os.path.join(job['output_directory'], output_file)
+            if _is_complete(file_name, sizes[frame]):
+                logging.info('Skipping frame {} of {}, since {} is complete.'.format(
+                    frame, job['input_file'], file_name))
+                result['outputs'].append(OrderedDict([
+                    ('frame', frame), ('output_file', file_name), ('status', 'skipped')]))
+                continue
+            _remove(file_name + _COMPLETE_SUFFIX)
+            _remove(file_name)
+            output = _convert_frame(
+                reader, frame, job['output_directory'], output_file, job['output_format'], max_block_size,
+                transcode=transcode)
+            result['bytes_read'] += output['bytes_read']
+            result['bytes_written'] += output['bytes_written']
+            result['outputs'].append(output)
+        converted = any(entry['status'] == 'converted' for entry in result['outputs'])
+        result['status'] = 'converted' if converted else 'skipped'
+    except Exception as e:
+        logging.error('Conversion of {} failed with exception {}'.format(job['input_file'], e))
+        result['status'] = 'failed'
+        result['error'] = traceback.format_exc()
+    result['elapsed'] = timer() - start
+    return result
+
+
+def _set_memory_limit(memory_limit):
+    """
+    Sets the (address space) memory limit of a worker process, once per process.
+
+    Parameters
+    ----------
+    memory_limit : None|int
+
+    Returns
+    -------
+    None
+    """
+
+    global _MEMORY_LIMIT_SET
+    if memory_limit is None or _MEMORY_LIMIT_SET:
+        return
+    _MEMORY_LIMIT_SET = True
+    if resource is None:
+        logging.warning('Memory limits are not supported on this platform.')
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        memory_limit = min(memory_limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def _run_worker_job(job, max_block_size, transcode, memory_limit):
+    """
+    Performs the conversion job in a worker process, first applying the memory
+    limit. This is used in place of an executor initializer, which requires
+    python 3.7 or later.
+
+    Returns
+    -------
+    OrderedDict
+        See :func:`run_job`.
+    """
+
+    _set_memory_limit(memory_limit)
+    return run_job(job, max_block_size=max_block_size, transcode=transcode)
+
+
+def batch_conversion(jobs, max_workers=None, memory_limit=None, max_block_size=None, summary_file=None,
+                     transcode=False):
+    """
+    Performs the conversion jobs using a pool of processes. A failed job does
+    not stop the batch, and is recorded in the summary.
+
+    Parameters
+    ----------
+    jobs : List[dict]
+        See :func:`get_jobs` or :func:`load_manifest`.
+    max_workers : None|int
+        The number of worker processes. The default is the number of cpus. If
+        `1`, the jobs are performed serially in this process.
+    memory_limit : None|int
+        The memory limit in bytes for each worker process, enforced as the limit
+        of its address space where supported. A job exceeding the limit fails.
+        Unless `max_block_size` is given, the blocks of data converted are also
+        sized according to this limit. This is not applied if performed serially
+        in this process.
+    max_block_size : None|int
+        (nominal) maximum block size in bytes, see :func:`Converter.write_data`.
+    summary_file : None|str
+        If provided, the json summary is written to this file.
+    transcode : bool
+        Copy the raw data directly, without decoding, where possible. This
+        applies to SICD and SIO inputs converted to SICD or SIO format.
+
+    Returns
+    -------
+    OrderedDict
+        The summary, with the result of each job and totals.
+    """
+
+    if max_workers is None:
+        max_workers = os.cpu_count() if hasattr(os, 'cpu_count') else 1
+    max_workers = max(1, int_func(max_workers))
+    if memory_limit is not None:
+        memory_limit = int_func(memory_limit)
+        if max_block_size is None:
+            max_block_size = memory_limit//_MEMORY_BLOCK_FRACTION
+
+    start = timer()
+    if max_workers == 1 or len(jobs) < 2 or ProcessPoolExecutor is None:
+        results = [run_job(job, max_block_size=max_block_size, transcode=transcode) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            futures = [
+                executor.submit(_run_worker_job, job, max_block_size, transcode, memory_limit) for job in jobs]
+            results = []
+            for job, future in zip(jobs, futures):
+                # noinspection PyBroadException
+                try:
+                    results.append(future.result())
+                except Exception:
+                    # the worker process itself failed, for example by running out of memory
+                    results.append(OrderedDict([
+                        ('input_file', job['input_file']), ('status', 'failed'), ('elapsed', None),
+                        ('bytes_read', 0), ('bytes_written', 0), ('outputs', []),
+                        ('error', traceback.format_exc())]))
+
+    elapsed = timer() - start
+    counts = OrderedDict((status, sum(1 for entry in results if entry['status'] == status))
+                         for status in ['converted', 'skipped', 'failed'])
+    bytes_read = sum(entry['bytes_read'] for entry in results)
+    summary = OrderedDict([
+        ('jobs', len(jobs)), ('counts', counts), ('elapsed', elapsed),
+        ('bytes_read', bytes_read), ('bytes_written', sum(entry['bytes_written'] for entry in results)),
+        ('throughput', bytes_read/elapsed if elapsed > 0 else 0.), ('results', results)])
+    logging.info(
+        'Batch of {} jobs completed in {:.1f} s, with {} converted, {} skipped and {} failed.'.format(
+            len(jobs), elapsed, counts['converted'], counts['skipped'], counts['failed']))
+    if summary_file is not None:
+        with open(summary_file, 'w') as fi:
+            json.dump(summary, fi, indent=1)
+    return summary
@@ -7,6 +7,7 @@ data stored in *Band Interleaved By Pixel (BIP)* format.
 import logging
 import os
 import sys
+import threading
 
 import numpy
 
@@ -23,13 +24,342 @@ __classification__ = "UNCLASSIFIED"
 __author__ = "Thomas McCullough"
 
 
+# the largest unused gap between required byte spans, for which two reads will
+#   be coalesced into a single read
+_MAX_READ_GAP = 2**18
+# the (nominal) largest size of a single coalesced read
+_MAX_READ_SIZE = 2**26
+# positional reads do not modify the shared file position, so are thread-safe
+_HAS_PREADV = hasattr(os, 'preadv')
+_HAS_PREAD = hasattr(os, 'pread')
+# the output engines of BIPWriter
+_WRITE_ENGINES = ('memmap', 'pwrite')
+# the default maximum number of bytes being written at once by a PositionalWriter
+_DEFAULT_MAX_IN_FLIGHT = 2**26
+
+
+def _get_read_groups(rows, row_size, span_size):
+    """
+    Groups the (increasing) required rows into runs, each of which can be read
+    efficiently using a single read.
+
+    Parameters
+    ----------
+    rows : numpy.ndarray
+        The increasing array of rows, with constant step.
+    row_size : int
+        The size of a full row in bytes.
+    span_size : int
+        The number of bytes required from each row.
+
+    Returns
+    -------
+    List[Tuple[int, int, int]]
+        Entries of the form `(first, last, size)`, where `rows[first:last]` will be
+        read using a single read of `size` bytes.
+    """
+
+    row_step = int_func(rows[1] - rows[0]) if rows.size > 1 else 1
+    gap = row_step*row_size - span_size
+    if gap <= _MAX_READ_GAP:
+        rows_per_group = max(1, int_func((_MAX_READ_SIZE - span_size)/(row_step*row_size)) + 1)
+    else:
+        rows_per_group = 1
+    groups = []
+    for first in range(0, rows.size, rows_per_group):
+        last = min(first + rows_per_group, rows.size)
+        groups.append((first, last, (last - first - 1)*row_step*row_size + span_size))
+    return groups
+
+
+def _read_into(fid, buffer, offset, lock=None):
+    """
+    Read from the given file offset, populating the given buffer. A positional
+    read is used, where supported by the platform, so that concurrent reads
+    using the same file object are safe. Otherwise, the seek and read is performed
+    while holding `lock`, if provided.
+
+    Parameters
+    ----------
+    fid : file
+    buffer : numpy.ndarray
+        Contiguous uint8 array.
+    offset : int
+    lock : None|threading.Lock
+
+    Returns
+    -------
+    None
+    """
+
+    view = memoryview(buffer)
+    size = buffer.nbytes
+    if _HAS_PREADV:
+        position = 0
+        while position < size:
+            count = os.preadv(fid.fileno(), [view[position:]], offset + position)
+            if count == 0:
+                raise IOError('Unexpected end of file at offset {}'.format(offset + position))
+            position += count
+    elif _HAS_PREAD:
+        position = 0
+        while position < size:
+            chunk = os.pread(fid.fileno(), size - position, offset + position)
+            if len(chunk) == 0:
+                raise IOError('Unexpected end of file at offset {}'.format(offset + position))
+            view[position:position + len(chunk)] = chunk
+            position += len(chunk)
+    else:
+        if lock is not None:
+            lock.acquire()
+        try:
+            fid.seek(offset)
+            count = fid.readinto(view)
+        finally:
+            if lock is not None:
+                lock.release()
+        if count != size:
+            raise IOError('Unexpected end of file at offset {}'.format(offset + count))
+
+
+def _write_from(fid, data, offset, lock=None):
+    """
+    Write the contents of the given array at the given file offset. A positional
+    write is used, where supported by the platform, and otherwise the seek and
+    write is performed holding `lock`, if provided.
+
+    Parameters
+    ----------
+    fid : file
+    data : numpy.ndarray
+        Contiguous array.
+    offset : int
+    lock : None|threading.Lock
+
+    Returns
+    -------
+    None
+    """
+
+    view = memoryview(data.reshape((-1, )).view(numpy.uint8))
+    if hasattr(os, 'pwrite'):
+        position = 0
+        while position < data.nbytes:
+            count = os.pwrite(fid.fileno(), view[position:], offset + position)
+            if count == 0:
+                raise IOError('Failed writing to file at offset {}'.format(offset + position))
+            position += count
+    else:
+        if lock is not None:
+            lock.acquire()
+        try:
+            fid.seek(offset)
+            fid.write(view)
+        finally:
+            if lock is not None:
+                lock.release()
+
+
+class PositionalWriter(object):
+    """
+    Writes to a file using positional writes (i.e. `pwrite`, where supported),
+    rather than a memory map, which avoids accumulating large amounts of dirty
+    page cache. Concurrent non-overlapping writes from multiple threads are safe.
+
+    The number of bytes being written at once is limited by `max_in_flight`, and
+    writes from other threads wait while this is reached. Optionally, the file
+    is flushed to disk (using `fdatasync`, or `fsync`) each time `sync_bytes`
+    have been written, so that writeback happens steadily through the job rather
+    than in large stalls, and the page cache for the file is then released
+    (using `posix_fadvise`), so that a large output does not displace the page
+    cache of other processes.
+    """
+
+    __slots__ = (
+        '_file_name', '_fid', '_max_in_flight', '_sync_bytes', '_fadvise', '_condition',
+        '_in_flight', '_unsynced', '_bytes_written', '_sync_count', '_sync_lock', '_lock')
+
+    def __init__(self, file_name, max_in_flight=None, sync_bytes=None, fadvise=False):
+        """
+
+        Parameters
+        ----------
+        file_name : str
+            The file, which must exist, and is opened for updating.
+        max_in_flight : None|int
+            The maximum number of bytes being written at once, where larger writes
+            are split. Default value is :math:`2^{26}` bytes.
+        sync_bytes : None|int
+            If provided, the file is flushed to disk each time this many bytes
+            have been written, and upon closing.
+        fadvise : bool
+            Release the page cache for the file after each flush to disk. This
+            requires `sync_bytes`, and is ignored where `posix_fadvise` is unsupported.
+        """
+
+        if max_in_flight is None:
+            max_in_flight = _DEFAULT_MAX_IN_FLIGHT
+        max_in_flight = int_func(max_in_flight)
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be positive, got {}'.format(max_in_flight))
+        if sync_bytes is not None:
+            sync_bytes = int_func(sync_bytes)
+            if sync_bytes < 1:
+                raise ValueError('sync_bytes must be positive, got {}'.format(sync_bytes))
+        fadvise = bool(fadvise)
+        if fadvise and sync_bytes is None:
+            raise ValueError('fadvise requires that sync_bytes is provided.')
+        if fadvise and not hasattr(os, 'posix_fadvise'):
+            logging.warning('posix_fadvise is not supported on this platform, and will not be used.')
+            fadvise = False
+
+        self._file_name = file_name
+        self._max_in_flight = max_in_flight
+        self._sync_bytes = sync_bytes
+        self._fadvise = fadvise
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._unsynced = 0
+        self._bytes_written = 0
+        self._sync_count = 0
+        self._sync_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._fid = open(file_name, mode='r+b')
+
+    @property
+    def file_name(self):
+        """
+        str: The file name.
+        """
+
+        return self._file_name
+
+    @property
+    def bytes_written(self):
+        """
+        int: The number of bytes written.
+        """
+
+        return self._bytes_written
+
+    @property
+    def sync_count(self):
+        """
+        int: The number of times that the file has been flushed to disk.
+        """
+
+        return self._sync_count
+
+    def write(self, data, offset):
+        """
+        Write the contents of the given array at the given file offset.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            Contiguous array.
+        offset : int
+
+        Returns
+        -------
+        None
+        """
+
+        buffer = data.reshape((-1, )).view(numpy.uint8)
+        for start in range(0, buffer.size, self._max_in_flight):
+            chunk = buffer[start:start + self._max_in_flight]
+            with self._condition:
+                while self._in_flight > 0 and self._in_flight + chunk.size > self._max_in_flight:
+                    self._condition.wait()
+                self._in_flight += chunk.size
+            try:
+                _write_from(self._fid, chunk, offset + start, lock=self._lock)
+            finally:
+                with self._condition:
+                    self._in_flight -= chunk.size
+                    self._unsynced += chunk.size
+                    self._bytes_written += chunk.size
+                    sync = self._sync_bytes is not None and self._unsynced >= self._sync_bytes
+                    if sync:
+                        self._unsynced = 0
+                    self._condition.notify_all()
+            if sync:
+                self.sync()
+
+    def sync(self):
+        """
+        Flush the file to disk, and release its page cache if `fadvise` is enabled.
+
+        Returns
+        -------
+        None
+        """
+
+        with self._sync_lock:
+            if not hasattr(os, 'pwrite'):
+                # the fallback writes are buffered
+                with self._lock:
+                    self._fid.flush()
+            getattr(os, 'fdatasync', os.fsync)(self._fid.fileno())
+            if self._fadvise:
+                os.posix_fadvise(self._fid.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            self._sync_count += 1
+
+    def close(self):
+        """
+        Close the file, after flushing to disk if `sync_bytes` is provided.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._fid is None or self._fid.closed:
+            return
+        try:
+            if self._sync_bytes is not None:
+                self.sync()
+        finally:
+            self._fid.close()
+
+
+def _validate_engine(engine, engine_options):
+    """
+    Validates the output engine for :class:`BIPWriter`.
+
+    Parameters
+    ----------
+    engine : None|str
+    engine_options : None|dict
+
+    Returns
+    -------
+    (str, dict)
+    """
+
+    if engine is None:
+        engine = 'memmap'
+    engine = engine.lower()
+    if engine not in _WRITE_ENGINES:
+        raise ValueError('engine must be one of {}, got {}'.format(_WRITE_ENGINES, engine))
+    engine_options = {} if engine_options is None else dict(engine_options)
+    if engine == 'memmap' and len(engine_options) > 0:
+        raise ValueError('engine_options are only applicable for the pwrite engine.')
+    unexpected = set(engine_options.keys()).difference(('max_in_flight', 'sync_bytes', 'fadvise'))
+    if len(unexpected) > 0:
+        raise ValueError('Got unexpected engine_options {}'.format(sorted(unexpected)))
+    return engine, engine_options
+
+
 class BIPChipper(BaseChipper):
     """
-    Band interleaved format file chipper
+    Band interleaved format file chipper. Concurrent reads from multiple threads
+    are safe, since the data is read using the memory map or, in the fallback
+    case, using positional reads.
     """
 
     __slots__ = (
-        '_file_name', '_data_type', '_data_offset', '_shape', '_bands', '_memory_map', '_fid')
+        '_file_name', '_data_type', '_data_offset', '_shape', '_bands', '_memory_map', '_fid', '_lock')
 
     def __init__(self, file_name, data_type, data_size,
                  symmetry=(False, False, False), complex_type=False,
@@ -78,72 +408,135 @@ class BIPChipper(BaseChipper):
 
         self._memory_map = None
         self._fid = None
-        try:
-            self._memory_map = numpy.memmap(self._file_name,
-                                            dtype=data_type,
-                                            mode='r',
-                                            offset=data_offset,
-                                            shape=self._shape)  # type: numpy.memmap
-        except (OverflowError, OSError):
-            # if 32-bit python, then we'll fail for any file larger than 2GB
-            # we fall-back to a slower version of reading manually
-            self._fid = open(self._file_name, mode='rb')
-            logging.warning(
-                'Falling back to reading file {} manually (instead of using mem-map). This has almost '
-                'certainly occurred because you are 32-bit python to try to read (portions of) a file '
-                'which is larger than 2GB.'.format(self._file_name))
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        """
+        Opens the memory map of the file, or falls back to a file handle, if
+        neither is open.
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            if self._memory_map is not None or self._fid is not None:
+                return
+            try:
+                self._memory_map = numpy.memmap(self._file_name,
+                                                dtype=self._data_type,
+                                                mode='r',
+                                                offset=self._data_offset,
+                                                shape=self._shape)  # type: numpy.memmap
+            except (OverflowError, OSError):
+                # if 32-bit python, then we'll fail for any file larger than 2GB
+                # we fall-back to a slower version of reading manually
+                self._fid = open(self._file_name, mode='rb')
+                logging.warning(
+                    'Falling back to reading file {} manually (instead of using mem-map). This has almost '
+                    'certainly occurred because you are 32-bit python to try to read (portions of) a file '
+                    'which is larger than 2GB.'.format(self._file_name))
+
+    def __getstate__(self):
+        # the memory map or file handle is reopened upon first use
+        state = super(BIPChipper, self).__getstate__()
+        state['_memory_map'] = None
+        state['_fid'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        super(BIPChipper, self).__setstate__(state)
+        self._lock = threading.Lock()
+
+    def close(self):
+        """
+        Closes the memory map or file handle, if open. The file will be reopened
+        upon any subsequent read.
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            self._memory_map = None
+            if self._fid is not None:
+                fid = self._fid
+                self._fid = None
+                if not fid.closed:
+                    fid.close()
 
     def __del__(self):
         if hasattr(self, '_fid') and self._fid is not None and \
                 hasattr(self._fid, 'closed') and not self._fid.closed:
             self._fid.close()
 
+    def get_raw_layout(self):
+        if self._bands != 2 or any(self._symmetry):
+            return None
+        return self._file_name, numpy.dtype(self._data_type), \
+            ((self._data_offset, 0, self._shape[0], 0, self._shape[1]), )
+
     def _read_raw_fun(self, range1, range2):
         range1, range2 = self._reorder_arguments(range1, range2)
+        if self._memory_map is None and self._fid is None:
+            self._open()
         if self._memory_map is not None:
             return self._read_memory_map(range1, range2)
         elif self._fid is not None:
             return self._read_file(range1, range2)
 
     def _read_memory_map(self, range1, range2):
+        # NB: this is a view into the memory map, and it's the responsibility of
+        #   the caller to copy or convert as appropriate
         if (range1[1] == -1 and range1[2] < 0) and (range2[1] == -1 and range2[2] < 0):
-            out = numpy.array(self._memory_map[range1[0]::range1[2], range2[0]::range2[2]], dtype=self._data_type)
+            out = self._memory_map[range1[0]::range1[2], range2[0]::range2[2]]
         elif range1[1] == -1 and range1[2] < 0:
-            out = numpy.array(self._memory_map[range1[0]::range1[2], range2[0]:range2[1]:range2[2]], dtype=self._data_type)
+            out = self._memory_map[range1[0]::range1[2], range2[0]:range2[1]:range2[2]]
         elif range2[1] == -1 and range2[2] < 0:
-            out = numpy.array(self._memory_map[range1[0]:range1[1]:range1[2], range2[0]::range2[2]],
-                              dtype=self._data_type)
+            out = self._memory_map[range1[0]:range1[1]:range1[2], range2[0]::range2[2]]
         else:
-            out = numpy.array(self._memory_map[range1[0]:range1[1]:range1[2], range2[0]:range2[1]:range2[2]],
-                              dtype=self._data_type)
+            out = self._memory_map[range1[0]:range1[1]:range1[2], range2[0]:range2[1]:range2[2]]
         return out
 
     def _read_file(self, range1, range2):
-        def get_row_location(rr, cc):
-            return self._data_offset + \
-                   rr*stride + \
-                   cc*element_size
-
         # we have to manually map out the stride and all that for the array ourselves
-        element_size = int_func(numpy.dtype(self._data_type).itemsize*self._bands)
-        stride = element_size*int_func(self._shape[0])  # how much to skip a whole (real) row?
-        entries_per_row = abs(range1[1] - range1[0])  # not including the stride, if not +/-1
+        data_type = numpy.dtype(self._data_type)
+        element_size = int_func(data_type.itemsize*self._bands)
+        row_size = element_size*int_func(self._shape[1])  # how much to skip a whole (real) row?
         # let's determine the specific row/column arrays that we are going to read
-        dim1array = numpy.arange(range1)
-        dim2array = numpy.arange(range2)
+        rows = numpy.arange(*range1, dtype=numpy.int64)
+        cols = numpy.arange(*range2, dtype=numpy.int64)
         # allocate our output array
-        out = numpy.empty((len(dim1array), len(dim2array), self._bands), dtype=self._data_type)
-        # determine the first column reading location (may be reading cols backwards)
-        col_begin = dim2array[0] if range2[2] > 0 else dim2array[-1]
-
-        for i, row in enumerate(dim1array):
-            # go to the appropriate point in the file for (row/col)
-            self._fid.seek(get_row_location(row, col_begin))
-            # interpret this of line as numpy.ndarray - inherently flat array
-            line = numpy.fromfile(self._fid, self._data_type, entries_per_row*self._bands)
-            # note that we purposely read without considering skipping elements, which
-            #   is factored in (along with any potential order reversal) below
-            out[i, :, :] = line[::range2[2]]
+        out = numpy.empty((rows.size, cols.size, self._bands), dtype=data_type)
+        if rows.size == 0 or cols.size == 0:
+            return out
+        # work in increasing row and column order, and populate out accordingly
+        row_step, col_step = abs(range1[2]), abs(range2[2])
+        if range1[2] < 0:
+            rows, out_view = rows[::-1], out[::-1]
+        else:
+            out_view = out
+        if range2[2] < 0:
+            cols, out_view = cols[::-1], out_view[:, ::-1]
+        # each row requires the bytes for the span of columns [col_start, col_end)
+        col_start, col_end = int_func(cols[0]), int_func(cols[-1]) + 1
+        span_size = (col_end - col_start)*element_size
+
+        groups = _get_read_groups(rows, row_size, span_size)
+        buffer = numpy.empty((max(size for _, _, size in groups), ), dtype=numpy.uint8)
+        for first, last, size in groups:
+            # read the bytes covering rows[first:last] in a single positional read
+            offset = self._data_offset + int_func(rows[first])*row_size + col_start*element_size
+            _read_into(self._fid, buffer[:size], offset, lock=self._lock)
+            # interpret the buffer as the required rows, with the column span
+            block = numpy.ndarray(
+                (last - first, col_end - col_start, self._bands), dtype=data_type, buffer=buffer,
+                strides=(row_size*row_step, element_size, data_type.itemsize))
+            out_view[first:last] = block[:, ::col_step]
         return out
 
 
@@ -151,14 +544,21 @@ class BIPWriter(AbstractWriter):
     """
     For writing the SICD data into the NITF container. This is abstracted generally
     because an array of these writers is used for multi-image segment NITF files.
-    That is, SICD with enough rows/columns.
+    That is, SICD with enough rows/columns. Non-overlapping blocks may be written
+    concurrently from multiple threads.
+
+    The data is written using a memory map by default. For very large outputs,
+    the positional write engine (see :class:`PositionalWriter`) avoids the
+    writeback stalls caused by accumulating dirty page cache, and provides more
+    predictable write bandwidth.
     """
 
     __slots__ = (
         '_data_size', '_data_type', '_complex_type', '_data_offset',
-        '_shape', '_memory_map', '_fid')
+        '_shape', '_memory_map', '_output')
 
-    def __init__(self, file_name, data_size, data_type, complex_type, data_offset=0):
+    def __init__(self, file_name, data_size, data_type, complex_type, data_offset=0,
+                 engine='memmap', engine_options=None):
         """
         For writing the SICD data into the NITF container. This is abstracted generally
         because an array of these writers is used for multi-image segment NITF files.
@@ -189,8 +589,15 @@ class BIPWriter(AbstractWriter):
               match `data_type`.
         data_offset : int
             byte offset from the start of the file at which the data actually starts
+        engine : str
+            The output engine, one of `'memmap'` (write using a memory map) or
+            `'pwrite'` (write contiguous runs of rows using positional writes).
+        engine_options : None|dict
+            The keyword arguments `max_in_flight`, `sync_bytes` and `fadvise` of
+            :class:`PositionalWriter`, for the `'pwrite'` engine.
         """
 
+        engine, engine_options = _validate_engine(engine, engine_options)
         super(BIPWriter, self).__init__(file_name)
         if not isinstance(data_size, tuple):
             data_size = tuple(data_size)
@@ -225,7 +632,10 @@ class BIPWriter(AbstractWriter):
             self._shape = (self._data_size[0], self._data_size[1], 2)
 
         self._memory_map = None
-        self._fid = None
+        self._output = None
+        if engine == 'pwrite':
+            self._output = PositionalWriter(self._file_name, **engine_options)
+            return
         try:
             self._memory_map = numpy.memmap(self._file_name,
                                             dtype=self._data_type,
@@ -235,7 +645,7 @@ class BIPWriter(AbstractWriter):
         except (OverflowError, OSError):
             # if 32-bit python, then we'll fail for any file larger than 2GB
             # we fall-back to a slower version of reading manually
-            self._fid = open(self._file_name, mode='r+b')
+            self._output = PositionalWriter(self._file_name)
             logging.warning(
                 'Falling back to writing file {} manually (instead of using mem-map). This has almost '
                 'certainly occurred because you are 32-bit python to try to read (portions of) a file '
@@ -244,27 +654,27 @@ class BIPWriter(AbstractWriter):
     def write_chip(self, data, start_indices=(0, 0)):
         self.__call__(data, start_indices=start_indices)
 
-    def __call__(self, data, start_indices=(0, 0)):
+    def convert(self, data):
         """
-        Write the specified data.
+        Converts the data to the storage data type, without writing. This is the
+        conversion performed by :func:`__call__`, so that it may be performed
+        separately (for example, in another thread), and the result written
+        using the `raw` argument of :func:`__call__`.
 
         Parameters
         ----------
         data : numpy.ndarray
-        start_indices : tuple
 
         Returns
         -------
-        None
+        numpy.ndarray
+            Of the storage data type (in native byte order), and of shape
+            `(rows, columns, 2)` for complex data.
         """
 
-        # NB: it is expected that start-indices has been validate before getting here
         if not isinstance(data, numpy.ndarray):
             raise TypeError('Requires data is a numpy.ndarray, got {}'.format(type(data)))
 
-        start1, stop1 = start_indices[0], start_indices[0] + data.shape[0]
-        start2, stop2 = start_indices[1], start_indices[1] + data.shape[1]
-
         # make sure we are using the proper data ordering
         if not data.flags.c_contiguous:
             data = numpy.ascontiguousarray(data)
@@ -273,14 +683,14 @@ class BIPWriter(AbstractWriter):
             if data.dtype.name != self._data_type.name:
                 raise ValueError(
                     'Writer expects data type {}, and got data of type {}.'.format(self._data_type, data.dtype))
-            self._call(start1, stop1, start2, stop2, data)
+            return data
         elif callable(self._complex_type):
             new_data = self._complex_type(data)
             if new_data.dtype.name != self._data_type.name:
                 raise ValueError(
                     'Writer expects data type {}, and got data of type {} from the '
                     'callable method complex_type.'.format(self._data_type, new_data.dtype))
-            self._call(start1, stop1, start2, stop2, new_data)
+            return new_data
         else:  # complex_type is True
             if data.dtype.name not in ('complex64', 'complex128'):
                 raise ValueError(
@@ -288,48 +698,106 @@ class BIPWriter(AbstractWriter):
                     'callable method complex_type.'.format(self._data_type, data.dtype))
             if data.dtype.name != 'complex64':
                 data = data.astype(numpy.complex64)
+            return data.view(numpy.float32).reshape((data.shape[0], data.shape[1], 2))
 
-            data_view = data.view(numpy.float32).reshape((data.shape[0], data.shape[1], 2))
-            self._call(start1, stop1, start2, stop2, data_view)
+    def __call__(self, data, start_indices=(0, 0), raw=False):
+        """
+        Write the specified data.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+        start_indices : tuple
+        raw : bool
+            If `True`, then `data` is already of the storage data type, for
+            example as returned by :func:`convert`, and is written directly.
+
+        Returns
+        -------
+        None
+        """
+
+        # NB: it is expected that start-indices has been validate before getting here
+        if not isinstance(data, numpy.ndarray):
+            raise TypeError('Requires data is a numpy.ndarray, got {}'.format(type(data)))
+
+        start1, stop1 = start_indices[0], start_indices[0] + data.shape[0]
+        start2, stop2 = start_indices[1], start_indices[1] + data.shape[1]
+
+        if not raw:
+            data = self.convert(data)
+        elif data.dtype.name != self._data_type.name or data.shape[2:] != self._shape[2:]:
+            raise ValueError(
+                'Writer expects raw data of type {} with trailing shape {}, and got data of '
+                'type {} and shape {}.'.format(self._data_type, self._shape[2:], data.dtype, data.shape))
+        self._call(start1, stop1, start2, stop2, data)
 
     def _call(self, start1, stop1, start2, stop2, data):
         if self._memory_map is not None:
-            self._memory_map[start1:stop1, start2:stop2, :] = data
+            self._memory_map[start1:stop1, start2:stop2] = data
             return
 
-        # we have to fall-back to manually write
+        # write using positional writes
         element_size = int_func(self._data_type.itemsize)
         if len(self._shape) == 3:
             element_size *= int_func(self._shape[2])
-        stride = element_size*int_func(self._data_size[0])
-        # go to the appropriate spot in the file for first entry
-        self._fid.seek(self._data_offset + stride*start1 + element_size*start2)
-        if start1 == 0 and stop1 == self._data_size[0]:
-            # we can write the block all at once
-            data.astype(self._data_type).tofile(self._fid)
+        row_size = element_size*int_func(self._data_size[1])
+        # convert the whole block once, with the required byte order
+        data = numpy.ascontiguousarray(data, dtype=self._data_type)
+        offset = self._data_offset + row_size*start1 + element_size*start2
+        if start2 == 0 and stop2 == self._data_size[1]:
+            # the rows are contiguous in the file, so write the block all at once
+            self._output.write(data, offset)
         else:
             # have to write one row at a time
-            bytes_to_skip_per_row = element_size*(self._data_size[0]-(stop1-start1))
-            for i, row in enumerate(data):
-                # we the row, and then skip to where the next row starts
-                row.astype(self._data_type).tofile(self._fid)
-                if i < len(data) - 1:
-                    # don't seek on last entry (avoid segfault, or whatever)
-                    self._fid.seek(bytes_to_skip_per_row, os.SEEK_CUR)
+            for row in data:
+                self._output.write(row, offset)
+                offset += row_size
+
+    def get_raw_layout(self):
+        """
+        Gets the layout of the complex data in the file, in the form described in
+        :func:`sarpy.io.complex.base.BaseChipper.get_raw_layout`, so that the raw
+        bytes may be written directly.
+
+        Returns
+        -------
+        None|Tuple[str, numpy.dtype, Tuple[Tuple[int, int, int, int, int], ...]]
+        """
+
+        if len(self._shape) != 3 or self._shape[2] != 2:
+            return None
+        return self._file_name, self._data_type, \
+            ((self._data_offset, 0, self._data_size[0], 0, self._data_size[1]), )
+
+    def flush(self):
+        """
+        Flush the data written so far to disk, so that it persists even if the
+        process or host subsequently fails.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._memory_map is not None:
+            self._memory_map.flush()
+        elif self._output is not None:
+            self._output.sync()
 
     def close(self):
         """
         **Should be called on exit.** Cleanly close the file. This is actually only
-        required if memory map failed, and we fell back to manually writing the file.
+        required for the positional write engine, or if memory map failed and we fell
+        back to manually writing the file.
 
         Returns
         -------
         None
         """
 
-        if hasattr(self, '_fid') and self._fid is not None and \
-                hasattr(self._fid, 'closed') and not self._fid.closed:
-            self._fid.close()
+        if hasattr(self, '_output') and self._output is not None:
+            self._output.close()
 
     def __del__(self):
         self.close()
@@ -1,20 +1,29 @@
 # -*- coding: utf-8 -*-
 """
 This module provide utilities for converting from any complex format that we can
-read to SICD or SIO format. The same conversion utility can be used to subset data.
+read to SICD, SIO or SICD archive format. The same conversion utility can be used
+to subset data.
 """
 
 import os
 import sys
+import json
+import errno
+import time
 import pkgutil
+import threading
 from importlib import import_module
 import numpy
 import logging
+from collections import OrderedDict
 from typing import Union, List, Tuple
 
-from .base import BaseReader, int_func
-from .sicd import SICDWriter
-from .sio import SIOWriter
+from .base import BaseReader, int_func, _get_block_slices
+# noinspection PyProtectedMember
+from .bip import _read_into, _write_from
+from .sicd import SICDReader, SICDWriter
+from .sio import SIOReader, SIOWriter
+from .archive import SICDArchiveWriter
 from .sicd_elements.SICD import SICDType
 
 
@@ -22,11 +31,38 @@ __classification__ = "UNCLASSIFIED"
 __author__ = ("Wade Schwartzkopf", "Thomas McCullough")
 
 
+if sys.version_info[0] < 3:
+    # noinspection PyUnresolvedReferences
+    import Queue as queue
+else:
+    import queue
+
+# a monotonic clock, where available
+timer = getattr(time, 'perf_counter', time.time)
+
 ###########
 # Module variables
-_writer_types = {'SICD': SICDWriter, 'SIO': SIOWriter}
+_writer_types = {'SICD': SICDWriter, 'SIO': SIOWriter, 'ARCHIVE': SICDArchiveWriter}
 _openers = []
 _parsed_openers = False
+_signature_openers = OrderedDict()
+# the modules and subpackages which contain no openers, and are skipped by parse_openers
+_skipped_modules = ('sarpy.io.complex.hdf5', 'sarpy.io.complex.sicd_elements', 'sarpy.io.complex.batch')
+# the number of bytes read from the start of a file for signature checking
+_HEADER_SIZE = 4096
+# the stages of the conversion pipeline
+_PIPELINE_STAGES = ('read', 'convert', 'write')
+# the suffix of the journal file for a resumable conversion
+_JOURNAL_SUFFIX = '.journal'
+_JOURNAL_VERSION = 1
+# the storage data type of each pixel component, for each pixel type
+_STORAGE_TYPES = {'RE32F_IM32F': 'float32', 'RE16I_IM16I': 'int16', 'AMP8I_PHS8I': 'uint8'}
+# the readers whose raw data may be copied directly
+_TRANSCODE_READERS = (SICDReader, SIOReader)
+# the errors indicating that an in kernel copy is unsupported for the given files
+_UNSUPPORTED_COPY_ERRORS = tuple(
+    getattr(errno, name) for name in ('EXDEV', 'ENOSYS', 'EINVAL', 'EOPNOTSUPP', 'ENOTSUP', 'EBADF')
+    if hasattr(errno, name))
 
 
 def register_opener(open_func):
@@ -51,9 +87,129 @@ def register_opener(open_func):
         _openers.append(open_func)
 
 
+def register_signature_opener(format_name, module_name, signature_check):
+    """
+    Provide a new opener, which is only imported and tried when the signature
+    check is satisfied. This permits :func:`open_complex` to avoid importing the
+    module and attempting to parse the file for formats which clearly do not apply.
+
+    Parameters
+    ----------
+    format_name : str
+        The format name, which is the registry key. Registering an existing
+        format name replaces the prior entry.
+    module_name : str
+        The fully qualified name of the module, which is required to have an
+        :func:`is_a` function of the form described in :func:`register_opener`.
+    signature_check : callable
+        A function of the form `signature_check(file_name, header)`, returning
+        `True` if the file may be of the given format. `header` is the (up to)
+        first 4096 bytes of the file, or `None` if `file_name` is a directory.
+
+    Returns
+    -------
+    None
+    """
+
+    if not callable(signature_check):
+        raise TypeError('signature_check must be a callable')
+    _signature_openers[format_name] = (module_name, signature_check)
+
+
+def _is_nitf(file_name, header):
+    return header is not None and header[:4] in (b'NITF', b'NSIF')
+
+
+def _is_sio(file_name, header):
+    if header is None or len(header) < 4:
+        return False
+    # any of the magic numbers, in either byte order
+    return header[:4] in (
+        b'\xff\x01\x7f\xfe', b'\xfe\x7f\x01\xff', b'\xff\x02\x7f\xfd', b'\xfd\x7f\x02\xff')
+
+
+def _is_hdf5(file_name, header):
+    # the HDF5 superblock may be located at 0, 512, 1024, 2048 bytes...
+    if header is None:
+        return False
+    for offset in (0, 512, 1024, 2048):
+        if header[offset:offset+8] == b'\x89HDF\r\n\x1a\n':
+            return True
+    return False
+
+
+def _is_tiff(file_name, header):
+    return header is not None and header[:4] in (b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+')
+
+
+def _is_xml(header):
+    return header is not None and header.lstrip()[:1] == b'<'
+
+
+def _is_sentinel(file_name, header):
+    if header is None:
+        return os.path.exists(os.path.join(file_name, 'manifest.safe'))
+    return _is_xml(header)
+
+
+def _is_radarsat(file_name, header):
+    if header is None:
+        return os.path.exists(os.path.join(file_name, 'product.xml')) or \
+            os.path.exists(os.path.join(file_name, 'metadata', 'product.xml'))
+    return _is_xml(header)
+
+
+register_signature_opener('SICD', 'sarpy.io.complex.sicd', _is_nitf)
+register_signature_opener('SIO', 'sarpy.io.complex.sio', _is_sio)
+register_signature_opener('CSK', 'sarpy.io.complex.csk', _is_hdf5)
+register_signature_opener('SICDArchive', 'sarpy.io.complex.archive', _is_hdf5)
+register_signature_opener('Sentinel', 'sarpy.io.complex.sentinel', _is_sentinel)
+register_signature_opener('RadarSat', 'sarpy.io.complex.radarsat', _is_radarsat)
+register_signature_opener('TIFF', 'sarpy.io.complex.tiff', _is_tiff)
+
+
+def _read_header(file_name):
+    """
+    Reads the first bytes of the file, or returns `None` for a directory.
+
+    Parameters
+    ----------
+    file_name : str
+
+    Returns
+    -------
+    None|bytes
+    """
+
+    if os.path.isdir(file_name):
+        return None
+    with open(file_name, 'rb') as fi:
+        return fi.read(_HEADER_SIZE)
+
+
+def get_signature_formats(file_name):
+    """
+    Gets the names of the registered formats whose signature check is satisfied
+    by the given file. This does not import any reader modules.
+
+    Parameters
+    ----------
+    file_name : str
+
+    Returns
+    -------
+    List[str]
+    """
+
+    header = _read_header(file_name)
+    return [format_name for format_name, (_, check) in _signature_openers.items() if check(file_name, header)]
+
+
 def parse_openers():
     """
     Automatically find the viable openers (i.e. :func:`is_a`) in the various modules.
+    The modules registered via :func:`register_signature_opener` are skipped,
+    since these are imported only as required.
 
     Returns
     -------
@@ -64,8 +220,11 @@ def parse_openers():
     if _parsed_openers:
         return
     _parsed_openers = True
+    signature_modules = set(module_name for module_name, _ in _signature_openers.values())
 
     def check_module(mod_name):
+        if mod_name in _skipped_modules or mod_name in signature_modules:
+            return
         # import the module
         import_module(mod_name)
         # fetch the module from the modules dict
@@ -91,6 +250,11 @@ def open_complex(file_name):
     """
     Given a file, try to find and return the appropriate reader object.
 
+    The openers whose signature matches the initial bytes of the file (or the
+    directory contents) are tried first, importing only the relevant modules.
+    If none of these succeed, then any other openers (i.e. those not registered
+    via :func:`register_signature_opener`) are tried in turn.
+
     Parameters
     ----------
     file_name : str
@@ -106,10 +270,21 @@ def open_complex(file_name):
 
     if not os.path.exists(file_name):
         raise IOError('File {} does not exist.'.format(file_name))
+    # try the openers which match the file signature
+    for format_name in get_signature_formats(file_name):
+        module_name, _ = _signature_openers[format_name]
+        reader = import_module(module_name).is_a(file_name)
+        if reader is not None:
+            return reader
+
     # parse openers, if not already done
     parse_openers()
-    # see if we can find a reader though trial and error
+    # see if we can find a reader though trial and error, excluding those
+    #   already tried or ruled out by signature
+    signature_modules = set(module_name for module_name, _ in _signature_openers.values())
     for opener in _openers:
+        if getattr(opener, '__module__', None) in signature_modules:
+            continue
         reader = opener(file_name)
         if reader is not None:
             return reader
@@ -118,16 +293,327 @@ def open_complex(file_name):
     raise IOError('Unable to determine complex image format.')
 
 
+def _run_pipeline(blocks, read_block, convert_block, write_block, queue_size=2):
+    """
+    Processes each block by reading, converting and writing, with the stages
+    performed concurrently and connected by bounded queues, so that (for example)
+    reading block `N+1` overlaps writing block `N`. The read and convert stages
+    run in their own threads, and the write stage runs in the calling thread.
+    Blocks are written in order, and an exception raised by any stage is raised
+    here.
+
+    Parameters
+    ----------
+    blocks : Sequence
+        The block descriptions, passed to each of the stage functions.
+    read_block : callable
+        `read_block(block) -> data`
+    convert_block : callable
+        `convert_block(block, data) -> data`
+    write_block : callable
+        `write_block(block, data) -> None`
+    queue_size : int
+        The maximum number of blocks waiting between each pair of stages, which
+        bounds the memory in use.
+
+    Returns
+    -------
+    OrderedDict
+        The statistics for each stage, keyed by stage name `'read'`, `'convert'`
+        and `'write'`. Each entry is a dictionary with keys `'blocks'`, `'bytes'`
+        (the size of the data produced by the stage, or written), `'busy_time'`
+        (the time in seconds spent performing the stage), `'stall_time'` (the
+        time spent waiting on a neighbouring stage) and `'throughput'` (bytes per
+        second of busy time). The entry `'elapsed'` is the total time in seconds.
+    """
+
+    queue_size = int_func(queue_size)
+    if queue_size < 1:
+        raise ValueError('queue_size must be positive, got {}'.format(queue_size))
+
+    stats = OrderedDict(
+        (stage, {'blocks': 0, 'bytes': 0, 'busy_time': 0., 'stall_time': 0.}) for stage in _PIPELINE_STAGES)
+    read_queue = queue.Queue(maxsize=queue_size)
+    convert_queue = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(the_queue, item, stage):
+        # NB: give up if the consumer has stopped, so the thread terminates
+        start = timer()
+        try:
+            while not stopped.is_set():
+                try:
+                    the_queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        finally:
+            stats[stage]['stall_time'] += timer() - start
+
+    def get(the_queue, stage):
+        start = timer()
+        try:
+            while True:
+                try:
+                    return the_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if stopped.is_set():
+                        return None
+        finally:
+            stats[stage]['stall_time'] += timer() - start
+
+    def perform(stage, function, *args):
+        start = timer()
+        result = function(*args)
+        entry = stats[stage]
+        entry['busy_time'] += timer() - start
+        entry['blocks'] += 1
+        data = args[-1] if result is None else result
+        entry['bytes'] += getattr(data, 'nbytes', 0)
+        return result
+
+    def read_stage():
+        try:
+            for block in blocks:
+                if stopped.is_set():
+                    return
+                put(read_queue, (block, perform('read', read_block, block)), 'read')
+        except Exception as e:
+            put(read_queue, e, 'read')
+            return
+        put(read_queue, None, 'read')  # signals completion
+
+    def convert_stage():
+        try:
+            while True:
+                item = get(read_queue, 'convert')
+                if item is None or isinstance(item, Exception):
+                    put(convert_queue, item, 'convert')
+                    return
+                block, data = item
+                put(convert_queue, (block, perform('convert', convert_block, block, data)), 'convert')
+        except Exception as e:
+            put(convert_queue, e, 'convert')
+
+    threads = [threading.Thread(target=read_stage), threading.Thread(target=convert_stage)]
+    start_time = timer()
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    try:
+        while True:
+            item = get(convert_queue, 'write')
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            perform('write', write_block, *item)
+    finally:
+        stopped.set()
+        for thread in threads:
+            thread.join()
+
+    elapsed = timer() - start_time
+    for stage, entry in stats.items():
+        entry['throughput'] = entry['bytes']/entry['busy_time'] if entry['busy_time'] > 0 else 0.
+        logging.info(
+            'Pipeline {} stage: {} blocks, {:.1f} MB at {:.1f} MB/s, busy {:.3f} s, stalled {:.3f} s'.format(
+                stage, entry['blocks'], entry['bytes']*1e-6, entry['throughput']*1e-6,
+                entry['busy_time'], entry['stall_time']))
+    stats['elapsed'] = elapsed
+    logging.info('Pipeline completed {} blocks in {:.3f} s'.format(stats['write']['blocks'], elapsed))
+    return stats
+
+
+def _validate_max_block_size(max_block_size):
+    """
+    Validates the (nominal) maximum block size in bytes.
+
+    Parameters
+    ----------
+    max_block_size : None|int
+
+    Returns
+    -------
+    int
+    """
+
+    if max_block_size is None:
+        return 2**26
+    return max(2**20, int_func(max_block_size))
+
+
+def _write_journal(file_name, journal):
+    """
+    Writes the journal of a resumable conversion, atomically replacing any
+    existing journal.
+
+    Parameters
+    ----------
+    file_name : str
+    journal : dict
+
+    Returns
+    -------
+    None
+    """
+
+    temp_name = file_name + '.tmp'
+    with open(temp_name, 'w') as fi:
+        json.dump(journal, fi)
+        fi.flush()
+        os.fsync(fi.fileno())
+    # NB: os.rename is atomic on posix, but does not replace on Windows
+    getattr(os, 'replace', os.rename)(temp_name, file_name)
+
+
+def _get_completed_row(journal):
+    """
+    Gets the first row of the first incomplete block, from the completed blocks
+    recorded in the journal.
+
+    Parameters
+    ----------
+    journal : dict
+
+    Returns
+    -------
+    int
+    """
+
+    row = journal['row_limits'][0]
+    for start, stop in sorted(journal['completed']):
+        if start > row:
+            break
+        row = max(row, stop)
+    return row
+
+
+def _is_big_endian(dtype):
+    # type: (numpy.dtype) -> bool
+    return dtype.byteorder == '>' or (dtype.byteorder == '=' and sys.byteorder == 'big')
+
+
+class _RawCopier(object):
+    """
+    Copies byte ranges from one file to another, using an in kernel copy
+    (`os.copy_file_range`, or `os.sendfile`) where supported, and otherwise
+    reading and writing through a buffer, swapping the byte order if required.
+    """
+
+    __slots__ = ('_source', '_destination', '_swap_type', '_buffer', '_methods', '_progress', 'bytes_copied')
+
+    def __init__(self, source, destination, buffer_size, swap_type=None):
+        """
+
+        Parameters
+        ----------
+        source : file
+            Opened for reading, without buffering.
+        destination : file
+            Opened for updating, without buffering.
+        buffer_size : int
+            The buffer size in bytes, which should be a multiple of the item size
+            of `swap_type`.
+        swap_type : None|numpy.dtype
+            If provided, the byte order of each item of this type is swapped.
+        """
+
+        self._source = source
+        self._destination = destination
+        self._swap_type = swap_type
+        self._buffer = numpy.empty((buffer_size, ), dtype=numpy.uint8)
+        self._methods = [] if swap_type is not None else \
+            [name for name in ('copy_file_range', 'sendfile') if hasattr(os, name)]
+        self.bytes_copied = OrderedDict(
+            (name, 0) for name in ('copy_file_range', 'sendfile', 'buffered'))
+        # the (source_offset, destination_offset, count) remaining of the current copy
+        self._progress = None
+
+    def _kernel_copy(self, method, source_offset, destination_offset, count):
+        """
+        Copies using the given in kernel method, recording the progress made in
+        `_progress`, so that a copy which fails may be resumed.
+        """
+
+        src_fd, dst_fd = self._source.fileno(), self._destination.fileno()
+        if method == 'sendfile':
+            # NB: sendfile writes at the current position of the destination
+            os.lseek(dst_fd, destination_offset, os.SEEK_SET)
+        while count > 0:
+            if method == 'sendfile':
+                copied = os.sendfile(dst_fd, src_fd, source_offset, count)
+            else:
+                copied = os.copy_file_range(src_fd, dst_fd, count, source_offset, destination_offset)
+            if copied == 0:
+                raise IOError('Unexpected end of file at offset {}'.format(source_offset))
+            source_offset += copied
+            destination_offset += copied
+            count -= copied
+            self.bytes_copied[method] += copied
+            self._progress = (source_offset, destination_offset, count)
+
+    def copy(self, source_offset, destination_offset, count):
+        """
+        Copies `count` bytes from the source offset to the destination offset.
+
+        Parameters
+        ----------
+        source_offset : int
+        destination_offset : int
+        count : int
+
+        Returns
+        -------
+        None
+        """
+
+        while self._methods:
+            self._progress = (source_offset, destination_offset, count)
+            try:
+                self._kernel_copy(self._methods[0], source_offset, destination_offset, count)
+                return
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_COPY_ERRORS:
+                    raise
+                # resume from the progress made, so that no bytes are copied (or counted) twice
+                source_offset, destination_offset, count = self._progress
+                logging.info('{} is not supported for these files, and will not be used.'.format(self._methods[0]))
+                self._methods.pop(0)
+
+        while count > 0:
+            buffer = self._buffer[:min(count, self._buffer.size)]
+            _read_into(self._source, buffer, source_offset)
+            if self._swap_type is not None:
+                buffer.view(self._swap_type).byteswap(True)
+            _write_from(self._destination, buffer, destination_offset)
+            source_offset += buffer.size
+            destination_offset += buffer.size
+            count -= buffer.size
+            self.bytes_copied['buffered'] += buffer.size
+
+
 class Converter(object):
     """
     This is a class for conversion (of a single frame) of one complex format to
-    SICD or SIO format. Another use case is to create a (contiguous) subset of a
-    given complex dataset. **This class is intended to be used as a context manager.**
+    SICD, SIO or SICD archive format. Another use case is to create a (contiguous)
+    subset of a given complex dataset. **This class is intended to be used as a
+    context manager.**
+
+    A resumable conversion records the blocks of rows completed in a sidecar
+    journal, which is the output file name with suffix `'.journal'`. If the
+    conversion is interrupted, then constructing the converter again with
+    `resume=True` validates the existing output file and journal, and
+    :func:`write_data` continues from the first incomplete block. The journal is
+    removed once the output file is complete.
     """
 
-    __slots__ = ('_reader', '_file_name', '_writer', '_frame', '_row_limits', '_col_limits')
+    __slots__ = (
+        '_reader', '_file_name', '_writer', '_frame', '_row_limits', '_col_limits',
+        '_journal_file', '_journal')
 
-    def __init__(self, reader, output_directory, output_file=None, frame=None, row_limits=None, col_limits=None, output_format='SICD'):
+    def __init__(self, reader, output_directory, output_file=None, frame=None, row_limits=None, col_limits=None,
+                 output_format='SICD', resume=False):
         """
 
         Parameters
@@ -147,7 +633,10 @@ class Converter(object):
         col_limits : None|Tuple[int, int]
            Column start/stop. Default is all.
         output_format : str
-           The output file format to write, from {'SICD', 'SIO'}.  Default is SICD.
+           The output file format to write, from {'SICD', 'SIO', 'ARCHIVE'}.  Default is SICD.
+        resume : bool
+            Perform a resumable conversion, continuing any interrupted conversion
+            to the same output file. This requires the SICD output format.
         """
 
         if not (os.path.exists(output_directory) and os.path.isdir(output_directory)):
@@ -155,15 +644,21 @@ class Converter(object):
         if output_file is None:
             output_file = reader.get_suggestive_name(frame=frame)
         output_path = os.path.join(output_directory, output_file)
-        if os.path.exists(output_path):
+        self._journal_file = output_path + _JOURNAL_SUFFIX if resume else None
+        self._journal = None
+        if os.path.exists(output_path) and not (resume and os.path.exists(self._journal_file)):
             raise IOError('The file {} already exists.'.format(output_path))
+        # is there an interrupted conversion to continue?
+        resuming = resume and os.path.exists(output_path) and os.path.getsize(output_path) > 0
 
         # validate the output format and fetch the writer type
         if output_format is None:
             output_format = 'SICD'
         output_format = output_format.upper()
-        if output_format not in ['SICD', 'SIO']:
+        if output_format not in _writer_types:
             raise ValueError('Got unexpected output_format {}'.format(output_format))
+        if resume and output_format != 'SICD':
+            raise ValueError('A resumable conversion requires output_format SICD, got {}'.format(output_format))
         writer_type = _writer_types[output_format]
 
         if isinstance(reader, BaseReader):
@@ -208,7 +703,55 @@ class Converter(object):
         this_sicd = self._update_sicd(this_sicd, this_shape)
         # set up our writer
         self._file_name = output_path
-        self._writer = writer_type(output_path, this_sicd)
+        if resume:
+            self._writer = writer_type(output_path, this_sicd, resume=True)
+            self._start_journal(this_sicd, resuming)
+        else:
+            self._writer = writer_type(output_path, this_sicd)
+
+    def _start_journal(self, sicd, resuming):
+        """
+        Loads and validates the journal of an interrupted conversion, and records
+        the rows already written with the writer. Otherwise, starts a new journal.
+
+        Parameters
+        ----------
+        sicd : SICDType
+        resuming : bool
+            Whether there is an interrupted conversion to continue.
+
+        Returns
+        -------
+        None
+        """
+
+        journal = {
+            'version': _JOURNAL_VERSION,
+            'output_file': os.path.basename(self._file_name),
+            'frame': self._frame,
+            'row_limits': list(self._row_limits),
+            'col_limits': list(self._col_limits),
+            'pixel_type': sicd.ImageData.PixelType,
+            'completed': []}
+        if resuming:
+            with open(self._journal_file, 'r') as fi:
+                existing = json.load(fi)
+            for key, value in journal.items():
+                if key != 'completed' and existing.get(key, None) != value:
+                    raise ValueError(
+                        'The journal {} has {} = {}, but this conversion has {} = {}, so the '
+                        'conversion cannot be resumed.'.format(
+                            self._journal_file, key, existing.get(key, None), key, value))
+            journal['completed'] = [list(entry) for entry in existing['completed']]
+        # NB: this validates the headers of any existing output file
+        self._writer.prepare_for_writing()
+        completed_rows = _get_completed_row(journal) - self._row_limits[0]
+        if completed_rows > 0:
+            self._writer.mark_written((0, 0), (completed_rows, self._writer.sicd_meta.ImageData.NumCols))
+            logging.info(
+                'Resuming conversion to file {} after {} completed rows'.format(self._file_name, completed_rows))
+        self._journal = journal
+        _write_journal(self._journal_file, journal)
 
     def _update_sicd(self, sicd, t_size):
         # type: (SICDType, Tuple[int, int]) -> SICDType
@@ -233,12 +776,196 @@ class Converter(object):
             bytes_per_row = 2*cols
         return max(1, int_func(round(max_block_size/bytes_per_row)))
 
+    def get_row_slices(self, max_block_size=None):
+        """
+        Gets the slices of the input rows for the blocks written by :func:`write_data`.
+        For a resumable conversion, this only includes the blocks from the first
+        incomplete block.
+
+        Parameters
+        ----------
+        max_block_size : None|int
+            (nominal) maximum block size in bytes, as for :func:`write_data`.
+
+        Returns
+        -------
+        List[slice]
+        """
+
+        rows_per_block = self._get_rows_per_block(_validate_max_block_size(max_block_size))
+        return _get_block_slices(self._get_remaining_row_limits(), rows_per_block, 0)
+
+    def _get_remaining_row_limits(self):
+        # type: () -> Tuple[int, int]
+        if self._journal is None:
+            return self._row_limits
+        return _get_completed_row(self._journal), self._row_limits[1]
+
+    def read_block(self, row_slice):
+        """
+        Reads the complex data for the given block of input rows.
+
+        Parameters
+        ----------
+        row_slice : slice
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        return self._reader.read_chip(
+            (row_slice.start, row_slice.stop, 1), (self._col_limits[0], self._col_limits[1], 1), index=self._frame)
+
+    def convert_block(self, row_slice, data):
+        """
+        Converts the block of complex data to the storage data type of the writer.
+
+        Parameters
+        ----------
+        row_slice : slice
+        data : numpy.ndarray
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        return self._writer.convert(data)
+
+    def write_block(self, row_slice, data):
+        """
+        Writes the converted block of data, as returned by :func:`convert_block`.
+
+        Parameters
+        ----------
+        row_slice : slice
+        data : numpy.ndarray
+
+        Returns
+        -------
+        None
+        """
+
+        self._writer(data, start_indices=(row_slice.start - self._row_limits[0], 0), raw=True)
+        self._record_block(row_slice)
+        logging.info('Done writing block {}-{} to file {}'.format(row_slice.start, row_slice.stop, self._file_name))
+
+    def _record_block(self, row_slice):
+        """
+        For a resumable conversion, flushes the written data to disk and records
+        the completed block in the journal.
+
+        Parameters
+        ----------
+        row_slice : slice
+
+        Returns
+        -------
+        None
+        """
+
+        if self._journal is None:
+            return
+        self._writer.flush()
+        self._journal['completed'].append([row_slice.start, row_slice.stop])
+        _write_journal(self._journal_file, self._journal)
+
     @property
     def writer(self):  # type: () -> Union[SICDWriter, SIOWriter]
         """SICDWriter|SIOWriter: The writer instance."""
         return self._writer
 
-    def write_data(self, max_block_size=None):
+    @property
+    def can_transcode(self):
+        """
+        bool: Whether the raw data can be copied directly, without decoding, by
+        :func:`transcode_data`. This requires a SICD or SIO input, stored without
+        reorientation, and SICD or SIO output. This is not supported for a resumable
+        conversion.
+        """
+
+        if self._journal is not None or not hasattr(self._writer, 'get_raw_layout') or \
+                not isinstance(self._reader, _TRANSCODE_READERS):
+            return False
+        layout = self._reader._get_chippers_as_tuple()[self._frame].get_raw_layout()
+        if layout is None:
+            return False
+        storage_type = _STORAGE_TYPES.get(self._writer.sicd_meta.ImageData.PixelType, None)
+        return layout[1].newbyteorder('=') == numpy.dtype(storage_type)
+
+    def transcode_data(self, max_block_size=None):
+        r"""
+        Copies the raw data directly, without decoding and encoding, swapping the
+        byte order only where the input and output byte orders differ. In kernel
+        copies (`os.copy_file_range`, or `os.sendfile`) are used where supported.
+        This requires that :attr:`can_transcode` is `True`.
+
+        Parameters
+        ----------
+        max_block_size : None|int
+            (nominal) maximum block size in bytes for buffered copies. Minimum value
+            is :math:`2^{20} = 1~\text{MB}`. Default value is :math:`2^{26} = 64~\text{MB}`.
+
+        Returns
+        -------
+        OrderedDict
+            The statistics, with keys `'bytes'`, `'swapped'` (whether the byte order
+            was swapped), `'methods'` (the number of bytes copied by each method),
+            `'elapsed'` and `'throughput'` (bytes per second).
+        """
+
+        if not self.can_transcode:
+            raise ValueError(
+                'The data of frame {} of {} can not be transcoded to {}.'.format(
+                    self._frame, self._reader.get_suggestive_name(self._frame), self._file_name))
+
+        start = timer()
+        src_name, src_type, src_regions = self._reader._get_chippers_as_tuple()[self._frame].get_raw_layout()
+        dst_name, dst_type, dst_regions = self._writer.get_raw_layout()
+        pixel_size = 2*src_type.itemsize
+        swap = src_type.itemsize > 1 and _is_big_endian(src_type) != _is_big_endian(dst_type)
+        buffer_size = pixel_size*max(1, _validate_max_block_size(max_block_size)//pixel_size)
+        row_shift, col_shift = self._row_limits[0], self._col_limits[0]
+
+        with open(src_name, 'rb', buffering=0) as source, open(dst_name, 'r+b', buffering=0) as destination:
+            copier = _RawCopier(source, destination, buffer_size, swap_type=src_type if swap else None)
+            for dst_offset, dst_row0, dst_row1, dst_col0, dst_col1 in dst_regions:
+                # the output region, in input coordinates
+                dst_row0, dst_row1 = dst_row0 + row_shift, dst_row1 + row_shift
+                dst_col0, dst_col1 = dst_col0 + col_shift, dst_col1 + col_shift
+                dst_row_size = pixel_size*(dst_col1 - dst_col0)
+                for src_offset, src_row0, src_row1, src_col0, src_col1 in src_regions:
+                    row0, row1 = max(src_row0, dst_row0), min(src_row1, dst_row1)
+                    col0, col1 = max(src_col0, dst_col0), min(src_col1, dst_col1)
+                    if row0 >= row1 or col0 >= col1:
+                        continue
+                    src_row_size = pixel_size*(src_col1 - src_col0)
+                    src_start = src_offset + (row0 - src_row0)*src_row_size + (col0 - src_col0)*pixel_size
+                    dst_start = dst_offset + (row0 - dst_row0)*dst_row_size + (col0 - dst_col0)*pixel_size
+                    if (col0, col1) == (src_col0, src_col1) == (dst_col0, dst_col1):
+                        # the rows are contiguous in both files
+                        copier.copy(src_start, dst_start, (row1 - row0)*src_row_size)
+                        continue
+                    for row in range(row1 - row0):
+                        copier.copy(
+                            src_start + row*src_row_size, dst_start + row*dst_row_size, (col1 - col0)*pixel_size)
+
+        out_shape = (self._row_limits[1] - self._row_limits[0], self._col_limits[1] - self._col_limits[0])
+        if hasattr(self._writer, 'mark_written'):
+            self._writer.mark_written((0, 0), out_shape)
+        elapsed = timer() - start
+        total = sum(copier.bytes_copied.values())
+        stats = OrderedDict([
+            ('bytes', total), ('swapped', swap), ('methods', copier.bytes_copied), ('elapsed', elapsed),
+            ('throughput', total/elapsed if elapsed > 0 else 0.)])
+        logging.info(
+            'Transcoded {:.1f} MB to file {} in {:.3f} s{}, using {}'.format(
+                total*1e-6, self._file_name, elapsed, ', swapping byte order' if swap else '',
+                ', '.join(name for name, value in copier.bytes_copied.items() if value > 0)))
+        return stats
+
+    def write_data(self, max_block_size=None, pipelined=True, queue_size=2):
         r"""
         Assuming that the desired changes have been made to the writer instance
         nitf header tags, write the data.
@@ -248,29 +975,37 @@ class Converter(object):
         max_block_size : None|int
             (nominal) maximum block size in bytes. Minimum value is :math:`2^{20} = 1~\text{MB}`.
             Default value is :math:`2^{26} = 64~\text{MB}`.
+        pipelined : bool
+            Read, convert and write concurrently, with the stages connected by
+            bounded queues. Otherwise, each block is converted and written in turn,
+            while the next block is read.
+        queue_size : int
+            The maximum number of blocks waiting between each pair of stages, if
+            pipelined.
 
         Returns
         -------
-        None
+        None|OrderedDict
+            The per stage statistics, if pipelined. See :func:`_run_pipeline`.
         """
 
-        # validate max_block_size
-        if max_block_size is None:
-            max_block_size = 2**26
-        else:
-            max_block_size = int_func(max_block_size)
-            if max_block_size < 2**20:
-                max_block_size = 2**20
+        max_block_size = _validate_max_block_size(max_block_size)
+        if pipelined:
+            return _run_pipeline(
+                self.get_row_slices(max_block_size), self.read_block, self.convert_block, self.write_block,
+                queue_size=queue_size)
 
-        # now, write the data
+        # now, write the data, reading the next block while writing the current one
         rows_per_block = self._get_rows_per_block(max_block_size)
-        block_start = self._row_limits[0]
-        while block_start < self._row_limits[1]:
-            block_end = min(block_start + rows_per_block, self._row_limits[1])
-            data = self._reader[block_start:block_end, self._col_limits[0]:self._col_limits[1], self._frame]
-            self._writer.write_chip(data, start_indices=(block_start - self._row_limits[0], 0))
-            logging.info('Done writing block {}-{} to file {}'.format(block_start, block_end, self._file_name))
-            block_start = block_end
+        row_limits = self._get_remaining_row_limits()
+        if row_limits[0] >= row_limits[1]:
+            return
+        for row_slice, _, data in self._reader.iter_blocks(
+                block_shape=(rows_per_block, None), index=self._frame,
+                row_limits=row_limits, col_limits=self._col_limits):
+            self._writer.write_chip(data, start_indices=(row_slice.start - self._row_limits[0], 0))
+            self._record_block(row_slice)
+            logging.info('Done writing block {}-{} to file {}'.format(row_slice.start, row_slice.stop, self._file_name))
 
     def __del__(self):
         if hasattr(self, '_writer'):
@@ -282,6 +1017,9 @@ class Converter(object):
     def __exit__(self, exception_type, exception_value, traceback):
         if exception_type is None:
             self._writer.close()
+            if self._journal is not None and self._writer.fully_written:
+                os.remove(self._journal_file)
+                self._journal = None
         else:
             logging.error(
                 'The {} file converter generated an exception during processing. The file {} may be '
@@ -292,7 +1030,8 @@ class Converter(object):
 
 def conversion_utility(
         input_file, output_directory, output_files=None, frames=None, output_format='SICD',
-        row_limits=None, column_limits=None, max_block_size=None):
+        row_limits=None, column_limits=None, max_block_size=None, pipelined=True, queue_size=2, resume=False,
+        transcode=False):
     """
     Copy SAR complex data to a file of the specified format.
 
@@ -308,17 +1047,32 @@ def conversion_utility(
     frames : None|int|list
        Set of frames to convert. Default is all.
     output_format : str
-       The output file format to write, from {'SICD', 'SIO'}, optional.  Default is SICD.
+       The output file format to write, from {'SICD', 'SIO', 'ARCHIVE'}, optional.  Default is SICD.
     row_limits : None|Tuple[int, int]|List[Tuple[int, int]]
        Rows start/stop. Default is all.
     column_limits : None|Tuple[int, int]|List[Tuple[int, int]]
        Columns start/stop. Default is all.
     max_block_size : None|int
         (nominal) maximum block size in bytes. Passed through to the Converter class.
+    pipelined : bool
+        Read, convert and write concurrently, see :func:`Converter.write_data`.
+        The frames are converted in turn.
+    queue_size : int
+        The maximum number of blocks waiting between each pair of stages, if pipelined.
+    resume : bool
+        Perform resumable conversions, continuing any interrupted conversions to
+        the same output files. See :class:`Converter`.
+    transcode : bool
+        Copy the raw data directly, without decoding, for those frames where this
+        is possible. See :func:`Converter.transcode_data`. The other frames are
+        converted as usual.
 
     Returns
     -------
-    None
+    List[None|OrderedDict]
+        The result for each frame, in order. This is the transcoding statistics
+        for a transcoded frame (see :func:`Converter.transcode_data`), the per stage
+        statistics if pipelined (see :func:`_run_pipeline`), and `None` otherwise.
     """
 
     def validate_lims(lims, typ):
@@ -413,9 +1167,16 @@ def conversion_utility(
     row_limits = validate_lims(row_limits, 'row')
     column_limits = validate_lims(column_limits, 'column')
 
+    # NB: the frames are converted in turn, so that only one output file is open
+    results = []
     for o_file, frame, row_lims, col_lims in zip(output_files, frames, row_limits, column_limits):
         logging.info('Converting frame {} from file {} to file {}'.format(frame, input_file, o_file))
         with Converter(
                 reader, output_directory, output_file=o_file, frame=frame,
-                row_limits=row_lims, col_limits=col_lims, output_format=output_format) as converter:
-            converter.write_data(max_block_size=max_block_size)
+                row_limits=row_lims, col_limits=col_lims, output_format=output_format, resume=resume) as converter:
+            if transcode and converter.can_transcode:
+                results.append(converter.transcode_data(max_block_size=max_block_size))
+            else:
+                results.append(converter.write_data(
+                    max_block_size=max_block_size, pipelined=pipelined, queue_size=queue_size))
+    return results
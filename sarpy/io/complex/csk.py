@@ -35,7 +35,8 @@ from .sicd_elements.ImageFormation import ImageFormationType, TxFrequencyProcTyp
 from .sicd_elements.RMA import RMAType, INCAType
 from .sicd_elements.Radiometric import RadiometricType
 from ...geometry import point_projection
-from .base import BaseChipper, BaseReader, string_types
+from .base import BaseReader, string_types
+from .hdf5 import HDF5Chipper
 from .utils import get_seconds, fit_time_coa_polynomial
 
 __classification__ = "UNCLASSIFIED"
@@ -491,20 +492,14 @@ class CSKDetails(object):
 ################
 # The CSK chipper and reader
 
-class CSKBandChipper(BaseChipper):
-    __slots__ = ('_file_name', '_band_name')
+class CSKBandChipper(HDF5Chipper):
+    __slots__ = ('_band_name', )
 
-    def __init__(self, file_name, band_name, data_size, symmetry):
-        self._file_name = file_name
+    def __init__(self, file_name, band_name, data_size, symmetry, chunk_cache_bytes=None):
         self._band_name = band_name
-        super(CSKBandChipper, self).__init__(data_size, symmetry=symmetry, complex_type=True)
-
-    def _read_raw_fun(self, range1, range2):
-        r1, r2 = self._reorder_arguments(range1, range2)
-        with h5py.File(self._file_name, 'r') as hf:
-            gp = hf['{}/SBI'.format(self._band_name)]
-            data = gp[r1[0]:r1[1]:r1[2], r2[0]:r2[1]:r2[2], :]
-        return data
+        super(CSKBandChipper, self).__init__(
+            file_name, '{}/SBI'.format(band_name), data_size, symmetry=symmetry,
+            complex_type=True, chunk_cache_bytes=chunk_cache_bytes)
 
 
 class CSKReader(BaseReader):
@@ -514,13 +509,16 @@ class CSKReader(BaseReader):
 
     __slots__ = ('_csk_details', )
 
-    def __init__(self, csk_details):
+    def __init__(self, csk_details, chunk_cache_bytes=None):
         """
 
         Parameters
         ----------
         csk_details : str|CSKDetails
             file name or CSKDetails object
+        chunk_cache_bytes : None|int
+            The size in bytes of the HDF5 raw data chunk cache for each band. See
+            :class:`sarpy.io.complex.hdf5.HDF5Chipper`.
         """
 
         if isinstance(csk_details, string_types):
@@ -533,7 +531,9 @@ class CSKReader(BaseReader):
         sicds = []
         for band_name in sicd_data:
             sicds.append(sicd_data[band_name])
-            chippers.append(CSKBandChipper(csk_details.file_name, band_name, shape_dict[band_name], symmetry))
+            chippers.append(CSKBandChipper(
+                csk_details.file_name, band_name, shape_dict[band_name], symmetry,
+                chunk_cache_bytes=chunk_cache_bytes))
         super(CSKReader, self).__init__(tuple(sicds), tuple(chippers))
 
     def get_suggestive_name(self, frame=0):
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+This provides implementation of reading capabilities for files with data stored
+in a (possibly chunked and compressed) HDF5 dataset.
+"""
+
+import logging
+import threading
+
+import numpy
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+from .base import BaseChipper, int_func
+
+__classification__ = "UNCLASSIFIED"
+__author__ = "Thomas McCullough"
+
+
+# the default size of the raw data chunk cache for each open file
+_DEFAULT_CHUNK_CACHE_BYTES = 2**26
+# the number of chunk slots in the chunk cache hash table, which should be prime
+_CHUNK_CACHE_SLOTS = 10007
+# the (nominal) largest size of a single hyperslab read
+_MAX_BAND_BYTES = 2**26
+
+
+def _get_axis_selection(first, last, step, chunk_size):
+    """
+    Determines how to read the (increasing) indices `first, first+step, ..., last`
+    along a given axis of a chunked dataset. If the step is smaller than the chunk
+    size, then every chunk in the span is required anyways, and the contiguous span
+    is read and then subsampled in memory. Otherwise, the strided hyperslab is
+    passed to HDF5, which only visits the chunks actually containing the indices.
+
+    Parameters
+    ----------
+    first : int
+    last : int
+    step : int
+        This must be positive.
+    chunk_size : int
+
+    Returns
+    -------
+    Tuple[slice, int]
+        The slice to pass to HDF5, and the step for subsampling the result in memory.
+    """
+
+    if step < chunk_size:
+        return slice(first, last+1, 1), step
+    return slice(first, last+1, step), 1
+
+
+class HDF5Chipper(BaseChipper):
+    """
+    Chipper for a two (or three, with the final dimension being bands) dimensional
+    HDF5 dataset. The file handle is opened on first use and held open, with the
+    raw data chunk cache configured, to avoid repeatedly opening the file and
+    decompressing the same chunks.
+
+    Reads are performed in bands of rows aligned with the chunk boundaries, and
+    strided reads whose step exceeds the chunk size only visit the chunks which
+    contain required elements.
+    """
+
+    __slots__ = ('_file_name', '_dataset_name', '_chunk_cache_bytes', '_handle', '_dataset', '_lock')
+
+    def __init__(self, file_name, dataset_name, data_size, symmetry=(False, False, False),
+                 complex_type=False, chunk_cache_bytes=None):
+        """
+
+        Parameters
+        ----------
+        file_name : str
+            The name of the HDF5 file.
+        dataset_name : str
+            The path to the dataset in the HDF5 file.
+        data_size : tuple
+            The full size of the data *after* any required transformation. See
+            `data_size` property.
+        symmetry : tuple
+            Describes any required data transformation. See the `symmetry` property.
+        complex_type : callable|bool
+            For complex type handling. See :class:`sarpy.io.complex.base.BaseChipper`.
+        chunk_cache_bytes : None|int
+            The size in bytes of the HDF5 raw data chunk cache for the file handle.
+            The default is :math:`2^{26}` bytes, or 64 MB.
+        """
+
+        if h5py is None:
+            raise ImportError("Can't read HDF5 files, because the h5py dependency is missing.")
+
+        if chunk_cache_bytes is None:
+            chunk_cache_bytes = _DEFAULT_CHUNK_CACHE_BYTES
+        chunk_cache_bytes = int_func(chunk_cache_bytes)
+        if chunk_cache_bytes < 0:
+            raise ValueError('chunk_cache_bytes must be non-negative, got {}'.format(chunk_cache_bytes))
+        self._file_name = file_name
+        self._dataset_name = dataset_name
+        self._chunk_cache_bytes = chunk_cache_bytes
+        self._handle = None
+        self._dataset = None
+        self._lock = threading.Lock()
+        super(HDF5Chipper, self).__init__(data_size, symmetry=symmetry, complex_type=complex_type)
+
+    @property
+    def file_name(self):
+        """
+        str: The name of the HDF5 file.
+        """
+
+        return self._file_name
+
+    @property
+    def dataset_name(self):
+        """
+        str: The path to the dataset in the HDF5 file.
+        """
+
+        return self._dataset_name
+
+    @property
+    def chunk_cache_bytes(self):
+        """
+        int: The size in bytes of the HDF5 raw data chunk cache.
+        """
+
+        return self._chunk_cache_bytes
+
+    def _get_dataset(self):
+        """
+        Gets the dataset, opening the file handle if necessary.
+
+        Returns
+        -------
+        h5py.Dataset
+        """
+
+        with self._lock:
+            if self._dataset is None:
+                try:
+                    self._handle = h5py.File(
+                        self._file_name, 'r', rdcc_nbytes=self._chunk_cache_bytes,
+                        rdcc_nslots=_CHUNK_CACHE_SLOTS)
+                except TypeError:
+                    # older h5py does not permit configuring the chunk cache
+                    logging.warning(
+                        'The installed h5py version does not support configuring the chunk '
+                        'cache, so the default HDF5 chunk cache is being used.')
+                    self._handle = h5py.File(self._file_name, 'r')
+                self._dataset = self._handle[self._dataset_name]
+            return self._dataset
+
+    def __getstate__(self):
+        # the file handle is reopened upon first use
+        state = super(HDF5Chipper, self).__getstate__()
+        state['_handle'] = None
+        state['_dataset'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        super(HDF5Chipper, self).__setstate__(state)
+        self._lock = threading.Lock()
+
+    def close(self):
+        """
+        Closes the file handle, if open. The file will be reopened upon any
+        subsequent read.
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            self._dataset = None
+            if self._handle is not None:
+                handle = self._handle
+                self._handle = None
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+
+    def __del__(self):
+        if hasattr(self, '_handle') and self._handle is not None:
+            self.close()
+
+    def _read_raw_fun(self, range1, range2):
+        range1, range2 = self._reorder_arguments(range1, range2)
+        dataset = self._get_dataset()
+
+        rows = numpy.arange(*range1, dtype=numpy.int64)
+        cols = numpy.arange(*range2, dtype=numpy.int64)
+        out = numpy.empty((rows.size, cols.size) + dataset.shape[2:], dtype=dataset.dtype)
+        if rows.size == 0 or cols.size == 0:
+            return out
+        # work in increasing row and column order, and populate out accordingly
+        if range1[2] < 0:
+            rows, out_view = rows[::-1], out[::-1]
+        else:
+            out_view = out
+        if range2[2] < 0:
+            cols, out_view = cols[::-1], out_view[:, ::-1]
+        row_step, col_step = abs(range1[2]), abs(range2[2])
+
+        chunks = dataset.chunks
+        if chunks is None:
+            # contiguous storage, so treat each row as a chunk
+            chunks = (1, dataset.shape[1])
+        col_slice, col_subsample = _get_axis_selection(
+            int_func(cols[0]), int_func(cols[-1]), col_step, chunks[1])
+
+        # determine bands of rows, aligned with the chunk boundaries, for which
+        #   a single hyperslab read is of modest size
+        element_size = dataset.dtype.itemsize*int_func(numpy.prod(dataset.shape[2:]))
+        span_size = len(range(*col_slice.indices(dataset.shape[1])))*element_size
+        band_rows = chunks[0]*max(1, int_func(_MAX_BAND_BYTES/(chunks[0]*span_size)))
+        band_index = rows//band_rows
+        band_starts = numpy.concatenate(([0, ], numpy.flatnonzero(numpy.diff(band_index)) + 1))
+        band_ends = numpy.concatenate((band_starts[1:], [rows.size, ]))
+        for first, last in zip(band_starts, band_ends):
+            row_slice, row_subsample = _get_axis_selection(
+                int_func(rows[first]), int_func(rows[last-1]), row_step, chunks[0])
+            block = dataset[row_slice, col_slice]
+            out_view[first:last] = block[::row_subsample, ::col_subsample]
+        return out
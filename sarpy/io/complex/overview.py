@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+"""
+Reduced resolution overview (image pyramid) support for complex readers. The
+overviews for all images of a reader are written to a single compact sidecar
+file, and a reader with overviews enabled answers decimated requests (i.e. those
+with a step of at least the smallest level in both dimensions) from the nearest
+overview level, rather than visiting the full resolution file.
+
+Each overview level :math:`L` holds the detected amplitude,
+:math:`\\sqrt{\\text{mean}(|z|^2)}`, over the :math:`L\\times L` blocks of the full
+resolution image, and optionally the complex multilooked data, i.e. the complex
+mean over the same blocks.
+
+The sidecar layout is the eight byte magic :code:`b'SARPYOVR'`, a little endian
+unsigned 32-bit integer giving the length of the utf-8 encoded json header
+which follows, and then the level arrays in C order. Amplitude is stored as
+little endian float32, and complex data as little endian complex64. The header
+optionally records the size and modification time of the source image file, so
+that a stale sidecar can be rejected.
+
+Examples
+--------
+.. code-block:: python
+
+    from sarpy.io.complex.converter import open_complex
+    from sarpy.io.complex.overview import build_overviews, get_overview_file_name
+
+    reader = open_complex(file_name)
+    build_overviews(reader, get_overview_file_name(file_name), source_file=file_name)
+    # this is now served from the level 8 overview
+    data = reader[::8, ::8]
+"""
+
+import os
+import json
+import struct
+import logging
+import threading
+
+import numpy
+
+__classification__ = "UNCLASSIFIED"
+__author__ = "Thomas McCullough"
+
+
+_OVERVIEW_MAGIC = b'SARPYOVR'
+_OVERVIEW_VERSION = 1
+# levels are added to the default pyramid until the overview is smaller than this
+_MIN_OVERVIEW_SIZE = 256
+# the (nominal) size of the blocks of full resolution data read while building
+_DEFAULT_BLOCK_BYTES = 2**26
+
+
+def get_overview_file_name(file_name):
+    """
+    Gets the default overview sidecar file name for the given image file name.
+
+    Parameters
+    ----------
+    file_name : str
+
+    Returns
+    -------
+    str
+    """
+
+    return file_name + '.ovr'
+
+
+def get_default_levels(data_size):
+    """
+    Gets the default overview levels for the given image size, namely the powers
+    of two for which the overview remains at least 256 pixels in each dimension.
+    At least level 2 is always included.
+
+    Parameters
+    ----------
+    data_size : Tuple[int, int]
+
+    Returns
+    -------
+    Tuple[int, ...]
+    """
+
+    levels = []
+    level = 2
+    while min(data_size)//level >= _MIN_OVERVIEW_SIZE:
+        levels.append(level)
+        level *= 2
+    if len(levels) == 0:
+        levels.append(2)
+    return tuple(levels)
+
+
+def _get_source_record(source_file):
+    """
+    Gets the record of the source image file stored in the sidecar header.
+
+    Parameters
+    ----------
+    source_file : str
+
+    Returns
+    -------
+    dict
+    """
+
+    return {'size': int(os.path.getsize(source_file)), 'mtime': float(os.path.getmtime(source_file))}
+
+
+def _validate_levels(levels):
+    """
+    Validates and sorts the levels.
+
+    Parameters
+    ----------
+    levels : Sequence[int]
+
+    Returns
+    -------
+    Tuple[int, ...]
+    """
+
+    if isinstance(levels, int):
+        levels = (levels, )
+    levels = tuple(sorted(set(int(entry) for entry in levels)))
+    if len(levels) == 0:
+        raise ValueError('At least one overview level is required.')
+    if levels[0] < 2:
+        raise ValueError('Overview levels must be at least 2, got {}'.format(levels))
+    return levels
+
+
+def _get_level_shape(data_size, level):
+    return (data_size[0] + level - 1)//level, (data_size[1] + level - 1)//level
+
+
+class OverviewImage(object):
+    """
+    The overview levels for a single image of a sidecar file. This is attached
+    to a chipper, see :attr:`sarpy.io.complex.base.BaseChipper.overview`, and
+    decimated reads are served by :func:`read`.
+    """
+
+    __slots__ = ('_file_name', '_data_size', '_levels', '_serve_complex', '_arrays', '_lock')
+
+    def __init__(self, file_name, data_size, levels, serve_complex=False):
+        """
+
+        Parameters
+        ----------
+        file_name : str
+            The sidecar file name.
+        data_size : Tuple[int, int]
+            The size of the full resolution image.
+        levels : List[dict]
+            The level descriptions from the sidecar header.
+        serve_complex : bool
+            Serve reads from the complex multilooked data, rather than the
+            detected amplitude.
+        """
+
+        self._file_name = file_name
+        self._data_size = (int(data_size[0]), int(data_size[1]))
+        self._levels = dict((int(entry['level']), entry) for entry in levels)
+        self._arrays = {}
+        self._lock = threading.Lock()
+        serve_complex = bool(serve_complex)
+        if serve_complex and not self.has_complex:
+            raise ValueError(
+                'The overview file {} does not contain complex multilooked data.'.format(file_name))
+        self._serve_complex = serve_complex
+
+    def __getstate__(self):
+        # the memory maps are reopened upon first use
+        return {
+            'file_name': self._file_name, 'data_size': self._data_size,
+            'levels': list(self._levels.values()), 'serve_complex': self._serve_complex}
+
+    def __setstate__(self, state):
+        self.__init__(state['file_name'], state['data_size'], state['levels'],
+                      serve_complex=state['serve_complex'])
+
+    @property
+    def file_name(self):
+        """
+        str: The sidecar file name.
+        """
+
+        return self._file_name
+
+    @property
+    def data_size(self):
+        """
+        Tuple[int, int]: The size of the full resolution image.
+        """
+
+        return self._data_size
+
+    @property
+    def levels(self):
+        """
+        Tuple[int, ...]: The overview levels, in increasing order.
+        """
+
+        return tuple(sorted(self._levels.keys()))
+
+    @property
+    def has_complex(self):
+        """
+        bool: Whether the complex multilooked data is present for every level.
+        """
+
+        return all(entry['complex_offset'] is not None for entry in self._levels.values())
+
+    @property
+    def serve_complex(self):
+        """
+        bool: Whether reads are served from the complex multilooked data, rather
+        than the detected amplitude.
+        """
+
+        return self._serve_complex
+
+    def get_level(self, level, complex_data=False):
+        """
+        Gets the (read-only memory mapped) array for the given overview level.
+
+        Parameters
+        ----------
+        level : int
+        complex_data : bool
+            Get the complex multilooked data, rather than the detected amplitude.
+
+        Returns
+        -------
+        numpy.memmap
+        """
+
+        level = int(level)
+        if level not in self._levels:
+            raise KeyError('There is no overview level {}, the levels are {}'.format(level, self.levels))
+        entry = self._levels[level]
+        key = (level, bool(complex_data))
+        with self._lock:
+            if key not in self._arrays:
+                if complex_data:
+                    if entry['complex_offset'] is None:
+                        raise ValueError('There is no complex multilooked data for level {}'.format(level))
+                    dtype, offset = numpy.dtype('<c8'), entry['complex_offset']
+                else:
+                    dtype, offset = numpy.dtype('<f4'), entry['amplitude_offset']
+                self._arrays[key] = numpy.memmap(
+                    self._file_name, dtype=dtype, mode='r', offset=offset, shape=tuple(entry['shape']))
+            return self._arrays[key]
+
+    def select_level(self, step1, step2):
+        """
+        Gets the largest overview level not exceeding either step size.
+
+        Parameters
+        ----------
+        step1 : int
+        step2 : int
+
+        Returns
+        -------
+        None|int
+            `None` if the steps are smaller than every level.
+        """
+
+        max_level = min(abs(step1), abs(step2))
+        candidates = [entry for entry in self.levels if entry <= max_level]
+        return candidates[-1] if len(candidates) > 0 else None
+
+    def read(self, range1, range2):
+        """
+        Reads the decimated data from the nearest overview level. Each output
+        pixel is the overview pixel whose block contains the requested pixel.
+
+        Parameters
+        ----------
+        range1 : Tuple[int, int, int]
+            The validated row range `(start, stop, step)`.
+        range2 : Tuple[int, int, int]
+            The validated column range `(start, stop, step)`.
+
+        Returns
+        -------
+        None|numpy.ndarray
+            The complex64 data, which has zero phase when served from the detected
+            amplitude, or `None` if no overview level is suitable.
+        """
+
+        level = self.select_level(range1[2], range2[2])
+        if level is None:
+            return None
+        rows = numpy.arange(*range1, dtype=numpy.int64)//level
+        cols = numpy.arange(*range2, dtype=numpy.int64)//level
+        array = self.get_level(level, complex_data=self._serve_complex)
+        logging.debug('Serving read from overview level {} of {}'.format(level, self._file_name))
+        return numpy.asarray(array[numpy.ix_(rows, cols)], dtype=numpy.complex64)
+
+
+class Overviews(object):
+    """
+    The contents of an overview sidecar file, which holds the overview levels for
+    each image of a reader.
+    """
+
+    __slots__ = ('_file_name', '_images')
+
+    def __init__(self, file_name, serve_complex=False, source_file=None):
+        """
+
+        Parameters
+        ----------
+        file_name : str
+            The sidecar file name.
+        serve_complex : bool
+            Serve reads from the complex multilooked data, rather than the
+            detected amplitude.
+        source_file : None|str
+            If provided, the source image file, whose size and modification time
+            must match those recorded in the sidecar header.
+        """
+
+        with open(file_name, 'rb') as fi:
+            magic = fi.read(len(_OVERVIEW_MAGIC))
+            if magic != _OVERVIEW_MAGIC:
+                raise IOError('File {} is not a sarpy overview file.'.format(file_name))
+            header_length = struct.unpack('<I', fi.read(4))[0]
+            header = json.loads(fi.read(header_length).decode('utf-8'))
+        if header.get('version', None) != _OVERVIEW_VERSION:
+            raise IOError(
+                'Overview file {} has version {}, and only version {} is '
+                'supported.'.format(file_name, header.get('version', None), _OVERVIEW_VERSION))
+        if source_file is not None and header.get('source', None) != _get_source_record(source_file):
+            raise IOError(
+                'Overview file {} is stale, or was not built for source file {}'.format(file_name, source_file))
+        self._file_name = file_name
+        self._images = tuple(
+            OverviewImage(file_name, entry['data_size'], entry['levels'], serve_complex=serve_complex)
+            for entry in header['images'])
+
+    @property
+    def file_name(self):
+        """
+        str: The sidecar file name.
+        """
+
+        return self._file_name
+
+    @property
+    def images(self):
+        """
+        Tuple[OverviewImage, ...]: The overviews for each image.
+        """
+
+        return self._images
+
+    def __len__(self):
+        return len(self._images)
+
+    def __getitem__(self, item):
+        return self._images[item]
+
+
+def _reduce_blocks(data, factor):
+    """
+    Sums over blocks of size `factor x factor`, where the final blocks in each
+    dimension may be partial.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+    factor : int
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+
+    data = numpy.add.reduceat(data, numpy.arange(0, data.shape[0], factor), axis=0)
+    return numpy.add.reduceat(data, numpy.arange(0, data.shape[1], factor), axis=1)
+
+
+def _get_block_rows(levels, columns, max_bytes):
+    """
+    Gets the number of full resolution rows read at a time, which is a multiple
+    of every level, so that each block maps to whole rows of every overview.
+    """
+
+    multiple = 1
+    for level in levels:
+        a, b = multiple, level
+        while b:
+            a, b = b, a % b
+        multiple = multiple*level//a
+    return multiple*max(1, int(max_bytes//(8*columns*multiple)))
+
+
+def build_overviews(reader, file_name, levels=None, complex_data=False, max_bytes=None, attach=True,
+                    source_file=None):
+    """
+    Builds the overview sidecar file for every image of the given reader. The full
+    resolution data is read once, in blocks of rows, and each level is derived
+    from the previous level where the levels permit. The sidecar is written to a
+    temporary file, which replaces `file_name` only once complete.
+
+    Parameters
+    ----------
+    reader : sarpy.io.complex.base.BaseReader
+    file_name : str
+        The sidecar file name, which will be overwritten. The conventional name
+        is given by :func:`get_overview_file_name`.
+    levels : None|int|Sequence[int]
+        The decimation factors, each at least 2. The default is determined by
+        :func:`get_default_levels`, for each image.
+    complex_data : bool
+        Also store the complex multilooked data for each level.
+    max_bytes : None|int
+        The (nominal) maximum size in bytes of the blocks of complex64 data read
+        from the reader. Default value is :math:`2^{26}` bytes.
+    attach : bool
+        Enable the overviews for `reader`, see
+        :func:`sarpy.io.complex.base.BaseReader.enable_overviews`.
+    source_file : None|str
+        The source image file for `reader`, whose size and modification time are
+        recorded in the sidecar header, and checked when the sidecar is opened.
+
+    Returns
+    -------
+    Overviews
+    """
+
+    if max_bytes is None:
+        max_bytes = _DEFAULT_BLOCK_BYTES
+    # noinspection PyProtectedMember
+    data_sizes = [chipper.data_size for chipper in reader._get_chippers_as_tuple()]
+
+    # determine the header, and so the layout of the file
+    images = []
+    for data_size in data_sizes:
+        image_levels = get_default_levels(data_size) if levels is None else _validate_levels(levels)
+        images.append({
+            'data_size': list(data_size),
+            'levels': [{'level': level, 'shape': list(_get_level_shape(data_size, level)),
+                        'amplitude_offset': None, 'complex_offset': None} for level in image_levels]})
+
+    header_dict = {'version': _OVERVIEW_VERSION, 'images': images}
+    if source_file is not None:
+        header_dict['source'] = _get_source_record(source_file)
+
+    def get_header():
+        return json.dumps(header_dict, sort_keys=True).encode('utf-8')
+
+    # the header length depends on the offsets, so populate with placeholders of
+    #   sufficient length and pad as necessary
+    header_length = len(get_header()) + 64*sum(len(image['levels']) for image in images)
+    offset = len(_OVERVIEW_MAGIC) + 4 + header_length
+    for image in images:
+        for entry in image['levels']:
+            entry['amplitude_offset'] = offset
+            offset += 4*entry['shape'][0]*entry['shape'][1]
+            if complex_data:
+                entry['complex_offset'] = offset
+                offset += 8*entry['shape'][0]*entry['shape'][1]
+    total_size = offset
+    header = get_header()
+    header += b' '*(header_length - len(header))
+
+    temp_file = '{}.{}.tmp'.format(file_name, os.getpid())
+    try:
+        _write_overviews(reader, temp_file, images, header_length, header, total_size, complex_data, max_bytes)
+        if hasattr(os, 'replace'):
+            os.replace(temp_file, file_name)
+        else:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+            os.rename(temp_file, file_name)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    if attach:
+        return reader.enable_overviews(file_name, serve_complex=complex_data, source_file=source_file)
+    return Overviews(file_name, source_file=source_file)
+
+
+def _write_overviews(reader, file_name, images, header_length, header, total_size, complex_data, max_bytes):
+    """
+    Writes the overview sidecar file contents, as laid out by :func:`build_overviews`.
+    """
+
+    with open(file_name, 'wb') as fi:
+        fi.write(_OVERVIEW_MAGIC + struct.pack('<I', header_length) + header)
+        fi.truncate(total_size)
+        for index, image in enumerate(images):
+            data_size = image['data_size']
+            entries = image['levels']
+            block_rows = _get_block_rows([entry['level'] for entry in entries], data_size[1], max_bytes)
+            logging.info(
+                'Building overview levels {} for image {} of size {}'.format(
+                    [entry['level'] for entry in entries], index, data_size))
+            for row_slice, _, data in reader.iter_blocks(block_shape=(block_rows, None), index=index):
+                power = numpy.abs(data).astype(numpy.float64)**2
+                counts = numpy.ones(data.shape, dtype=numpy.int64)
+                sums = data.astype(numpy.complex128) if complex_data else None
+                current = 1
+                for entry in entries:
+                    level = entry['level']
+                    if level % current == 0:
+                        # derive from the previous level
+                        factor = level//current
+                    else:
+                        # derive from the full resolution data
+                        power = numpy.abs(data).astype(numpy.float64)**2
+                        counts = numpy.ones(data.shape, dtype=numpy.int64)
+                        sums = data.astype(numpy.complex128) if complex_data else None
+                        factor = level
+                    power = _reduce_blocks(power, factor)
+                    counts = _reduce_blocks(counts, factor)
+                    current = level
+
+                    row_start = row_slice.start//level
+                    width = entry['shape'][1]
+                    fi.seek(entry['amplitude_offset'] + 4*row_start*width)
+                    fi.write(numpy.sqrt(power/counts).astype('<f4').tobytes())
+                    if complex_data:
+                        sums = _reduce_blocks(sums, factor)
+                        fi.seek(entry['complex_offset'] + 8*row_start*width)
+                        fi.write((sums/counts).astype('<c8').tobytes())
+
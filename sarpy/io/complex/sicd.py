@@ -3,15 +3,20 @@
 Module for reading SICD files - should support SICD version 0.3 and above.
 """
 
+import os
 import re
 import sys
 import logging
+import threading
 from typing import Union, Tuple
 
 import numpy
 
-from .base import BaseChipper, BaseReader, BaseWriter, int_func, string_types
-from .bip import BIPChipper, BIPWriter
+# noinspection PyProtectedMember
+from .base import BaseChipper, BaseReader, BaseWriter, int_func, string_types, \
+    _validate_max_workers, _call_concurrently
+from .amp_phase import AmpPhaseCodec
+from .bip import BIPChipper, BIPWriter, _validate_engine
 from .utils import parse_xml_from_string
 from .sicd_elements.SICD import SICDType
 from .sicd_elements.blocks import LatLonType
@@ -23,7 +28,6 @@ from ..nitf.des import DataExtensionHeader, SICDDESSubheader, \
 from ..nitf.security import NITFSecurityTags
 from ..nitf.image import ImageSegmentHeader, ImageBands, ImageBand
 
-
 if sys.version_info[0] < 3:
     # noinspection PyUnresolvedReferences
     from cStringIO import StringIO
@@ -36,6 +40,13 @@ else:
 __classification__ = "UNCLASSIFIED"
 __author__ = ("Thomas McCullough", "Wade Schwartzkopf")
 
+# as big as can be stored in 10 digits, given at least 2 bytes per pixel
+_IM_SEG_LIMIT = 10**10 - 2
+# as big as can be stored in 5 digits
+_DIM_LIMIT = 10**5 - 1
+# the (nominal) number of pixels in each block converted and written by a worker thread
+_WRITE_BLOCK_PIXELS = 2**22
+
 
 ########
 # base expected functionality for a module with an implemented Reader
@@ -68,23 +79,38 @@ def is_a(file_name):
 # Helper object for initially parses NITF header - specifically looking for SICD elements
 
 
+# the number of bytes of the DES inspected for the root element tag, when lazily locating the SICD
+_ROOT_TAG_BYTES = 1024
+# the first element start tag, excluding any xml declaration, processing instruction, or comment
+_ROOT_TAG_PATTERN = re.compile(r'<(?![?!])([^\s>/]+)')
+
+
 class SICDDetails(NITFDetails):
     """
     SICD are stored in NITF 2.1 files.
     """
     __slots__ = (
         '_des_index', '_des_header', '_img_headers',
-        '_is_sicd', '_sicd_meta', 'img_segment_rows', 'img_segment_columns')
+        '_is_sicd', '_sicd_meta', '_trusted', 'img_segment_rows', 'img_segment_columns')
 
-    def __init__(self, file_name):
+    def __init__(self, file_name, lazy=False, trusted=False):
         """
 
         Parameters
         ----------
         file_name : str
             file name for a NITF 2.1 file containing a SICD
+        lazy : bool
+            If `True`, then the data extension containing the SICD xml is located,
+            but parsing is deferred until `sicd_meta` is first accessed. Selected
+            portions of the SICD structure can be parsed alone using
+            :func:`parse_sicd_branches`.
+        trusted : bool
+            If `True`, then the SICD xml is assumed to be valid, and is deserialized
+            using :func:`SICDType.from_trusted_node`, without per field validation.
         """
 
+        self._trusted = trusted
         self._des_index = None
         self._des_header = None
         self._img_headers = None
@@ -99,7 +125,7 @@ class SICDDetails(NITFDetails):
             raise IOError('A SICD file requires at least one data extension, containing the '
                           'SICD xml structure.')
         # define the sicd metadata
-        self._find_sicd()
+        self._find_sicd(lazy=lazy)
         # populate the image details
         self.img_segment_rows = numpy.zeros(self.img_segment_offsets.shape, dtype=numpy.int64)
         self.img_segment_columns = numpy.zeros(self.img_segment_offsets.shape, dtype=numpy.int64)
@@ -115,12 +141,25 @@ class SICDDetails(NITFDetails):
 
         return self._is_sicd
 
+    @property
+    def is_sicd_parsed(self):
+        """
+        bool: whether the full sicd meta-data structure has been parsed, or not.
+        """
+
+        return self._sicd_meta is not None
+
     @property
     def sicd_meta(self):
         """
-        SICDType: the sicd meta-data structure.
+        SICDType: the sicd meta-data structure. This will be parsed upon first
+        access, in the lazy case.
         """
 
+        if self._sicd_meta is None and self._is_sicd:
+            root_node, xml_ns = parse_xml_from_string(self._read_sicd_xml())
+            self._sicd_meta = self._parse_sicd(root_node, xml_ns)
+            self._sicd_meta.derive()
         return self._sicd_meta
 
     @property
@@ -157,50 +196,98 @@ class SICDDetails(NITFDetails):
 
         self._img_headers = [self.parse_image_subheader(i) for i in range(self.img_subheader_offsets.size)]
 
-    def _find_sicd(self):
+    def _read_data_extension(self, fi, index):
+        fi.seek(int_func(self.des_segment_offsets[index]))
+        return fi.read(int_func(self._nitf_header.DataExtensions.item_sizes[index])).decode('utf-8').strip()
+
+    def _read_sicd_xml(self):
+        with open(self._file_name, 'rb') as fi:
+            return self._read_data_extension(fi, self._des_index)
+
+    def _parse_sicd(self, root_node, xml_ns):
+        if self._trusted:
+            return SICDType.from_trusted_node(root_node, xml_ns)
+        return SICDType.from_node(root_node, xml_ns)
+
+    def _find_sicd(self, lazy=False):
         self._is_sicd = False
         self._sicd_meta = None
         if self.des_subheader_offsets is None:
             return
 
-        data_extension = None
+        root_node, xml_ns = None, None
         with open(self._file_name, 'rb') as fi:
             for i in range(self.des_subheader_offsets.size):
                 fi.seek(int_func(self.des_subheader_offsets[i]))
                 subhead_bytes = fi.read(self._nitf_header.DataExtensions.subhead_sizes[i])
                 if subhead_bytes.startswith(b'DEXML_DATA_CONTENT'):
                     des_header = DataExtensionHeader.from_bytes(subhead_bytes, start=0)
-                    fi.seek(int_func(self.des_segment_offsets[i]))
-                    data_extension = fi.read(int_func(self._nitf_header.DataExtensions.item_sizes[i])).decode('utf-8').strip()
-                    try:
-                        root_node, xml_ns = parse_xml_from_string(data_extension)
-                        if 'SICD' in root_node.tag:  # namespace makes this ugly
-                            self._des_index = i
-                            self._des_header = des_header
-                            self._is_sicd = True
-                            break
-                    except Exception:
-                        continue
                 elif subhead_bytes.startswith(b'DESICD_XML'):
+                    des_header = None
+                else:
+                    continue
+
+                if lazy:
+                    # just inspect the root element tag
                     fi.seek(int_func(self.des_segment_offsets[i]))
-                    data_extension = fi.read(int_func(self._nitf_header.DataExtensions.item_sizes[i])).decode('utf-8').strip()
+                    initial = fi.read(min(_ROOT_TAG_BYTES, int_func(self._nitf_header.DataExtensions.item_sizes[i])))
+                    match = _ROOT_TAG_PATTERN.search(initial.decode('utf-8', 'ignore'))
+                    if match is None or 'SICD' not in match.group(1):  # namespace makes this ugly
+                        continue
+                else:
+                    data_extension = self._read_data_extension(fi, i)
                     try:
                         root_node, xml_ns = parse_xml_from_string(data_extension)
-                        if 'SICD' in root_node.tag:  # namespace makes this ugly
-                            self._des_index = i
-                            self._des_header = None
-                            self._is_sicd = True
-                            break
+                        if 'SICD' not in root_node.tag:  # namespace makes this ugly
+                            continue
                     except Exception:
                         continue
+                self._des_index = i
+                self._des_header = des_header
+                self._is_sicd = True
+                break
 
         if not self._is_sicd or root_node is None:
             return
 
-        self._sicd_meta = SICDType.from_node(root_node, xml_ns)
+        self._sicd_meta = self._parse_sicd(root_node, xml_ns)
         self._sicd_meta.derive()
         # TODO: account for the reference frequency offset situation
 
+    def parse_sicd_branches(self, branches):
+        """
+        Parses only the given top level branches of the SICD structure, which
+        avoids the cost of deserializing the full structure. The returned structure
+        is not stored, and no derived values are populated. If the full structure
+        has already been parsed, then that is returned instead.
+
+        Parameters
+        ----------
+        branches : str|List[str]|Tuple[str]
+            The top level branch name(s), e.g. `('ImageData', 'GeoData')`.
+
+        Returns
+        -------
+        None|SICDType
+            `None` if this is not a SICD.
+        """
+
+        if isinstance(branches, string_types):
+            branches = (branches, )
+        for branch in branches:
+            if branch not in SICDType._fields:
+                raise ValueError('Got unknown SICD branch name {}'.format(branch))
+
+        if not self._is_sicd:
+            return None
+        if self._sicd_meta is not None:
+            return self._sicd_meta
+
+        root_node, xml_ns = parse_xml_from_string(self._read_sicd_xml())
+        # NB: fields populated in kwargs are skipped in deserialization
+        kwargs = dict((field, None) for field in SICDType._fields if field not in branches)
+        return SICDType.from_node(root_node, xml_ns, kwargs=kwargs)
+
     def is_des_well_formed(self):
         """
         Returns whether the data extension subheader well-formed. Returns `None`
@@ -282,49 +369,21 @@ class SICDDetails(NITFDetails):
 #######
 #  The actual reading implementation
 
-def _validate_lookup(lookup_table):  # type: (numpy.ndarray) -> None
-    if not isinstance(lookup_table, numpy.ndarray):
-        raise ValueError('requires a numpy.ndarray, got {}'.format(type(lookup_table)))
-    if lookup_table.dtype.name != 'float64':
-        raise ValueError('requires a numpy.ndarray of float64 dtype, got {}'.format(lookup_table.dtype))
-    if lookup_table.shape != (256, ):
-        raise ValueError('Requires a one-dimensional numpy.ndarray with 256 elements, '
-                         'got shape {}'.format(lookup_table.shape))
-
-
 def amp_phase_to_complex(lookup_table):
     """
     This constructs the function to convert from AMP8I_PHS8I format data to complex64 data.
 
     Parameters
     ----------
-    lookup_table : numpy.ndarray
+    lookup_table : None|numpy.ndarray
 
     Returns
     -------
     callable
     """
 
-    _validate_lookup(lookup_table)
-
-    def converter(data):
-        if not isinstance(data, numpy.ndarray):
-            raise ValueError('requires a numpy.ndarray, got {}'.format(type(data)))
-
-        if data.dtype.name != 'uint8':
-            raise ValueError('requires a numpy.ndarray of uint8 dtype, got {}'.format(data.dtype.name))
-
-        if len(data.shape) == 3:
-            raise ValueError('Requires a three-dimensional numpy.ndarray (with band '
-                             'in the first dimension), got shape {}'.format(data.shape))
-
-        out = numpy.zeros((data.shape[0] / 2, data.shape[1], data.shape[2]), dtype=numpy.complex64)
-        amp = lookup_table[data[0::2, :, :]]
-        theta = data[1::2, :, :]*(2*numpy.pi/256)
-        out.real = amp*numpy.cos(theta)
-        out.imag = amp*numpy.sin(theta)
-        return out
-    return converter
+    # NB: a bound method of the codec, so that the chipper may be pickled
+    return AmpPhaseCodec(lookup_table).decode
 
 
 class MultiSegmentChipper(BaseChipper):
@@ -333,14 +392,18 @@ class MultiSegmentChipper(BaseChipper):
     and row/column limits. Any sufficiently large SICD collect must be broken into a series of
     image segments (along rows). We must have a parser to transparently extract data between
     this collection of image segments.
+
+    The image segments are independent, so the reading and complex conversion for
+    the image segments overlapping a given request can optionally be performed
+    concurrently using a pool of worker threads. See the `max_workers` property.
     """
 
     __slots__ = ('_file_name', '_data_size', '_dtype', '_complex_out',
                  '_symmetry', '_row_starts', '_row_ends',
-                 '_bands_ip', '_child_chippers')
+                 '_bands_ip', '_child_chippers', '_max_workers')
 
     def __init__(self, file_name, data_sizes, data_offsets, data_type, symmetry=None,
-                 complex_type=True, bands_ip=1):
+                 complex_type=True, bands_ip=1, max_workers=None):
         """
 
         Parameters
@@ -359,6 +422,9 @@ class MultiSegmentChipper(BaseChipper):
             See `BaseChipper` for description of `complex_type`
         bands_ip : int
             number of bands - this will always be one for sicd.
+        max_workers : None|int
+            The default maximum number of worker threads for reading image segments
+            concurrently. See the `max_workers` property.
         """
 
         if not isinstance(data_sizes, numpy.ndarray):
@@ -396,30 +462,150 @@ class MultiSegmentChipper(BaseChipper):
         self._row_ends = numpy.cumsum(data_sizes[:, 0])
         self._row_starts[1:] = self._row_ends[:-1]
         self._bands_ip = int_func(bands_ip)
+        self._max_workers = None
+        self.max_workers = max_workers
 
         data_size = (self._row_ends[-1], data_sizes[0, 1])
         # all of the actual reading and reorienting done by child chippers,
         # so do not reorient or change type at this level
         super(MultiSegmentChipper, self).__init__(data_size, symmetry=(False, False, False), complex_type=False)
 
-    def _read_raw_fun(self, range1, range2):
+    @property
+    def max_workers(self):
+        """
+        None|int: The default maximum number of worker threads used to read the
+        image segments overlapping a given request concurrently. A value of `None`
+        or `1` means that image segments will be read serially in the calling thread.
+        This may be overridden for a single request using the `max_workers` argument
+        of :func:`read_chip`.
+        """
+
+        return self._max_workers
+
+    @max_workers.setter
+    def max_workers(self, value):
+        self._max_workers = _validate_max_workers(value)
+
+    @property
+    def tile_cache(self):
+        """
+        None|TileCache: The tile cache used by the image segment chippers. Setting
+        this sets the (shared) cache for every image segment chipper.
+        """
+
+        return self._child_chippers[0].tile_cache
+
+    @tile_cache.setter
+    def tile_cache(self, value):
+        for child_chipper in self._child_chippers:
+            child_chipper.tile_cache = value
+
+    def __call__(self, range1, range2, max_workers=None, out=None, copy=True, raw=False):
+        if not raw:
+            data = self._read_overview(range1, range2, out)
+            if data is not None:
+                return data
+        # all of the complex conversion and reorienting is done by the child chippers
+        return self._read_raw_fun(range1, range2, max_workers=max_workers, out=out, copy=copy, raw=raw)
+
+    def raw_to_complex(self, data, out=None):
+        # the image segments share the same storage type
+        return self._child_chippers[0].raw_to_complex(data, out=out)
+
+    def _get_segment_row_starts(self):
+        return self._row_starts.copy()
+
+    def close(self):
+        """
+        Closes the memory maps or file handles of the image segments.
+
+        Returns
+        -------
+        None
+        """
+
+        for entry in self._child_chippers:
+            entry.close()
+
+    def get_raw_layout(self):
+        layouts = [entry.get_raw_layout() for entry in self._child_chippers]
+        if any(entry is None for entry in layouts):
+            return None
+        regions = tuple(
+            (offset, row_start + start, row_end + start, col_start, col_end)
+            for layout, start in zip(layouts, self._row_starts)
+            for offset, row_start, row_end, col_start, col_end in layout[2])
+        return layouts[0][0], layouts[0][1], regions
+
+    def _get_segment_reads(self, range1):
+        """
+        Determine the reads necessary from each child chipper.
+
+        Parameters
+        ----------
+        range1 : tuple
+            The validated first dimension range.
+
+        Returns
+        -------
+        int
+            The number of rows to be read.
+        List[Tuple[BIPChipper, tuple, int, int, bool]]
+            Entries of the form `(child_chipper, child_range1, out_start, out_end, reverse)`.
+            The rows `out[out_start:out_end]` are populated by reading `child_range1`
+            from `child_chipper`, and reversing the order of the result if `reverse`.
+        """
+
+        rows = numpy.arange(*range1, dtype=numpy.int64)  # array
+        reads = []
+        for row_start, row_end, child_chipper in zip(self._row_starts, self._row_ends, self._child_chippers):
+            row_inds = numpy.nonzero((rows >= row_start) & (rows < row_end))[0]
+            if row_inds.size == 0:
+                continue
+            # the rows are monotonic, so the rows for this segment are a contiguous block
+            first, last = rows[row_inds[0]] - row_start, rows[row_inds[-1]] - row_start
+            if range1[2] > 0:
+                crange1, reverse = (first, last + 1, range1[2]), False
+            else:
+                # read forwards, then reverse the order
+                crange1, reverse = (last, first + 1, -range1[2]), True
+            reads.append((child_chipper, crange1, int_func(row_inds[0]), int_func(row_inds[-1] + 1), reverse))
+        return rows.size, reads
+
+    def _read_raw_fun(self, range1, range2, max_workers=None, out=None, copy=True, raw=False):
+        def read_segment(child_chipper, crange1, out_start, out_end, reverse):
+            # each child chipper writes directly into its block of rows of out
+            out_block = out[out_start:out_end]
+            child_chipper(crange1, range2, out=out_block[::-1] if reverse else out_block, raw=raw)
+
         range1, range2 = self._reorder_arguments(range1, range2)
         # this method just assembles the final data from the child chipper pieces
-        rows = numpy.arange(*range1, dtype=numpy.int64)  # array
-        cols_size = int_func((range2[1] - range2[0] - 1)/range2[2]) + 1
-        if self._bands_ip == 1:
-            out = numpy.empty((rows.size, cols_size), dtype=numpy.complex64)
+        row_count, reads = self._get_segment_reads(range1)
+        if out is None and not copy and len(reads) == 1:
+            # a view is only possible from a single image segment
+            child_chipper, crange1, _, _, reverse = reads[0]
+            data = child_chipper(crange1, range2, copy=False, raw=raw)
+            return data[::-1] if reverse else data
+        cols_size = numpy.arange(*range2, dtype=numpy.int64).size
+        if raw:
+            # noinspection PyProtectedMember
+            raw_bands, raw_type = self._child_chippers[0]._bands, self._child_chippers[0]._data_type
+            shape = (row_count, cols_size, raw_bands)
+            dtype = numpy.dtype(raw_type).newbyteorder('=')
+        elif self._bands_ip == 1:
+            shape, dtype = (row_count, cols_size), numpy.complex64
         else:
-            out = numpy.empty((rows.size, cols_size, self._bands_ip), dtype=numpy.complex64)
-        for row_start, row_end, child_chipper in zip(self._row_starts, self._row_ends, self._child_chippers):
-            row_bool = ((rows >= row_start) & (rows < row_end))
-            if numpy.any(row_bool):
-                crows = rows[row_bool]
-                crange1 = (crows[0]-row_start, crows[-1]+1-row_start, range1[2])
-                if self._bands_ip == 1:
-                    out[row_bool, :] = child_chipper(crange1, range2)
-                else:
-                    out[row_bool, :, :] = child_chipper(crange1, range2)
+            shape, dtype = (row_count, cols_size, self._bands_ip), numpy.complex64
+        if out is None:
+            out = numpy.empty(shape, dtype=dtype)
+        elif not isinstance(out, numpy.ndarray) or out.shape != shape:
+            raise ValueError(
+                'out must be a numpy.ndarray of shape {}, got {}'.format(shape, getattr(out, 'shape', type(out))))
+
+        max_workers = self._max_workers if max_workers is None else _validate_max_workers(max_workers)
+        # NB: each segment populates a distinct block of rows in out, and numpy
+        #   releases the GIL while copying and converting
+        _call_concurrently(read_segment, reads, max_workers)
         return out
 
 
@@ -428,19 +614,34 @@ class SICDReader(BaseReader):
     A reader object for a SICD file (NITF container with SICD contents)
     """
 
-    __slots__ = ('_nitf_details', '_sicd_meta', '_chipper')
+    __slots__ = ('_nitf_details', '_sicd_meta', '_chipper', '_is_partial', '_trusted')
 
-    def __init__(self, nitf_details):
+    def __init__(self, nitf_details, max_workers=None, lazy=False, trusted=False):
         """
 
         Parameters
         ----------
         nitf_details : str|SICDDetails
             filename or SICDDetails object
+        max_workers : None|int
+            The default maximum number of worker threads for concurrently reading
+            image segments. This is only relevant for SICD files with multiple
+            image segments. See :class:`MultiSegmentChipper`.
+        lazy : bool
+            If `True`, then only the `ImageData` branch of the SICD structure, which
+            is required for reading pixel data, is parsed initially. The full
+            structure is parsed upon first access of `sicd_meta`. This is only
+            applicable if `nitf_details` is a file name, or a lazy SICDDetails.
+        trusted : bool
+            If `True`, then the SICD structure is assumed to be valid. It is deserialized
+            without per field validation, and the validity check is skipped. Call
+            `sicd_meta.is_valid()` to check it on demand. This is only applicable if
+            `nitf_details` is a file name.
         """
 
+        self._trusted = trusted
         if isinstance(nitf_details, string_types):
-            nitf_details = SICDDetails(nitf_details)
+            nitf_details = SICDDetails(nitf_details, lazy=lazy, trusted=trusted)
         if not isinstance(nitf_details, SICDDetails):
             raise TypeError('The input argument for SICDReader must be a filename or '
                             'SICDDetails object.')
@@ -450,9 +651,14 @@ class SICDReader(BaseReader):
             raise ValueError(
                 'The input file passed in appears to be a NITF 2.1 file that does not contain valid sicd metadata.')
 
-        self._sicd_meta = self._nitf_details.sicd_meta
+        if lazy and not self._nitf_details.is_sicd_parsed:
+            the_sicd = self._nitf_details.parse_sicd_branches('ImageData')
+            self._is_partial = True
+        else:
+            the_sicd = self._nitf_details.sicd_meta
+            self._is_partial = False
 
-        pixel_type = self._sicd_meta.ImageData.PixelType
+        pixel_type = the_sicd.ImageData.PixelType
         complex_type = True
         # NB: SICDs are required to be stored as big-endian
         if pixel_type == 'RE32F_IM32F':
@@ -461,7 +667,7 @@ class SICDReader(BaseReader):
             dtype = numpy.dtype('>i2')
         elif pixel_type == 'AMP8I_PHS8I':
             dtype = numpy.dtype('>u1')
-            complex_type = amp_phase_to_complex(self._sicd_meta.ImageData.AmpTable)
+            complex_type = amp_phase_to_complex(the_sicd.ImageData.AmpTable)
         else:
             raise ValueError('Pixel Type {} not recognized.'.format(pixel_type))
 
@@ -474,13 +680,28 @@ class SICDReader(BaseReader):
         chipper = MultiSegmentChipper(
             nitf_details.file_name, data_sizes, self._nitf_details.img_segment_offsets.copy(), dtype,
             symmetry=symmetry, complex_type=complex_type,
-            bands_ip=1)
+            bands_ip=1, max_workers=max_workers)
 
-        super(SICDReader, self).__init__(self._sicd_meta, chipper)
+        super(SICDReader, self).__init__(the_sicd, chipper)
 
-        # should we do a preliminary check that the structure is valid?
-        #   note that this results in potentially noisy logging for troubled sicd files
-        self._sicd_meta.is_valid(recursive=True)
+        if not (self._is_partial or self._trusted):
+            # should we do a preliminary check that the structure is valid?
+            #   note that this results in potentially noisy logging for troubled sicd files
+            self._sicd_meta.is_valid(recursive=True)
+
+    @property
+    def sicd_meta(self):
+        """
+        SICDType: the sicd meta_data. In the lazy case, this is fully parsed upon
+        first access.
+        """
+
+        if self._is_partial:
+            self._sicd_meta = self._nitf_details.sicd_meta
+            self._is_partial = False
+            if not self._trusted:
+                self._sicd_meta.is_valid(recursive=True)
+        return self._sicd_meta
 
 
 #######
@@ -505,25 +726,14 @@ def complex_to_amp_phase(lookup_table):
 
     Parameters
     ----------
-    lookup_table : numpy.ndarray
+    lookup_table : None|numpy.ndarray
 
     Returns
     -------
     callable
     """
 
-    _validate_lookup(lookup_table)
-
-    def converter(data):
-        new_shape = _validate_input(data)
-        out = numpy.zeros(new_shape, dtype=numpy.uint8)
-        # NB: for numpy before 1.10, digitize requires 1-d
-        out[:, :, 0] = numpy.digitize(numpy.abs(data).ravel(), lookup_table, right=False).reshape(data.shape)
-        out[:, :, 1] = numpy.arctan2(data.real, data.imag)*(256/(2*numpy.pi))
-        # truncation takes care of properly rolling negative to positive
-        return out
-
-    return converter
+    return AmpPhaseCodec(lookup_table).encode
 
 
 def complex_to_int(data):
@@ -560,6 +770,24 @@ class SICDWriter(BaseWriter):
     """
     Writer object for SICD file - that is, a NITF file containing SICD data
     following standard 1.2.1
+
+    The conversion to the storage type and the writing of the image segments
+    overlapping each block of data, split into smaller blocks of rows, can
+    optionally be performed concurrently using a pool of worker threads. See
+    the `max_workers` property.
+
+    **Thread safety:** blocks may be written in any order, and concurrently from
+    multiple producer threads, provided that the blocks do not overlap.
+
+    The image segments are written using a memory map by default, or using
+    positional writes with a bounded number of bytes in flight and optional
+    periodic flushing to disk. See :class:`sarpy.io.complex.bip.BIPWriter`.
+
+    In `resume` mode, all headers and the data extension are written when
+    preparing for writing, so that the file structure is complete from the start.
+    If the file already has content, then its headers and data extension placement
+    are instead validated against those expected, and retained, so that writing
+    may be continued after an interruption. See :func:`mark_written`.
     """
 
     __slots__ = (
@@ -567,17 +795,36 @@ class SICDWriter(BaseWriter):
         '_complex_type', '_image_segment_limits',
         '_security_tags', '_image_segment_headers', '_data_extension_header', '_nitf_header',
         '_header_offsets', '_image_offsets',
-        '_final_header_info', '_writing_chippers', '_pixels_written', '_des_written')
+        '_final_header_info', '_writing_chippers', '_pixels_written', '_des_written',
+        '_headers_written', '_max_workers', '_lock', '_engine', '_engine_options', '_resume')
 
-    def __init__(self, file_name, sicd_meta):
+    def __init__(self, file_name, sicd_meta, max_workers=None, engine='memmap', engine_options=None, resume=False):
         """
 
         Parameters
         ----------
         file_name : str
         sicd_meta : SICDType
+        max_workers : None|int
+            The default maximum number of worker threads for converting and writing
+            data concurrently. See the `max_workers` property.
+        engine : str
+            The output engine for the image segments, one of `'memmap'` or `'pwrite'`.
+        engine_options : None|dict
+            The options for the `'pwrite'` engine, see
+            :class:`sarpy.io.complex.bip.PositionalWriter`. These apply to each
+            image segment separately.
+        resume : bool
+            Write all headers and the data extension up front or, if the file already
+            has content, validate and retain its existing headers, in order to continue
+            writing.
         """
 
+        self._resume = bool(resume)
+        self._engine, self._engine_options = _validate_engine(engine, engine_options)
+        self._lock = threading.Lock()
+        self._max_workers = None
+        self.max_workers = max_workers
         super(SICDWriter, self).__init__(file_name, sicd_meta)
         self._shape = (sicd_meta.ImageData.NumRows, sicd_meta.ImageData.NumCols)
 
@@ -588,6 +835,7 @@ class SICDWriter(BaseWriter):
             self._image_segment_limits = self._image_segment_details()
         # prepare our pixels written counter
         self._pixels_written = numpy.zeros((self._image_segment_limits.shape[0],), dtype=numpy.int64)
+        self._headers_written = numpy.zeros((self._image_segment_limits.shape[0],), dtype=numpy.bool_)
         # define _image_segment_headers
         self._image_segment_headers = self._create_image_segment_headers(pv_type, isubcat)
         # define _data_extension_header
@@ -600,6 +848,21 @@ class SICDWriter(BaseWriter):
         self._writing_chippers = None
         self._des_written = False
 
+    @property
+    def max_workers(self):
+        """
+        None|int: The default maximum number of worker threads used to convert
+        and write each block of data. A value of `None` or `1` means that data
+        will be written serially in the calling thread. This may be overridden
+        for a single block using the `max_workers` argument of :func:`__call__`.
+        """
+
+        return self._max_workers
+
+    @max_workers.setter
+    def max_workers(self, value):
+        self._max_workers = _validate_max_workers(value)
+
     @property
     def security_tags(self):  # type: () -> NITFSecurityTags
         """
@@ -693,8 +956,8 @@ class SICDWriter(BaseWriter):
             dtype = numpy.dtype('>u1')
             complex_type = complex_to_amp_phase(self._sicd_meta.ImageData.AmpTable)
 
-        IM_SEG_LIMIT = 10**10 - 2  # as big as can be stored in 10 digits, given at least 2 bytes per pixel
-        DIM_LIMIT = 10**5 - 1  # as big as can be stored in 5 digits
+        IM_SEG_LIMIT = _IM_SEG_LIMIT
+        DIM_LIMIT = _DIM_LIMIT
         IM_ROWS = self._sicd_meta.ImageData.NumRows  # required to be defined
         IM_COLS = self._sicd_meta.ImageData.NumCols  # required to be defined
         im_segments = []
@@ -917,39 +1180,194 @@ class SICDWriter(BaseWriter):
             'Writing NITF header and setting up the chippers, this likely causes '
             'a large physical memory allocation and may be time consuming.')
 
-        # write the nitf header
-        with open(self._file_name, mode='r+b') as fi:
-            fi.write(self._final_header_info['nitf'])
+        if self._resume and os.path.getsize(self._file_name) > 0:
+            # retain the existing headers, after checking the layout is unchanged
+            self._validate_existing_file()
+        else:
+            with open(self._file_name, mode='r+b') as fi:
+                # write the nitf header
+                fi.write(self._final_header_info['nitf'])
+                if self._resume:
+                    # write the remaining headers and data extension up front
+                    for offset, head in zip(self._header_offsets, self._final_header_info['image_headers']):
+                        fi.seek(offset)
+                        fi.write(head)
+                    fi.seek(self._get_des_offset())
+                    fi.write(self._final_header_info['des']['header'])
+                    fi.write(self._final_header_info['des']['xml'])
+            if self._resume:
+                self._headers_written[:] = True
 
         # prepare out writing chippers
         self._writing_chippers = tuple(
             BIPWriter(self._file_name, (ent[1]-ent[0], ent[3]-ent[2]),
-                      self._dtype, self._complex_type, data_offset=offset)
+                      self._dtype, self._complex_type, data_offset=offset,
+                      engine=self._engine, engine_options=self._engine_options)
             for ent, offset in zip(self._image_segment_limits, image_offsets))
 
+    def _get_des_offset(self):
+        # type: () -> int
+        return int_func(self._image_offsets[-1] + self._image_segment_limits[-1, 4])
+
+    def _validate_existing_file(self):
+        """
+        Validates that the existing file has the nitf header, image segment
+        headers and data extension placement expected, and adopts the existing
+        nitf header and data extension, so that these are not rewritten.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+        """
+
+        try:
+            details = NITFDetails(self._file_name)
+        except Exception as e:
+            raise ValueError(
+                'The existing file {} cannot be resumed, since its NITF header '
+                'cannot be parsed. Failed with exception {}'.format(self._file_name, e))
+
+        def check(condition, description):
+            if not condition:
+                raise ValueError(
+                    'The existing file {} cannot be resumed, since its {} does not '
+                    'match that expected.'.format(self._file_name, description))
+
+        header = details.nitf_header
+        check(details.img_segment_offsets is not None and
+              numpy.array_equal(details.img_segment_offsets, self._image_offsets) and
+              numpy.array_equal(header.ImageSegments.item_sizes, self._image_segment_limits[:, 4]),
+              'image segment layout')
+        check(details.des_subheader_offsets is not None and details.des_subheader_offsets.size == 1 and
+              int_func(details.des_subheader_offsets[0]) == self._get_des_offset(),
+              'data extension placement')
+        des_header_size = int_func(header.DataExtensions.subhead_sizes[0])
+        des_size = int_func(header.DataExtensions.item_sizes[0])
+        check(os.path.getsize(self._file_name) >= self._get_des_offset() + des_header_size + des_size,
+              'size')
+
+        with open(self._file_name, mode='rb') as fi:
+            for i, (offset, head) in enumerate(zip(self._header_offsets, self._final_header_info['image_headers'])):
+                fi.seek(offset)
+                check(fi.read(len(head)) == head, 'image segment {} header'.format(i+1))
+            fi.seek(0)
+            nitf_header = fi.read(header.HL)
+            fi.seek(self._get_des_offset())
+            des_header = fi.read(des_header_size)
+            des_xml = fi.read(des_size)
+        check(des_header[:2] == b'DE', 'data extension header')
+        self._final_header_info['nitf'] = nitf_header
+        self._final_header_info['des'] = {'header': des_header, 'xml': des_xml}
+        self._headers_written[:] = True
+
+    def mark_written(self, start_indices, data_shape):
+        """
+        Records that the block of the given shape, at the given start indices,
+        has already been written, as when resuming writing of an existing file.
+        This only updates the counts of pixels written, which are checked on
+        :func:`close`.
+
+        Parameters
+        ----------
+        start_indices : Tuple[int, int]
+        data_shape : Tuple[int, int]
+
+        Returns
+        -------
+        None
+        """
+
+        row_range = (int_func(start_indices[0]), int_func(start_indices[0] + data_shape[0]))
+        col_range = (int_func(start_indices[1]), int_func(start_indices[1] + data_shape[1]))
+        with self._lock:
+            for i, ent in enumerate(self._image_segment_limits):
+                rows = min(row_range[1], ent[1]) - max(row_range[0], ent[0])
+                cols = min(col_range[1], ent[3]) - max(col_range[0], ent[2])
+                if rows > 0 and cols > 0:
+                    self._pixels_written[i] += rows*cols
+
+    def get_raw_layout(self):
+        """
+        Gets the layout of the image segments in the file, in the form described
+        in :func:`sarpy.io.complex.base.BaseChipper.get_raw_layout`, so that the
+        raw bytes may be written directly. This prepares for writing, if necessary,
+        and writes all the image segment headers. See also :func:`mark_written`.
+
+        Returns
+        -------
+        Tuple[str, numpy.dtype, Tuple[Tuple[int, int, int, int, int], ...]]
+        """
+
+        if self._writing_chippers is None:
+            with self._lock:
+                self.prepare_for_writing()  # will just exit if already prepared
+        for i in range(len(self._image_segment_limits)):
+            self._write_image_header(i)  # will just exit if already written
+        regions = tuple(
+            (int_func(offset), int_func(ent[0]), int_func(ent[1]), int_func(ent[2]), int_func(ent[3]))
+            for ent, offset in zip(self._image_segment_limits, self._image_offsets))
+        return self._file_name, self._dtype, regions
+
+    def flush(self):
+        """
+        Flush the image data written so far to disk. See :func:`BIPWriter.flush`.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._writing_chippers is not None:
+            for entry in self._writing_chippers:
+                entry.flush()
+
     def _write_image_header(self, index):
         # type: (int) -> None
-        if self._pixels_written[index] > 0:
-            return
-        with open(self._file_name, mode='r+b') as fi:
-            fi.seek(self._header_offsets[index])
-            fi.write(self._final_header_info['image_headers'][index])
+        with self._lock:
+            if self._headers_written[index]:
+                return
+            with open(self._file_name, mode='r+b') as fi:
+                fi.seek(self._header_offsets[index])
+                fi.write(self._final_header_info['image_headers'][index])
+            self._headers_written[index] = True
 
-    def close(self):
+    def _write_segment(self, index, data, start_indices, raw=False):
         """
-        Checks that data appears to be satisfactorily written, and logs some details
-        at error level, if not. Then, it finalizes the SICD file by writing the final
-        data extension header and data extension (i.e. SICD xml).
+        Converts and writes the block of data to the given image segment, and
+        updates the count of pixels written.
+
+        Parameters
+        ----------
+        index : int
+        data : numpy.ndarray
+        start_indices : Tuple[int, int]
+            The start indices relative to the image segment.
+        raw : bool
+            Whether the data is already of the storage data type.
 
         Returns
         -------
         None
         """
 
-        if not hasattr(self, '_des_written') or self._des_written:
-            return
+        self._writing_chippers[index](data, start_indices, raw=raw)
+        with self._lock:
+            self._pixels_written[index] += data.shape[0]*data.shape[1]
+
+    def _get_insufficiently_written(self):
+        """
+        Gets the image segments for which fewer bytes have been written than expected.
+
+        Returns
+        -------
+        List[List[int]]
+            The segment indices, the expected sizes in bytes, and the sizes written.
+        """
 
-        # let's double check that everything is written
         insufficiently_written = [[], [], []]
         for i, (entry, pix_written) in enumerate(zip(self._image_segment_limits, self._pixels_written)):
             im_siz = entry[4]
@@ -958,6 +1376,34 @@ class SICDWriter(BaseWriter):
                 insufficiently_written[0].append(i)
                 insufficiently_written[1].append(im_siz)
                 insufficiently_written[2].append(im_written)
+        return insufficiently_written
+
+    @property
+    def fully_written(self):
+        """
+        bool: Whether the expected number of pixels has been written to every
+        image segment.
+        """
+
+        with self._lock:
+            return len(self._get_insufficiently_written()[0]) == 0
+
+    def close(self):
+        """
+        Checks that data appears to be satisfactorily written, and logs some details
+        at error level, if not. Then, it finalizes the SICD file by writing the final
+        data extension header and data extension (i.e. SICD xml).
+
+        Returns
+        -------
+        None
+        """
+
+        if not hasattr(self, '_des_written') or self._des_written:
+            return
+
+        # let's double check that everything is written
+        insufficiently_written = self._get_insufficiently_written()
         if len(insufficiently_written[0]) > 0:
             logging.error(
                 'Attempting to create file {}, which will be corrupt. Image segment(s) {} '
@@ -971,7 +1417,7 @@ class SICDWriter(BaseWriter):
         # noinspection PyBroadException
         try:
             with open(self._file_name, mode='r+b') as fi:
-                fi.seek(self._image_offsets[-1] + self._image_segment_limits[-1, 4])
+                fi.seek(self._get_des_offset())
                 fi.write(self._final_header_info['des']['header'])
                 fi.write(self._final_header_info['des']['xml'])
             self._des_written = True
@@ -989,7 +1435,66 @@ class SICDWriter(BaseWriter):
                 for entry in self._writing_chippers:
                     entry.close()
 
-    def __call__(self, data, start_indices=(0, 0)):
+    def convert(self, data, max_workers=None):
+        """
+        Converts the complex data to the storage data type of the pixel type,
+        without writing, so that this may be performed separately (for example,
+        in another thread). The result may be written using the `raw` argument
+        of :func:`__call__`.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            the complex data
+        max_workers : None|int
+            The maximum number of worker threads to use for the conversion. The
+            default (`None`) defers to the `max_workers` property.
+
+        Returns
+        -------
+        numpy.ndarray
+            Of the storage data type (in native byte order), and of shape `(rows, columns, 2)`.
+        """
+
+        if self._writing_chippers is None:
+            with self._lock:
+                self.prepare_for_writing()  # will just exit if already prepared
+        converter = self._writing_chippers[0]
+        max_workers = self._max_workers if max_workers is None else _validate_max_workers(max_workers)
+        if max_workers is None or max_workers < 2 or data.ndim != 2:
+            return converter.convert(data)
+
+        def convert_block(start, stop):
+            out[start:stop] = converter.convert(data[start:stop])
+
+        out = numpy.empty(data.shape + (2, ), dtype=self._dtype.newbyteorder('='))
+        block_rows = max(1, min(_WRITE_BLOCK_PIXELS//max(1, data.shape[1]), -(-data.shape[0]//max_workers)))
+        blocks = [(start, min(start + block_rows, data.shape[0])) for start in range(0, data.shape[0], block_rows)]
+        _call_concurrently(convert_block, blocks, max_workers)
+        return out
+
+    def __call__(self, data, start_indices=(0, 0), max_workers=None, raw=False):
+        """
+        Write the data to the file.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            the complex data
+        start_indices : Tuple[int, int]
+            the starting index for the data.
+        max_workers : None|int
+            The maximum number of worker threads to use for converting and writing
+            this block. The default (`None`) defers to the `max_workers` property.
+        raw : bool
+            If `True`, then `data` is already of the storage data type, as returned
+            by :func:`convert`, and is written directly.
+
+        Returns
+        -------
+        None
+        """
+
         def overlap(rrange, crange):
             def element_overlap(this_range, segment_range):
                 if segment_range[0] <= this_range[0] < segment_range[1]:
@@ -1037,25 +1542,33 @@ class SICDWriter(BaseWriter):
                 'This is incompatible with total data shape {}.'.format(start_indices, data.shape, self._shape))
 
         if self._writing_chippers is None:
-            self.prepare_for_writing()
+            with self._lock:
+                self.prepare_for_writing()  # will just exit if already prepared
 
+        max_workers = self._max_workers if max_workers is None else _validate_max_workers(max_workers)
+        workers = 1 if max_workers is None else max_workers
         # which segment(s) will we write in?
         need_segments, data_entries = overlap(row_range, col_range)
         # need_segments - boolean array of which segments that we'll write in
         # data entries - array of [row start, row end, col start, col end] wrt to full image coordinates.
+        writes = []
         for i, need_seg in enumerate(need_segments):
             if not need_seg:
                 continue
             self._write_image_header(i)  # will just exit if already written
             entry = data_entries[i, :]
-            # how many elements will we write?
-            write_els = (entry[1] - entry[0])*(entry[3] - entry[2])
-            # write the data using this chipper
             drows = (entry[0]-start_indices[0], entry[1]-start_indices[0])
             dcols = (entry[2]-start_indices[1], entry[3]-start_indices[1])
-            sinds = (
-                start_indices[0] - self._image_segment_limits[i, 0],
-                start_indices[1] - self._image_segment_limits[i, 2])
-            self._writing_chippers[i](data[drows[0]:drows[1], dcols[0]:dcols[1]], sinds)
-            # update how many pixels we have written to this segment
-            self._pixels_written[i] += write_els
+            # the rows are split into blocks, which may be converted and written concurrently
+            row_count = drows[1] - drows[0]
+            block_rows = row_count
+            if workers > 1:
+                block_rows = max(1, min(_WRITE_BLOCK_PIXELS//max(1, dcols[1] - dcols[0]), -(-row_count//workers)))
+            for block_start in range(drows[0], drows[1], block_rows):
+                block_end = min(block_start + block_rows, drows[1])
+                # the start indices of this block, relative to the image segment
+                sinds = (
+                    start_indices[0] + block_start - self._image_segment_limits[i, 0],
+                    start_indices[1] + dcols[0] - self._image_segment_limits[i, 2])
+                writes.append((i, data[block_start:block_end, dcols[0]:dcols[1]], sinds, raw))
+        _call_concurrently(self._write_segment, writes, max_workers)
@@ -78,6 +78,7 @@ class WaveformParametersType(Serializable):
     _required = ()
     _set_as_attribute = ('index', )
     _numeric_format = {key: '0.16G' for key in _fields if key not in ('RcvDemodType', 'index')}
+    _RcvFMRate = None
 
     # descriptors
     TxPulseLength = _FloatDescriptor(
@@ -45,6 +45,7 @@ class SICDType(Serializable):
         'CollectionInfo', 'ImageData', 'GeoData', 'Grid', 'Timeline', 'Position',
         'RadarCollection', 'ImageFormation', 'SCPCOA')
     _choice = ({'required': False, 'collection': ('RgAzComp', 'PFA', 'RMA')}, )
+    _coa_projection = None
     # descriptors
     CollectionInfo = _SerializableDescriptor(
         'CollectionInfo', CollectionInfoType, _required, strict=False,
@@ -1261,6 +1261,25 @@ class Serializable(object):
                     #   Silently catching errors can potentially cover up REAL issues.
                     pass
 
+    def __getstate__(self):
+        # NB: the field values are held by the descriptors, rather than the instance dictionary
+        state = dict(getattr(self, '__dict__', {}))
+        for attribute in self._fields:
+            state[attribute] = getattr(self, attribute)
+        return state
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            if key not in self._fields:
+                object.__setattr__(self, key, value)
+        for attribute in self._fields:
+            if state.get(attribute, None) is not None:
+                try:
+                    setattr(self, attribute, state[attribute])
+                except AttributeError:
+                    # read only properties
+                    pass
+
     def __str__(self):
         return '{}(**{})'.format(self.__class__.__name__, json.dumps(self.to_dict(check_validity=False), indent=1))
 
@@ -1451,6 +1470,15 @@ class Serializable(object):
             raise ValueError(
                 "Named input argument kwargs for class {} must be dictionary instance".format(cls))
 
+        plan = _ParsePlan.get_plan(cls, xml_ns)
+        if plan is not None:
+            # a single pass over the children, instead of a search per field
+            values = plan.select(node)
+            for attribute in cls._fields:
+                if attribute not in kwargs:
+                    kwargs[attribute] = values.get(attribute, None)
+            return cls.from_dict(kwargs)
+
         for attribute in cls._fields:
             if attribute in kwargs:
                 continue
@@ -1481,6 +1509,32 @@ class Serializable(object):
                 handle_single(attribute)
         return cls.from_dict(kwargs)
 
+    @classmethod
+    def from_trusted_node(cls, node, xml_ns):
+        """For XML deserialization of trusted input, which is assumed to be valid.
+
+        The values are converted according to the precompiled parse plan for the class,
+        and stored directly, without the per field validation performed by :func:`from_node`.
+        Any validation is deferred to an explicit call of :func:`is_valid`. Classes which
+        implement their own `from_node` are deserialized using that method.
+
+        Parameters
+        ----------
+        node : ElementTree.Element
+            dom element for serialized class instance
+        xml_ns : dict
+            The xml namespace dictionary.
+
+        Returns
+        -------
+            Corresponding class instance
+        """
+
+        plan = _ParsePlan.get_plan(cls, xml_ns)
+        if plan is None or plan.delegated:
+            return cls.from_node(node, xml_ns)
+        return plan.build(node, xml_ns)
+
     def to_node(self, doc, tag, parent=None, check_validity=False, strict=DEFAULT_STRICT, exclude=()):
         """For XML serialization, to a dom element.
 
@@ -2175,3 +2229,287 @@ class ParametersCollection(object):
     # noinspection PyUnusedLocal
     def to_dict(self, check_validity=False, strict=False):
         return self._dict
+
+
+#################
+# precompiled deserialization plans
+
+_PARSE_PLANS = {}
+"""
+dict: the parse plan cache, keyed by Serializable class and xml namespace.
+"""
+
+
+def _get_node_text(nod):
+    """Extracts the stripped text value from an ElementTree Element, or `None` if
+    there is no text.
+
+    Parameters
+    ----------
+    nod : ElementTree.Element
+
+    Returns
+    -------
+    None|str
+    """
+
+    val = nod.text
+    if val is None:
+        return None
+    val = val.strip()
+    return val if len(val) > 0 else None
+
+
+class _ParsePlan(object):
+    """
+    The deserialization plan for a Serializable class and xml namespace, compiled once
+    from the `_fields`, `_set_as_attribute` and `_collections_tags` metadata and the
+    field descriptors of the class.
+
+    The child elements of a node are collected in a single pass, matching the fully
+    qualified tag against the plan, rather than searching the node once per field. The
+    elements are collected exactly as in the generic :func:`Serializable.from_node`,
+    so :func:`select` gives identical results. For trusted input, :func:`build` converts
+    the values directly according to the descriptor type, and stores them without the
+    descriptor validation.
+    """
+
+    __slots__ = ('_the_type', '_attributes', '_single', '_multiple', '_child_tags', '_converters', 'delegated')
+    # descriptor types for which the value can be stored directly, with the conversion
+    # for the (single element) value, or the collection of elements
+    _SINGLE_CONVERSIONS = {
+        _StringDescriptor: 'str', _IntegerDescriptor: 'int', _IntegerEnumDescriptor: 'int',
+        _FloatDescriptor: 'float', _BooleanDescriptor: 'bool', _DateTimeDescriptor: 'datetime',
+        _ComplexDescriptor: 'complex', _SerializableDescriptor: 'serializable'}
+    _ARRAY_CONVERSIONS = {
+        _FloatArrayDescriptor: 'float_array', _SerializableArrayDescriptor: 'serializable_array',
+        _SerializableCPArrayDescriptor: 'cp_array'}
+    _LIST_CONVERSIONS = {
+        _SerializableListDescriptor: 'serializable_list', _ParametersDescriptor: 'parameters'}
+
+    def __init__(self, the_type, xml_ns):
+        """
+
+        Parameters
+        ----------
+        the_type : type
+            The Serializable class.
+        xml_ns : None|dict
+            The xml namespace dictionary.
+
+        Raises
+        ------
+        KeyError
+            If a required namespace prefix is not defined in `xml_ns`.
+        """
+
+        self._the_type = the_type
+        self.delegated = the_type.from_node.__func__ is not Serializable.from_node.__func__
+        self._attributes = []
+        self._single = {}
+        self._multiple = {}
+        self._child_tags = {}
+        self._converters = {}
+
+        for attribute in the_type._fields:
+            descriptor = self._get_descriptor(attribute)
+            if attribute in the_type._set_as_attribute:
+                self._attributes.append(attribute)
+                converter = self._SINGLE_CONVERSIONS.get(type(descriptor), None)
+                if converter in ('str', 'int', 'float', 'bool'):
+                    self._converters[attribute] = (converter, descriptor)
+            elif attribute in the_type._collections_tags:
+                array_tag = the_type._collections_tags[attribute]
+                child_tag = array_tag.get('child_tag', None)
+                if array_tag.get('array', False):
+                    self._add_tag(self._single, attribute, attribute, xml_ns)
+                    if child_tag is not None:
+                        self._child_tags[attribute] = self._get_full_tag(child_tag, xml_ns)
+                        self._set_converter(attribute, self._ARRAY_CONVERSIONS, descriptor)
+                elif child_tag is not None:
+                    self._add_tag(self._multiple, child_tag, attribute, xml_ns)
+                    self._set_converter(attribute, self._LIST_CONVERSIONS, descriptor)
+                else:
+                    # the metadata is broken
+                    raise ValueError(
+                        'Attribute {} in class {} is listed in the _collections_tags dictionary, but the '
+                        '`child_tag` value is either not populated or None.'.format(attribute, the_type))
+            else:
+                self._add_tag(self._single, attribute, attribute, xml_ns)
+                self._set_converter(attribute, self._SINGLE_CONVERSIONS, descriptor)
+
+    @classmethod
+    def get_plan(cls, the_type, xml_ns):
+        """
+        Gets the (cached) parse plan for the given class and namespace.
+
+        Parameters
+        ----------
+        the_type : type
+            The Serializable class.
+        xml_ns : None|dict
+            The xml namespace dictionary.
+
+        Returns
+        -------
+        None|_ParsePlan
+            `None` if the namespace does not define the prefixes required for the class.
+        """
+
+        key = (the_type, None if xml_ns is None else tuple(sorted(xml_ns.items())))
+        try:
+            return _PARSE_PLANS[key]
+        except KeyError:
+            pass
+
+        try:
+            plan = cls(the_type, xml_ns)
+        except KeyError:
+            plan = None
+        _PARSE_PLANS[key] = plan
+        return plan
+
+    def _get_descriptor(self, attribute):
+        for klass in self._the_type.__mro__:
+            if attribute in klass.__dict__:
+                return klass.__dict__[attribute]
+        return None
+
+    def _set_converter(self, attribute, conversions, descriptor):
+        converter = conversions.get(type(descriptor), None)
+        if converter is not None:
+            self._converters[attribute] = (converter, descriptor)
+
+    @staticmethod
+    def _get_full_tag(tag, xml_ns):
+        # the fully qualified tag, as matched by ElementTree for the search path used in from_node
+        if xml_ns is None:
+            return tag
+        if ':' in tag:
+            prefix, tag = tag.split(':', 1)
+        else:
+            prefix = 'default'
+        return '{' + xml_ns[prefix] + '}' + tag
+
+    @classmethod
+    def _add_tag(cls, tag_dict, tag, attribute, xml_ns):
+        full_tag = cls._get_full_tag(tag, xml_ns)
+        tag_dict[full_tag] = tag_dict.get(full_tag, ()) + (attribute, )
+
+    def select(self, node):
+        """
+        Collects the attribute values and child elements of the node for each field.
+        Single valued fields get the first matching child element, and collection
+        fields get the list of all matching child elements.
+
+        Parameters
+        ----------
+        node : ElementTree.Element
+
+        Returns
+        -------
+        dict
+        """
+
+        values = {}
+        if len(self._attributes) > 0:
+            attrib = node.attrib
+            for attribute in self._attributes:
+                values[attribute] = attrib.get(attribute, None)
+
+        single, multiple = self._single, self._multiple
+        for child in node:
+            tag = child.tag
+            if tag in single:
+                for attribute in single[tag]:
+                    if attribute not in values:
+                        values[attribute] = child
+            if tag in multiple:
+                for attribute in multiple[tag]:
+                    entries = values.get(attribute, None)
+                    if entries is None:
+                        values[attribute] = [child, ]
+                    else:
+                        entries.append(child)
+        return values
+
+    def build(self, node, xml_ns):
+        """
+        Constructs the class instance from trusted input, storing converted values
+        directly. Fields with a descriptor type which requires normalization, or
+        which is not a descriptor, are set as usual.
+
+        Parameters
+        ----------
+        node : ElementTree.Element
+        xml_ns : None|dict
+
+        Returns
+        -------
+        Serializable
+        """
+
+        # NB: __init__ is bypassed, since it sets every field through the descriptor,
+        #   so any other instance state requires a class level default
+        instance = self._the_type.__new__(self._the_type)
+        object.__setattr__(instance, '_xml_ns', xml_ns)
+        converters = self._converters
+        for attribute, value in self.select(node).items():
+            if value is None:
+                continue
+            if attribute in converters:
+                converter, descriptor = converters[attribute]
+                value = self._convert(converter, descriptor, attribute, value, instance, xml_ns)
+                if value is not None:
+                    descriptor.data[instance] = value
+                    continue
+            try:
+                setattr(instance, attribute, value)
+            except AttributeError:
+                # read only properties, as in __init__
+                pass
+        return instance
+
+    def _convert(self, converter, descriptor, attribute, value, instance, xml_ns):
+        # NB: a return value of None indicates that the descriptor should set the value
+        if converter == 'serializable':
+            return descriptor.the_type.from_trusted_node(value, xml_ns)
+        elif converter == 'serializable_list':
+            return [descriptor.child_type.from_trusted_node(entry, xml_ns) for entry in value]
+        elif converter == 'parameters':
+            collection = OrderedDict((entry.attrib['name'], _get_node_text(entry)) for entry in value)
+            return ParametersCollection(collection=collection, name=attribute, child_tag=descriptor.child_tag)
+        elif converter in ('float_array', 'serializable_array', 'cp_array'):
+            child_tag = self._child_tags[attribute]
+            children = [entry for entry in value if entry.tag == child_tag]
+            if len(children) == 0:
+                return None
+            if converter == 'float_array':
+                return numpy.array([float(entry.text) for entry in children], dtype=numpy.float64)
+            array = numpy.empty((len(children), ), dtype=numpy.object)
+            for i, entry in enumerate(children):
+                array[i] = descriptor.child_type.from_trusted_node(entry, xml_ns)
+            if converter == 'cp_array':
+                return SerializableCPArray(
+                    coords=array, name=attribute, child_tag=descriptor.child_tag,
+                    child_type=descriptor.child_type, _xml_ns=xml_ns)
+            return SerializableArray(
+                coords=array, name=attribute, child_tag=descriptor.child_tag, child_type=descriptor.child_type,
+                minimum_length=descriptor.minimum_length, maximum_length=descriptor.maximum_length, _xml_ns=xml_ns)
+        elif converter == 'complex':
+            return _parse_complex(value, attribute, instance)
+
+        text = value.strip() if isinstance(value, string_types) else _get_node_text(value)
+        if not text:
+            return None
+        elif converter == 'str':
+            return text
+        elif converter == 'int':
+            return int_func(text)
+        elif converter == 'float':
+            return float(text)
+        elif converter == 'bool':
+            return _parse_bool(text, attribute, instance)
+        elif converter == 'datetime':
+            return _parse_datetime(text, attribute, instance, units=descriptor.units)
+        raise ValueError('Unhandled conversion {}'.format(converter))
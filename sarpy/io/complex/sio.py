@@ -149,6 +149,7 @@ class SIODetails(object):
                     return out, user_dat_len
 
                 num_data_pairs = struct.unpack('{}I'.format(endian), fi.read(4))[0]
+                user_dat_len += 4
 
                 for i in range(num_data_pairs):
                     name_length = struct.unpack('{}I'.format(endian), fi.read(4))[0]
@@ -318,7 +319,9 @@ class SIOReader(BaseReader):
 #  The actual writing implementation
 
 class SIOWriter(BIPWriter):
-    def __init__(self, file_name, sicd_meta, user_data=None):
+    __slots__ = ('_sicd_meta', )
+
+    def __init__(self, file_name, sicd_meta, user_data=None, engine='memmap', engine_options=None):
         """
 
         Parameters
@@ -326,6 +329,11 @@ class SIOWriter(BIPWriter):
         file_name : str
         sicd_meta : SICDType
         user_data : None|Dict[str, str]
+        engine : str
+            The output engine, one of `'memmap'` or `'pwrite'`. See :class:`BIPWriter`.
+        engine_options : None|dict
+            The options for the `'pwrite'` engine, see
+            :class:`sarpy.io.complex.bip.PositionalWriter`.
         """
 
         # choose magic number (with user data) and corresponding endian-ness
@@ -361,15 +369,27 @@ class SIOWriter(BIPWriter):
         data_offset = 20
         with open(file_name, 'wb') as fi:
             fi.write(struct.pack('{}5I'.format(endian), *header))
-            # write the user data - name size, name, value size, value
+            # write the user data - number of pairs, then name size, name, value size, value
+            fi.write(struct.pack('{}I'.format(endian), len(user_data)))
+            data_offset += 4
             for name in user_data:
                 name_bytes = name.encode('utf-8')
                 fi.write(struct.pack('{}I'.format(endian), len(name_bytes)))
-                fi.write(struct.pack('{}{}s'.format(endian, len(name_bytes), name_bytes)))
+                fi.write(struct.pack('{}{}s'.format(endian, len(name_bytes)), name_bytes))
                 val_bytes = user_data[name].encode('utf-8')
                 fi.write(struct.pack('{}I'.format(endian), len(val_bytes)))
-                fi.write(struct.pack('{}{}s'.format(endian, len(val_bytes), val_bytes)))
+                fi.write(struct.pack('{}{}s'.format(endian, len(val_bytes)), val_bytes))
                 data_offset += 4 + len(name_bytes) + 4 + len(val_bytes)
+        self._sicd_meta = sicd_meta
         # initialize the bip writer - we're ready to go
         super(SIOWriter, self).__init__(file_name, image_size, data_type,
-                                        complex_type=complex_type, data_offset=data_offset)
+                                        complex_type=complex_type, data_offset=data_offset,
+                                        engine=engine, engine_options=engine_options)
+
+    @property
+    def sicd_meta(self):
+        """
+        SICDType: the sicd metadata
+        """
+
+        return self._sicd_meta
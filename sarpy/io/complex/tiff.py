@@ -4,6 +4,9 @@ Module providing api consistent with other file types for reading tiff files.
 """
 
 import logging
+import os
+import threading
+import zlib
 import numpy
 import warnings
 
@@ -15,8 +18,10 @@ except ImportError:
     gdal = None
     _HAS_GDAL = False
 
-from .base import BaseChipper, BaseReader
-from .bip import BIPChipper
+# noinspection PyProtectedMember
+from .base import BaseChipper, BaseReader, int_func, _validate_max_workers, _call_concurrently
+# noinspection PyProtectedMember
+from .bip import BIPChipper, _read_into
 
 
 __classification__ = "UNCLASSIFIED"
@@ -357,14 +362,110 @@ class TiffDetails(object):
         self._parse_ifd(fi, tags, type_dtype, offset_dtype, offset_size)  # recurse
 
 
+_SAMPLE_FORMATS = {
+    1: 'u', 2: 'i', 3: 'f', 5: 'i', 6: 'f'}  # 5 and 6 are complex int/float
+# compression tag values for deflate - 32946 is the obsolete (but common) value
+_DEFLATE_COMPRESSION = (8, 32946)
+
+
+def _get_tag_value(tiff_meta, name, default=None):
+    """
+    Gets the first entry of the given tag, or the default if the tag is absent.
+    """
+
+    value = tiff_meta.tags.get(name, None)
+    if value is None:
+        return default
+    return int_func(value[0])
+
+
+def _get_data_details(tiff_meta):
+    """
+    Gets the raw data details for the tiff.
+
+    Parameters
+    ----------
+    tiff_meta : TiffDetails
+
+    Returns
+    -------
+    (numpy.dtype, Tuple[int, int], bool)
+        The data type, data size in storage order, and complex type.
+    """
+
+    samp_form = _get_tag_value(tiff_meta, 'SampleFormat', default=1)
+    if samp_form not in _SAMPLE_FORMATS:
+        raise ValueError('Invalid sample format {}'.format(samp_form))
+    bits_per_sample = _get_tag_value(tiff_meta, 'BitsPerSample')
+    complex_type = (_get_tag_value(tiff_meta, 'SamplesPerPixel', default=1) == 2)  # NB: this is obviously not general
+    if samp_form in [5, 6]:
+        bits_per_sample /= 2
+        complex_type = True
+    data_size = (_get_tag_value(tiff_meta, 'ImageLength'), _get_tag_value(tiff_meta, 'ImageWidth'))
+    data_type = numpy.dtype('{0:s}{1:s}{2:d}'.format(tiff_meta.endian,
+                                                     _SAMPLE_FORMATS[samp_form],
+                                                     int(bits_per_sample/8)))
+    return data_type, data_size, complex_type
+
+
+def _is_contiguous(tiff_meta):
+    """
+    Determines whether the image data is stored uncompressed, in strips which
+    form a single contiguous block of the file.
+
+    Parameters
+    ----------
+    tiff_meta : TiffDetails
+
+    Returns
+    -------
+    bool
+    """
+
+    tags = tiff_meta.tags
+    if _get_tag_value(tiff_meta, 'Compression', default=1) != 1 or 'TileOffsets' in tags or \
+            _get_tag_value(tiff_meta, 'PlanarConfiguration', default=1) != 1:
+        return False
+    offsets = numpy.asarray(tags['StripOffsets'], dtype=numpy.int64)
+    counts = tags.get('StripByteCounts', None)
+    if offsets.size == 1:
+        return True
+    if counts is None:
+        return False
+    counts = numpy.asarray(counts, dtype=numpy.int64)
+    return bool(numpy.all(offsets[1:] == offsets[:-1] + counts[:-1]))
+
+
+def _get_block_runs(indices, block_size):
+    """
+    Partitions the (increasing) indices into runs belonging to the same block.
+
+    Parameters
+    ----------
+    indices : numpy.ndarray
+    block_size : int
+
+    Returns
+    -------
+    List[Tuple[int, int, int]]
+        Entries of the form `(block, first, last)`, where `indices[first:last]`
+        all belong to the given block.
+    """
+
+    blocks = indices//block_size
+    starts = numpy.concatenate(([0, ], numpy.flatnonzero(numpy.diff(blocks)) + 1))
+    ends = numpy.concatenate((starts[1:], [indices.size, ]))
+    return [(int_func(blocks[first]), int_func(first), int_func(last)) for first, last in zip(starts, ends)]
+
+
 class NativeTiffChipper(BIPChipper):
     """
-    Direct reading of data from tiff file, failing if compression is present
+    Direct reading of data from tiff file, for uncompressed data stored in
+    contiguous strips. See :class:`BlockTiffChipper` for the general case.
     """
 
     __slots__ = ('_tiff_meta', )
-    _SAMPLE_FORMATS = {
-        1: 'u', 2: 'i', 3: 'f', 5: 'i', 6: 'f'}  # 5 and 6 are complex int/float
+    _SAMPLE_FORMATS = _SAMPLE_FORMATS
 
     def __init__(self, tiff_meta, symmetry=(False, False, True)):
         """
@@ -381,24 +482,15 @@ class NativeTiffChipper(BIPChipper):
             raise TypeError('NativeTiffChipper input argument must be a filename '
                             'or TiffDetails object.')
 
-        compression_tag = int(tiff_meta.tags['Compression'][0])
+        compression_tag = _get_tag_value(tiff_meta, 'Compression', default=1)
         if compression_tag != 1:
             raise ValueError('Tiff has compression tag {}, but only 1 (no compression) '
                              'is supported.'.format(compression_tag))
+        if not _is_contiguous(tiff_meta):
+            raise ValueError('Tiff data is not stored in contiguous strips, so BlockTiffChipper is required.')
 
         self._tiff_meta = tiff_meta
-        samp_form = tiff_meta.tags['SampleFormat'][0]
-        if samp_form not in self._SAMPLE_FORMATS:
-            raise ValueError('Invalid sample format {}'.format(samp_form))
-        bits_per_sample = tiff_meta.tags['BitsPerSample'][0]
-        complex_type = (int(tiff_meta.tags['SamplesPerPixel'][0]) == 2)  # NB: this is obviously not general
-        if samp_form in [5, 6]:
-            bits_per_sample /= 2
-            complex_type = True
-        data_size = (tiff_meta.tags['ImageLength'][0], tiff_meta.tags['ImageWidth'][0])
-        data_type = numpy.dtype('{0:s}{1:s}{2:d}'.format(self._tiff_meta.endian,
-                                                         self._SAMPLE_FORMATS[samp_form],
-                                                         int(bits_per_sample/8)))
+        data_type, data_size, complex_type = _get_data_details(tiff_meta)
         data_offset = tiff_meta.tags['StripOffsets'][0]
 
         super(NativeTiffChipper, self).__init__(
@@ -406,12 +498,193 @@ class NativeTiffChipper(BIPChipper):
             data_offset=data_offset, bands_ip=1)
 
 
+class BlockTiffChipper(BaseChipper):
+    """
+    Reading of data from a tiff file stored in strips or tiles, which may be
+    deflate compressed. Only the strips or tiles which intersect the requested
+    chip are read and decoded, optionally using a pool of threads. Concurrent
+    reads from multiple threads are safe, since positional reads are used.
+    """
+
+    __slots__ = (
+        '_tiff_meta', '_data_type', '_bands', '_raw_size', '_tiled', '_block_shape', '_block_grid',
+        '_offsets', '_byte_counts', '_compression', '_predictor', '_max_workers', '_fid', '_lock')
+
+    def __init__(self, tiff_meta, symmetry=(False, False, True), max_workers=None):
+        """
+
+        Parameters
+        ----------
+        tiff_meta : TiffMetadata
+        symmetry : Tuple[bool]
+        max_workers : None|int
+            The maximum number of threads for reading and decoding strips or tiles.
+            If `None` or 1, then this is performed serially.
+        """
+
+        if isinstance(tiff_meta, str):
+            tiff_meta = TiffDetails(tiff_meta)
+        if not isinstance(tiff_meta, TiffDetails):
+            raise TypeError('BlockTiffChipper input argument must be a filename '
+                            'or TiffDetails object.')
+
+        self._fid = None
+        self._lock = threading.Lock()
+        self._tiff_meta = tiff_meta
+        tags = tiff_meta.tags
+        self._compression = _get_tag_value(tiff_meta, 'Compression', default=1)
+        if self._compression != 1 and self._compression not in _DEFLATE_COMPRESSION:
+            raise ValueError('Tiff has compression tag {}, but only 1 (no compression), '
+                             'and {} (deflate) are supported.'.format(self._compression, _DEFLATE_COMPRESSION))
+        planar_config = _get_tag_value(tiff_meta, 'PlanarConfiguration', default=1)
+        if planar_config != 1:
+            raise ValueError('Tiff has planar configuration {}, but only 1 (chunky) '
+                             'is supported.'.format(planar_config))
+
+        data_type, data_size, complex_type = _get_data_details(tiff_meta)
+        self._predictor = _get_tag_value(tiff_meta, 'Predictor', default=1)
+        if self._predictor not in (1, 2) or (self._predictor == 2 and data_type.kind == 'f'):
+            raise ValueError('Tiff has predictor {} for data type {}, which is not '
+                             'supported.'.format(self._predictor, data_type))
+        self._data_type = data_type
+        self._bands = 2 if complex_type else 1
+        self._raw_size = data_size
+
+        self._tiled = ('TileOffsets' in tags)
+        if self._tiled:
+            self._block_shape = (_get_tag_value(tiff_meta, 'TileLength'), _get_tag_value(tiff_meta, 'TileWidth'))
+            self._offsets = numpy.asarray(tags['TileOffsets'], dtype=numpy.int64)
+            self._byte_counts = numpy.asarray(tags['TileByteCounts'], dtype=numpy.int64)
+        else:
+            rows_per_strip = min(_get_tag_value(tiff_meta, 'RowsPerStrip', default=data_size[0]), data_size[0])
+            self._block_shape = (rows_per_strip, data_size[1])
+            self._offsets = numpy.asarray(tags['StripOffsets'], dtype=numpy.int64)
+            self._byte_counts = numpy.asarray(tags['StripByteCounts'], dtype=numpy.int64)
+        self._block_grid = (
+            int_func(numpy.ceil(data_size[0]/float(self._block_shape[0]))),
+            int_func(numpy.ceil(data_size[1]/float(self._block_shape[1]))))
+        if self._offsets.size != self._block_grid[0]*self._block_grid[1] or \
+                self._byte_counts.size != self._offsets.size:
+            raise ValueError(
+                'Tiff has {} block offsets and {} block byte counts, but a grid of {} '
+                'blocks is expected'.format(self._offsets.size, self._byte_counts.size, self._block_grid))
+
+        self._max_workers = _validate_max_workers(max_workers)
+        super(BlockTiffChipper, self).__init__(data_size, symmetry=symmetry, complex_type=complex_type)
+        if not os.access(tiff_meta.file_name, os.R_OK):
+            raise IOError('User does not appear to have read access for file {}.'.format(tiff_meta.file_name))
+        self._fid = open(tiff_meta.file_name, 'rb')
+
+    def __getstate__(self):
+        # the file handle is reopened upon first use
+        state = super(BlockTiffChipper, self).__getstate__()
+        state['_fid'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        super(BlockTiffChipper, self).__setstate__(state)
+        self._lock = threading.Lock()
+
+    def __del__(self):
+        if hasattr(self, '_fid') and self._fid is not None and \
+                hasattr(self._fid, 'closed') and not self._fid.closed:
+            self._fid.close()
+
+    @property
+    def max_workers(self):
+        """
+        None|int: The maximum number of threads for reading and decoding strips
+        or tiles.
+        """
+
+        return self._max_workers
+
+    @max_workers.setter
+    def max_workers(self, value):
+        self._max_workers = _validate_max_workers(value)
+
+    def _read_block(self, block_row, block_col):
+        """
+        Reads and decodes the given strip or tile.
+
+        Parameters
+        ----------
+        block_row : int
+        block_col : int
+
+        Returns
+        -------
+        numpy.ndarray
+            Of shape `(rows, columns, bands)`. Note that the final strip may be
+            shorter than the others, while tiles are always of full size.
+        """
+
+        index = block_row*self._block_grid[1] + block_col
+        rows, cols = self._block_shape
+        if not self._tiled:
+            rows = min(rows, self._raw_size[0] - block_row*rows)
+        count = rows*cols*self._bands
+        offset, byte_count = int_func(self._offsets[index]), int_func(self._byte_counts[index])
+        if byte_count == 0:
+            # a sparse tiff block, which is not stored
+            return numpy.zeros((rows, cols, self._bands), dtype=self._data_type)
+
+        buffer = numpy.empty((byte_count, ), dtype=numpy.uint8)
+        _read_into(self._fid, buffer, offset, lock=self._lock)
+        if self._compression != 1:
+            buffer = zlib.decompress(buffer)  # NB: zlib releases the GIL
+        block = numpy.frombuffer(buffer, dtype=self._data_type, count=count).reshape((rows, cols, self._bands))
+        if self._predictor == 2:
+            # undo the horizontal differencing, allowing integer overflow
+            block = numpy.cumsum(block, axis=1, dtype=self._data_type)
+        return block
+
+    def _read_raw_fun(self, range1, range2):
+        range1, range2 = self._reorder_arguments(range1, range2)
+        if self._fid is None:
+            with self._lock:
+                if self._fid is None:
+                    self._fid = open(self._tiff_meta.file_name, 'rb')
+        rows = numpy.arange(*range1, dtype=numpy.int64)
+        cols = numpy.arange(*range2, dtype=numpy.int64)
+        out = numpy.empty((rows.size, cols.size, self._bands), dtype=self._data_type)
+        if rows.size == 0 or cols.size == 0:
+            return out
+        # work in increasing row and column order, and populate out accordingly
+        if range1[2] < 0:
+            rows, out_view = rows[::-1], out[::-1]
+        else:
+            out_view = out
+        if range2[2] < 0:
+            cols, out_view = cols[::-1], out_view[:, ::-1]
+        row_step, col_step = abs(range1[2]), abs(range2[2])
+        block_rows, block_cols = self._block_shape
+
+        def read_block(block_row, row_first, row_last, block_col, col_first, col_last):
+            block = self._read_block(block_row, block_col)
+            row_start = int_func(rows[row_first]) - block_row*block_rows
+            row_end = int_func(rows[row_last-1]) - block_row*block_rows + 1
+            col_start = int_func(cols[col_first]) - block_col*block_cols
+            col_end = int_func(cols[col_last-1]) - block_col*block_cols + 1
+            out_view[row_first:row_last, col_first:col_last] = \
+                block[row_start:row_end:row_step, col_start:col_end:col_step]
+
+        col_runs = _get_block_runs(cols, block_cols)
+        reads = [row_run + col_run for row_run in _get_block_runs(rows, block_rows) for col_run in col_runs]
+        # NB: each block populates a distinct portion of out
+        _call_concurrently(read_block, reads, self._max_workers)
+        return out
+
+
 class GdalTiffChipper(BaseChipper):
     """
-    Utilizing gdal for reading of data from tiff file, should be much more robust
+    Utilizing gdal for reading of data from tiff file, should be much more robust.
+    A gdal dataset must not be used from multiple threads, so each thread opens
+    (and retains) its own dataset, permitting concurrent reads.
     """
     # TODO: this is a work in progress and not quite functional
-    __slots__ = ('_tiff_meta', '_data_set', '_bands', '_virt_array')
+    __slots__ = ('_tiff_meta', '_bands', '_band_sequential', '_local')
 
     def __init__(self, tiff_meta, symmetry=(False, False, True)):
         """
@@ -428,38 +701,81 @@ class GdalTiffChipper(BaseChipper):
                             'or TiffDetails object.')
 
         self._tiff_meta = tiff_meta
+        self._local = threading.local()
         # initialize our dataset - NB: this should close gracefully on garbage collection
-        self._data_set = gdal.Open(tiff_meta.file_name, gdal.GA_ReadOnly)
-        if self._data_set is None:
-            raise ValueError(
-                'GDAL failed with unspecified error in opening file {}'.format(tiff_meta.file_name))
+        data_set = self._get_data_set()
         # get data_size information
-        data_size = (self._data_set.RasterYSize, self._data_set.RasterXSize)
-        self._bands = self._data_set.RasterCount
+        data_size = (data_set.RasterYSize, data_set.RasterXSize)
+        self._bands = data_set.RasterCount
+        self._band_sequential = getattr(data_set, 'band_sequential', False)
         # TODO: get data_type information - specifically how does complex really work?
         complex_type = ''
         super(GdalTiffChipper, self).__init__(data_size, symmetry=symmetry, complex_type=complex_type)
         # 5.) set up our virtual array using GetVirtualMemArray
-        try:
-            self._virt_array = self._data_set.GetVirtualMemArray()
-        except Exception:
-            logging.error(
-                msg="There has been some error using the gdal method GetVirtualMemArray(). "
-                    "Consider falling back to the base sarpy tiff reader implementation (use_gdal=False)")
-            raise
+        self._get_virtual_array()
         # TODO: this does not generally work should we clunkily fall back to dataset.band.ReadAsArray()?
         #   This doesn't support slicing...
 
+    def __getstate__(self):
+        # the datasets are opened by each thread upon first use
+        state = super(GdalTiffChipper, self).__getstate__()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        super(GdalTiffChipper, self).__setstate__(state)
+        self._local = threading.local()
+
+    def _get_data_set(self):
+        """
+        Gets the gdal dataset for the current thread, opening it if necessary.
+
+        Returns
+        -------
+        gdal.Dataset
+        """
+
+        data_set = getattr(self._local, 'data_set', None)
+        if data_set is None:
+            data_set = gdal.Open(self._tiff_meta.file_name, gdal.GA_ReadOnly)
+            if data_set is None:
+                raise ValueError(
+                    'GDAL failed with unspecified error in opening file {}'.format(self._tiff_meta.file_name))
+            self._local.data_set = data_set
+        return data_set
+
+    def _get_virtual_array(self):
+        """
+        Gets the virtual memory array for the current thread, creating it if necessary.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        virt_array = getattr(self._local, 'virt_array', None)
+        if virt_array is None:
+            try:
+                virt_array = self._get_data_set().GetVirtualMemArray()
+            except Exception:
+                logging.error(
+                    msg="There has been some error using the gdal method GetVirtualMemArray(). "
+                        "Consider falling back to the base sarpy tiff reader implementation (use_gdal=False)")
+                raise
+            self._local.virt_array = virt_array
+        return virt_array
+
     def _read_raw_fun(self, range1, range2):
         arange1, arange2 = self._reorder_arguments(range1, range2)
+        virt_array = self._get_virtual_array()
         if self._bands == 1:
-            out = self._virt_array[arange1[0]:arange1[1]:arange1[2], arange2[0]:arange2[1]:arange2[2]]
-        elif self._data_set.band_sequential:
+            out = virt_array[arange1[0]:arange1[1]:arange1[2], arange2[0]:arange2[1]:arange2[2]]
+        elif self._band_sequential:
             # push the bands to the end
-            out = (self._virt_array[:, arange1[0]:arange1[1]:arange1[2], arange2[0]:arange2[1]:arange2[2]]).transpose((2, 0, 1))
+            out = (virt_array[:, arange1[0]:arange1[1]:arange1[2], arange2[0]:arange2[1]:arange2[2]]).transpose((2, 0, 1))
         else:
             # push the bands to the end
-            out = self._virt_array[arange1[0]:arange1[1]:arange1[2], arange2[0]:arange2[1]:arange2[2], :]
+            out = virt_array[arange1[0]:arange1[1]:arange1[2], arange2[0]:arange2[1]:arange2[2], :]
         return out
 
 
@@ -467,7 +783,7 @@ class TiffReader(BaseReader):
     __slots__ = ('_tiff_meta', '_sicd_meta', '_chipper')
     _DEFAULT_SYMMETRY = (False, False, False)
 
-    def __init__(self, tiff_meta, sicd_meta=None, symmetry=None, use_gdal=False):
+    def __init__(self, tiff_meta, sicd_meta=None, symmetry=None, use_gdal=False, max_workers=None):
         """
 
         Parameters
@@ -476,7 +792,10 @@ class TiffReader(BaseReader):
         sicd_meta : None|sarpy.io.complex.sicd_elements.SICD.SICDType
         symmetry : Tuple[bool]
         use_gdal : bool
-            Should we use gdal to read the tiff (required if compressed)
+            Should we use gdal to read the tiff
+        max_workers : None|int
+            The maximum number of threads for reading and decoding strips or tiles,
+            which only applies if the data is compressed or not stored contiguously.
         """
 
         if isinstance(tiff_meta, str):
@@ -503,6 +822,8 @@ class TiffReader(BaseReader):
             use_gdal = False
         if use_gdal:
             chipper = GdalTiffChipper(tiff_meta, symmetry=symmetry)
-        else:
+        elif _is_contiguous(tiff_meta):
             chipper = NativeTiffChipper(tiff_meta, symmetry=symmetry)
+        else:
+            chipper = BlockTiffChipper(tiff_meta, symmetry=symmetry, max_workers=max_workers)
         super(TiffReader, self).__init__(sicd_meta, chipper)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+A least recently used cache of fixed size data tiles, which permits chippers to
+serve repeated or overlapping requests without returning to the underlying file.
+See :attr:`sarpy.io.complex.base.BaseChipper.tile_cache`.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy
+
+__classification__ = "UNCLASSIFIED"
+__author__ = "Thomas McCullough"
+
+
+class TileCache(object):
+    """
+    Thread-safe least recently used (LRU) cache of data tiles, subject to a total
+    byte budget. Tiles are stored as read from the file by the owning chipper, that
+    is in the storage data type and band layout, before any complex conversion or
+    axis swap has been performed.
+
+    A single cache may be shared by several chippers, since the cache keys are
+    specific to the owning chipper.
+    """
+
+    __slots__ = ('_tile_shape', '_max_bytes', '_tiles', '_current_bytes', '_hits', '_misses', '_lock')
+
+    def __init__(self, tile_shape=(512, 512), max_bytes=2**28):
+        """
+
+        Parameters
+        ----------
+        tile_shape : Tuple[int, int]
+            The tile shape of the form `(rows, columns)`, in the output orientation
+            of the chipper.
+        max_bytes : int
+            The maximum number of bytes for all cached tiles combined. The default
+            is :math:`2^{28}` bytes, or 256 MB.
+        """
+
+        tile_shape = (int(tile_shape[0]), int(tile_shape[1]))
+        if tile_shape[0] < 1 or tile_shape[1] < 1:
+            raise ValueError('tile_shape entries must be positive, got {}'.format(tile_shape))
+        self._tile_shape = tile_shape
+
+        max_bytes = int(max_bytes)
+        if max_bytes < 0:
+            raise ValueError('max_bytes must be non-negative, got {}'.format(max_bytes))
+        self._max_bytes = max_bytes
+        self._tiles = OrderedDict()
+        self._current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # the cached tiles are not pickled
+        return {'tile_shape': self._tile_shape, 'max_bytes': self._max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(tile_shape=state['tile_shape'], max_bytes=state['max_bytes'])
+
+    @property
+    def tile_shape(self):
+        """
+        Tuple[int, int]: The tile shape of the form `(rows, columns)`.
+        """
+
+        return self._tile_shape
+
+    @property
+    def max_bytes(self):
+        """
+        int: The maximum number of bytes for all cached tiles combined.
+        """
+
+        return self._max_bytes
+
+    @property
+    def current_bytes(self):
+        """
+        int: The number of bytes currently held in cached tiles.
+        """
+
+        return self._current_bytes
+
+    @property
+    def hits(self):
+        """
+        int: The number of tile requests served from the cache.
+        """
+
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        int: The number of tile requests which required reading from the file.
+        """
+
+        return self._misses
+
+    def get_stats(self):
+        """
+        Gets a summary of the cache usage statistics.
+
+        Returns
+        -------
+        dict
+        """
+
+        with self._lock:
+            return {
+                'tiles': len(self._tiles), 'current_bytes': self._current_bytes,
+                'max_bytes': self._max_bytes, 'hits': self._hits, 'misses': self._misses}
+
+    def clear(self):
+        """
+        Removes all cached tiles, and resets the hit and miss counters.
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            self._tiles.clear()
+            self._current_bytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def get_tile(self, owner, tile_index, fetch):
+        """
+        Gets the given tile from the cache, populating the cache using `fetch`
+        if the tile is not present.
+
+        Parameters
+        ----------
+        owner : object
+            The object (chipper) to which the tile belongs.
+        tile_index : Tuple[int, int]
+            The tile index of the form `(tile_row, tile_column)`.
+        fetch : callable
+            Called with no arguments to read the tile on a cache miss.
+
+        Returns
+        -------
+        numpy.ndarray
+            The tile, which **must not** be modified.
+        """
+
+        key = (owner, tile_index)
+        with self._lock:
+            tile = self._tiles.pop(key, None)
+            if tile is not None:
+                self._hits += 1
+                self._tiles[key] = tile  # reinsert as the most recently used
+                return tile
+            self._misses += 1
+
+        # NB: read outside of the lock, so distinct tiles may be read concurrently.
+        #   Concurrent misses for the same tile simply result in a redundant read.
+        tile = fetch()
+        if not tile.flags.owndata:
+            tile = numpy.array(tile)  # do not retain any reference to a memory map
+        tile.flags.writeable = False
+
+        with self._lock:
+            if key not in self._tiles and tile.nbytes <= self._max_bytes:
+                self._tiles[key] = tile
+                self._current_bytes += tile.nbytes
+                while self._current_bytes > self._max_bytes:
+                    _, evicted = self._tiles.popitem(last=False)
+                    self._current_bytes -= evicted.nbytes
+        return tile
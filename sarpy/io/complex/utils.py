@@ -184,9 +184,12 @@ def parse_xml_from_string(xml_string):
     (ElementTree.Element, dict)
     """
 
-    root_node = ElementTree.fromstring(xml_string)
-    # define the namespace dictionary
-    xml_ns = dict([node for _, node in ElementTree.iterparse(StringIO(xml_string), events=('start-ns',))])
+    # a single streaming pass builds the tree and collects the namespace dictionary
+    xml_ns = {}
+    context = ElementTree.iterparse(StringIO(xml_string), events=('start-ns', ))
+    for _, (prefix, uri) in context:
+        xml_ns[prefix] = uri
+    root_node = context.root
     if len(xml_ns.keys()) == 0:
         xml_ns = None
     elif '' in xml_ns:
@@ -0,0 +1,540 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy, composable views of the image data of a reader. A view records cropping,
+flipping, transposing, decimation, frame and band selection and element-wise
+transforms (for example, magnitude, remap or calibration scaling) without reading
+any data, and only the requested portion is read when the view is indexed. This
+extends the functionality of :class:`sarpy.io.complex.base.SubsetReader`.
+
+Views provide the :code:`__array__` interface, and may be evaluated chunk by
+chunk in bounded memory using :func:`ImageView.iter_chunks`, or as a dask array
+using :func:`ImageView.to_dask`, if dask is installed.
+
+Examples
+--------
+.. code-block:: python
+
+    from sarpy.io.complex.converter import open_complex
+    from sarpy.io.complex.view import ImageView
+
+    reader = open_complex(file_name)
+    view = ImageView(reader).crop((1000, 5000), (2000, 6000)).decimate(4).magnitude()
+    chip = view[:100, :100]  # only this portion is read
+    for row_slice, col_slice, data in view.iter_chunks(max_bytes=2**24):
+        process(data)
+"""
+
+import sys
+
+import numpy
+
+try:
+    import dask.array as dask_array
+except ImportError:
+    dask_array = None
+
+__classification__ = "UNCLASSIFIED"
+__author__ = "Thomas McCullough"
+
+
+integer_types = (int, numpy.integer)
+if sys.version_info[0] < 3:
+    # noinspection PyUnresolvedReferences
+    integer_types = (int, long, numpy.integer)
+
+
+def _compose_map(index_map, item):
+    """
+    Composes the index map with the given slice or integer.
+
+    Parameters
+    ----------
+    index_map : Tuple[int, int, int]
+        Of the form `(start, step, size)`, so that view index `i` corresponds to
+        source index `start + i*step`.
+    item : None|int|slice
+
+    Returns
+    -------
+    Tuple[int, int, int]
+    """
+
+    start, step, size = index_map
+    if item is None:
+        return index_map
+    if isinstance(item, integer_types):
+        item = int(item)
+        if not (-size <= item < size):
+            raise IndexError('index {} is out of bounds for axis with size {}'.format(item, size))
+        if item < 0:
+            item += size
+        return start + item*step, step, 1
+    if isinstance(item, slice):
+        the_start, the_stop, the_step = item.indices(size)
+        count = len(range(the_start, the_stop, the_step))
+        return start + the_start*step, step*the_step, count
+    raise TypeError('Expected an integer or slice, got type {}'.format(type(item)))
+
+
+def _get_read_range(index_map):
+    """
+    Gets the increasing range to read for the given index map.
+
+    Parameters
+    ----------
+    index_map : Tuple[int, int, int]
+
+    Returns
+    -------
+    (Tuple[int, int, int], bool)
+        The range of the form `(start, stop, step)`, and whether the result
+        requires reversing.
+    """
+
+    start, step, size = index_map
+    if size == 1:
+        return (start, start + 1, 1), False
+    if step > 0:
+        return (start, start + step*(size - 1) + 1, step), False
+    first = start + step*(size - 1)
+    return (first, start + 1, -step), True
+
+
+class ImageView(object):
+    """
+    A lazy view of the image data for a single frame of a reader. Each method
+    returns a new view, and no data is read until the view is indexed or
+    converted to an array.
+    """
+
+    __slots__ = ('_reader', '_index', '_row_map', '_col_map', '_transposed', '_band', '_transforms')
+
+    def __init__(self, reader, index=None):
+        """
+
+        Parameters
+        ----------
+        reader : sarpy.io.complex.base.BaseReader
+        index : None|int
+            The frame (i.e. sicd/chipper index) of the reader. Defaults to `0`.
+        """
+
+        self._reader = reader
+        # noinspection PyProtectedMember
+        self._index = reader._validate_index(index)
+        # noinspection PyProtectedMember
+        rows, cols = reader._get_chippers_as_tuple()[self._index].data_size
+        self._row_map = (0, 1, rows)
+        self._col_map = (0, 1, cols)
+        self._transposed = False
+        self._band = None
+        self._transforms = ()
+
+    def _copy(self, **kwargs):
+        """
+        Gets a copy of this view, with the given attributes replaced.
+
+        Returns
+        -------
+        ImageView
+        """
+
+        out = ImageView.__new__(ImageView)
+        for attribute in self.__slots__:
+            setattr(out, attribute, kwargs.get(attribute, getattr(self, attribute)))
+        return out
+
+    @property
+    def reader(self):
+        """
+        BaseReader: The underlying reader.
+        """
+
+        return self._reader
+
+    @property
+    def index(self):
+        """
+        int: The frame of the underlying reader.
+        """
+
+        return self._index
+
+    @property
+    def shape(self):
+        """
+        Tuple[int, int]: The shape of the view.
+        """
+
+        return self._row_map[2], self._col_map[2]
+
+    @property
+    def ndim(self):
+        """
+        int: The number of dimensions.
+        """
+
+        return 2
+
+    @property
+    def size(self):
+        """
+        int: The number of elements.
+        """
+
+        return self._row_map[2]*self._col_map[2]
+
+    @property
+    def dtype(self):
+        """
+        numpy.dtype: The data type of the view, which is complex64 unless changed
+        by an element-wise transform. This is determined without reading data.
+        """
+
+        with numpy.errstate(all='ignore'):
+            return self._apply_transforms(numpy.zeros((1, 1), dtype=numpy.complex64)).dtype
+
+    def __len__(self):
+        return self._row_map[2]
+
+    def __repr__(self):
+        return '{}(shape={}, index={}, transforms={})'.format(
+            self.__class__.__name__, self.shape, self._index, len(self._transforms))
+
+    # geometric operations
+    def crop(self, row_range=None, col_range=None):
+        """
+        Restrict to the given row and column ranges.
+
+        Parameters
+        ----------
+        row_range : None|Tuple[int, int]
+            Of the form `(start, stop)`, where either entry may be `None`.
+        col_range : None|Tuple[int, int]
+
+        Returns
+        -------
+        ImageView
+        """
+
+        row_item = None if row_range is None else slice(row_range[0], row_range[1])
+        col_item = None if col_range is None else slice(col_range[0], col_range[1])
+        return self._copy(
+            _row_map=_compose_map(self._row_map, row_item), _col_map=_compose_map(self._col_map, col_item))
+
+    def flip(self, axis=0):
+        """
+        Reverse the order along the given axis.
+
+        Parameters
+        ----------
+        axis : int
+            One of `0` (rows) or `1` (columns).
+
+        Returns
+        -------
+        ImageView
+        """
+
+        if axis == 0:
+            return self._copy(_row_map=_compose_map(self._row_map, slice(None, None, -1)))
+        elif axis == 1:
+            return self._copy(_col_map=_compose_map(self._col_map, slice(None, None, -1)))
+        raise ValueError('axis must be one of 0 or 1, got {}'.format(axis))
+
+    def transpose(self):
+        """
+        Swap the row and column axes.
+
+        Returns
+        -------
+        ImageView
+        """
+
+        return self._copy(_row_map=self._col_map, _col_map=self._row_map, _transposed=not self._transposed)
+
+    @property
+    def T(self):
+        """
+        ImageView: The transposed view.
+        """
+
+        return self.transpose()
+
+    def decimate(self, row_step, col_step=None):
+        """
+        Decimate by the given steps.
+
+        Parameters
+        ----------
+        row_step : int
+        col_step : None|int
+            Defaults to `row_step`.
+
+        Returns
+        -------
+        ImageView
+        """
+
+        if col_step is None:
+            col_step = row_step
+        row_step, col_step = int(row_step), int(col_step)
+        if row_step < 1 or col_step < 1:
+            raise ValueError('Decimation steps must be positive, got {}'.format((row_step, col_step)))
+        return self._copy(
+            _row_map=_compose_map(self._row_map, slice(None, None, row_step)),
+            _col_map=_compose_map(self._col_map, slice(None, None, col_step)))
+
+    def select_frame(self, index):
+        """
+        Get the same view of a different frame of the reader, which must have
+        the same size.
+
+        Parameters
+        ----------
+        index : int
+
+        Returns
+        -------
+        ImageView
+        """
+
+        # noinspection PyProtectedMember
+        index = self._reader._validate_index(index)
+        # noinspection PyProtectedMember
+        chippers = self._reader._get_chippers_as_tuple()
+        if chippers[index].data_size != chippers[self._index].data_size:
+            raise ValueError(
+                'Frame {} has size {}, which differs from the size {} of frame {}'.format(
+                    index, chippers[index].data_size, chippers[self._index].data_size, self._index))
+        return self._copy(_index=index)
+
+    def select_band(self, band):
+        """
+        Select the given band, for a reader which provides multiple band data of
+        shape `(rows, columns, bands)`.
+
+        Parameters
+        ----------
+        band : int
+
+        Returns
+        -------
+        ImageView
+        """
+
+        return self._copy(_band=int(band))
+
+    # element-wise operations
+    def apply(self, function):
+        """
+        Apply the given element-wise function, which must accept and return an
+        array of the same shape. This is applied to each portion as it is read,
+        so must not depend on any statistics of the whole image.
+
+        Parameters
+        ----------
+        function : callable
+
+        Returns
+        -------
+        ImageView
+        """
+
+        if not callable(function):
+            raise TypeError('function must be callable, got type {}'.format(type(function)))
+        return self._copy(_transforms=self._transforms + (function, ))
+
+    def magnitude(self):
+        """
+        Get the magnitude of the data.
+
+        Returns
+        -------
+        ImageView
+        """
+
+        return self.apply(numpy.abs)
+
+    def scale(self, factor):
+        """
+        Scale the data by the given factor, for example a calibration constant.
+
+        Parameters
+        ----------
+        factor : float|complex|numpy.ndarray
+
+        Returns
+        -------
+        ImageView
+        """
+
+        return self.apply(lambda data: data*factor)
+
+    def remap(self, remap_function='density'):
+        """
+        Apply a display remap. Note that the remap functions defined in
+        :mod:`sarpy.visualization.remap` estimate their parameters from the
+        data provided, and so each portion read would be remapped independently.
+        For consistent tiled output, use a function with fixed parameters, for
+        example :code:`functools.partial(remap.amplitude_to_density, data_mean=mean)`.
+
+        Parameters
+        ----------
+        remap_function : str|callable
+            The name of a remap function in :mod:`sarpy.visualization.remap`, or
+            the function itself.
+
+        Returns
+        -------
+        ImageView
+        """
+
+        if not callable(remap_function):
+            from ...visualization import remap
+            remap_names = [entry[0] for entry in remap.get_remap_list()]
+            if remap_function not in remap_names:
+                raise ValueError('Unknown remap {}, the options are {}'.format(remap_function, remap_names))
+            remap_function = getattr(remap, remap_function)
+        return self.apply(remap_function)
+
+    def _apply_transforms(self, data):
+        for function in self._transforms:
+            data = function(data)
+        return data
+
+    # evaluation
+    def _read(self, row_map, col_map):
+        """
+        Reads the data for the given (view) index maps.
+
+        Parameters
+        ----------
+        row_map : Tuple[int, int, int]
+        col_map : Tuple[int, int, int]
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        if row_map[2] == 0 or col_map[2] == 0:
+            return numpy.zeros((row_map[2], col_map[2]), dtype=self.dtype)
+        source_rows, source_cols = (col_map, row_map) if self._transposed else (row_map, col_map)
+        range1, reverse1 = _get_read_range(source_rows)
+        range2, reverse2 = _get_read_range(source_cols)
+        data = self._reader.read_chip(range1, range2, index=self._index)
+        if reverse1:
+            data = data[::-1]
+        if reverse2:
+            data = data[:, ::-1]
+        if self._band is not None and data.ndim == 3:
+            data = data[:, :, self._band]
+        if self._transposed:
+            data = numpy.swapaxes(data, 0, 1)
+        return self._apply_transforms(data)
+
+    def __getitem__(self, item):
+        """
+        Reads the given portion of the view.
+
+        Parameters
+        ----------
+        item : int|slice|Tuple[int|slice, int|slice]
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+
+        if not isinstance(item, tuple):
+            item = (item, )
+        if len(item) > 2:
+            raise IndexError('Too many indices for a view with two dimensions')
+        row_item = item[0]
+        col_item = item[1] if len(item) > 1 else None
+        data = self._read(_compose_map(self._row_map, row_item), _compose_map(self._col_map, col_item))
+        # integer indices reduce the dimension, in the usual manner
+        if isinstance(col_item, integer_types):
+            data = data[:, 0]
+        if isinstance(row_item, integer_types):
+            data = data[0]
+        return data
+
+    def __array__(self, dtype=None, copy=None):
+        data = self._read(self._row_map, self._col_map)
+        return data if dtype is None else data.astype(dtype)
+
+    def get_chunk_shape(self, max_bytes=None):
+        """
+        Gets the default chunk shape, consisting of full rows with the number of
+        rows determined by `max_bytes`.
+
+        Parameters
+        ----------
+        max_bytes : None|int
+            The (nominal) maximum size in bytes of each chunk, defaults to
+            :math:`2^{26}` bytes.
+
+        Returns
+        -------
+        Tuple[int, int]
+        """
+
+        if max_bytes is None:
+            max_bytes = 2**26
+        rows, cols = self.shape
+        item_size = max(self.dtype.itemsize, 8)
+        return max(1, min(rows, int(max_bytes//(item_size*max(cols, 1))))), max(1, cols)
+
+    def iter_chunks(self, chunk_shape=None, max_bytes=None):
+        """
+        Evaluates the view chunk by chunk, in bounded memory.
+
+        Parameters
+        ----------
+        chunk_shape : None|Tuple[int, int]
+            The chunk shape. If not provided, see :func:`get_chunk_shape`.
+        max_bytes : None|int
+            Only used if `chunk_shape` is not provided.
+
+        Yields
+        ------
+        (slice, slice, numpy.ndarray)
+            The row and column slices of the view, and the data.
+        """
+
+        if chunk_shape is None:
+            chunk_shape = self.get_chunk_shape(max_bytes=max_bytes)
+        chunk_rows, chunk_cols = int(chunk_shape[0]), int(chunk_shape[1])
+        if chunk_rows < 1 or chunk_cols < 1:
+            raise ValueError('chunk_shape entries must be positive, got {}'.format(chunk_shape))
+        rows, cols = self.shape
+        for row_start in range(0, rows, chunk_rows):
+            row_slice = slice(row_start, min(row_start + chunk_rows, rows))
+            for col_start in range(0, cols, chunk_cols):
+                col_slice = slice(col_start, min(col_start + chunk_cols, cols))
+                yield row_slice, col_slice, self[row_slice, col_slice]
+
+    def to_dask(self, chunks=None, max_bytes=None):
+        """
+        Gets a dask array which evaluates this view lazily, chunk by chunk. This
+        requires that dask is installed.
+
+        Parameters
+        ----------
+        chunks : None|Tuple[int, int]
+            The dask chunks. If not provided, see :func:`get_chunk_shape`.
+        max_bytes : None|int
+            Only used if `chunks` is not provided.
+
+        Returns
+        -------
+        dask.array.Array
+        """
+
+        if dask_array is None:
+            raise ImportError('Converting to a dask array requires that dask is installed.')
+        if chunks is None:
+            chunks = self.get_chunk_shape(max_bytes=max_bytes)
+        return dask_array.from_array(self, chunks=chunks, asarray=False, fancy=False)
@@ -457,6 +457,28 @@ class NITFElement(BaseNITFElement):
         for fld in self._ordering:
             setattr(self, fld, kwargs.get(fld, None))
 
+    def __getstate__(self):
+        # NB: the field values are held by the descriptors, rather than the instance dictionary
+        state = dict(getattr(self, '__dict__', {}))
+        for klass in self.__class__.__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        for fld in self._ordering:
+            try:
+                state[fld] = getattr(self, fld)
+            except AttributeError:
+                # required, but not populated
+                state[fld] = None
+        return state
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            if key not in self._ordering:
+                object.__setattr__(self, key, value)
+        for fld in self._ordering:
+            setattr(self, fld, state.get(fld, None))
+
     @classmethod
     def minimum_length(cls):
         """
@@ -307,10 +307,10 @@ class NITFDetails(object):
         ImageSegmentHeader
         """
 
-        if index >= self.img_subheader_offsets:
+        if index >= self.img_subheader_offsets.size:
             raise IndexError(
                 'There are only {} image segments, invalid image '
-                'segment position {}'.format(self.img_subheader_offsets, index))
+                'segment position {}'.format(self.img_subheader_offsets.size, index))
         offset = self.img_subheader_offsets[index]
         subhead_size = self._nitf_header.ImageSegments.subhead_sizes[index]
         with open(self._file_name, mode='rb') as fi:
@@ -1,5 +1,10 @@
+import os
+import logging
+import threading
+
 import sarpy.io.complex as sarpy_complex
 from sarpy.io.complex.base import BaseReader
+from sarpy.io.complex.overview import build_overviews, get_overview_file_name
 import sarpy.visualization.remap as remap
 import sarpy.geometry.point_projection as point_projection
 from tkinter_gui_builder.canvas_image_objects.abstract_canvas_image import AbstractCanvasImage
@@ -12,6 +17,8 @@ class SarpyCanvasDisplayImage(AbstractCanvasImage):
     def __init__(self):
         self.reader_object = None           # type: BaseReader
         self.remap_type = "density"         # type: str
+        self.use_overviews = False          # type: bool
+        self.overview_thread = None         # type: threading.Thread
 
     def init_from_fname_and_canvas_size(self,
                                         fname,      # type: str
@@ -26,8 +33,54 @@ class SarpyCanvasDisplayImage(AbstractCanvasImage):
         self.canvas_nx = canvas_nx
         self.canvas_ny = canvas_ny
         self.scale_to_fit_canvas = scale_to_fit_canvas
+        if self.use_overviews:
+            self.enable_overviews()
         self.update_canvas_display_image_from_full_image()
 
+    def enable_overviews(self):
+        """
+        Serve decimated reads from the overview sidecar of the image. If there is
+        no sidecar matching the current image file and the image is larger than the
+        canvas, then the sidecar is built on a background thread, and decimated
+        reads are served from the full resolution image until it is complete.
+        No sidecar is built if its directory is not writable.
+
+        This is only performed if `use_overviews` is set, since the sidecar is
+        written next to the image file, and may be large.
+        """
+
+        overview_file = get_overview_file_name(self.fname)
+        if os.path.isfile(overview_file):
+            try:
+                self.reader_object.enable_overviews(overview_file, source_file=self.fname)
+                return
+            except (IOError, OSError, ValueError) as e:
+                logging.warning('Rebuilding overviews for {}, with error {}'.format(self.fname, e))
+        if self.full_image_ny <= 2*self.canvas_ny and self.full_image_nx <= 2*self.canvas_nx:
+            return
+        overview_directory = os.path.dirname(os.path.abspath(overview_file))
+        if not os.access(overview_directory, os.W_OK):
+            logging.info('Overviews for {} are not built, since {} is not writable'.format(
+                self.fname, overview_directory))
+            return
+        self.overview_thread = threading.Thread(
+            target=self._build_overviews, args=(self.fname, self.reader_object, overview_file))
+        self.overview_thread.daemon = True
+        self.overview_thread.start()
+
+    def _build_overviews(self, fname, reader_object, overview_file):
+        """
+        Builds the overview sidecar using a separate reader, and enables the
+        overviews for `reader_object` if it is still the displayed reader.
+        """
+
+        try:
+            build_overviews(sarpy_complex.open(fname), overview_file, attach=False, source_file=fname)
+            if reader_object is self.reader_object:
+                reader_object.enable_overviews(overview_file, source_file=fname)
+        except (IOError, OSError, ValueError) as e:
+            logging.warning('Overviews for {} are unavailable, with error {}'.format(fname, e))
+
     def get_decimated_image_data_in_full_image_rect(self,
                                                     full_image_rect,  # type: (int, int, int, int)
                                                     decimation,  # type: int
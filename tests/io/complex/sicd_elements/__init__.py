@@ -29,6 +29,10 @@ def generic_construction_test(instance, the_type, the_dict, tag='The_Type', prin
         item2 = the_type.from_node(node, None)
         instance.assertEqual(the_item.to_dict(), item2.to_dict())
 
+    with instance.subTest(msg='Test trusted xml deserialization'):
+        item3 = the_type.from_trusted_node(node, None)
+        instance.assertEqual(the_item.to_dict(), item3.to_dict())
+
     with instance.subTest(msg='Test validity'):
         instance.assertTrue(the_item.is_valid())
     return the_item
@@ -1,5 +1,10 @@
 
+import copy
+import logging
+from xml.etree import ElementTree
+
 from sarpy.io.complex.sicd_elements import SICD
+from sarpy.io.complex.utils import parse_xml_from_string
 
 from . import generic_construction_test, unittest
 
@@ -82,3 +87,41 @@ class TestSICD(unittest.TestCase):
         item1.ImageFormation.ImageFormAlgo = 'PFA'
         # SICD does not have the PFA item set, so this should warn us
         self.assertFalse(item1.is_valid())
+
+
+class TestSICDDeserialization(unittest.TestCase):
+    urn = 'urn:SICD:1.1.0'
+
+    def setUp(self):
+        the_dict = copy.deepcopy(sicd_dict)
+        the_dict['RMA'] = rma_dict1
+        the_dict['ImageFormation']['ImageFormAlgo'] = 'RMA'
+        self.sicd = SICD.SICDType.from_dict(the_dict)
+        self.xml = self.sicd.to_xml_string(urn=self.urn)
+
+    def test_namespace(self):
+        root_node, xml_ns = parse_xml_from_string(self.xml)
+        with self.subTest(msg='namespace dictionary'):
+            self.assertEqual(xml_ns['default'], self.urn)
+        with self.subTest(msg='from_node'):
+            item = SICD.SICDType.from_node(root_node, xml_ns)
+            self.assertEqual(self.sicd.to_xml_string(urn=self.urn), item.to_xml_string(urn=self.urn))
+        with self.subTest(msg='from_trusted_node'):
+            item = SICD.SICDType.from_trusted_node(root_node, xml_ns)
+            self.assertEqual(self.sicd.to_xml_string(urn=self.urn), item.to_xml_string(urn=self.urn))
+            self.assertTrue(item.is_valid(recursive=True))
+
+    def test_trusted_deferred_validation(self):
+        root_node, xml_ns = parse_xml_from_string(self.xml)
+        scpcoa = root_node.find('default:SCPCOA', xml_ns)
+        scpcoa.remove(scpcoa.find('default:GrazeAng', xml_ns))
+        item = SICD.SICDType.from_trusted_node(root_node, xml_ns)
+        self.assertIsNone(item.SCPCOA.GrazeAng)
+        with self.assertLogs(level=logging.ERROR):
+            self.assertFalse(item.is_valid(recursive=True))
+
+    def test_no_namespace(self):
+        root_node = ElementTree.fromstring(self.sicd.to_xml_string())
+        item1 = SICD.SICDType.from_node(root_node, None)
+        item2 = SICD.SICDType.from_trusted_node(root_node, None)
+        self.assertEqual(item1.to_dict(), item2.to_dict())
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy
+
+from sarpy.io.complex.amp_phase import AmpPhaseCodec
+from sarpy.io.complex.sicd import SICDReader, SICDWriter
+from sarpy.io.complex.sio import SIOReader, SIOWriter
+
+from . import unittest
+from .test_sicd import generate_sicd
+
+
+def reference_decode(lookup_table, data):
+    amplitude = lookup_table[data[:, :, 0::2]]
+    theta = data[:, :, 1::2]*(2*numpy.pi/256)
+    return amplitude*numpy.exp(1j*theta)
+
+
+class TestAmpPhaseCodec(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.lookup_table = numpy.linspace(0, 5, 256)**2
+        cls.codes = numpy.random.randint(0, 256, size=(37, 23, 2)).astype(numpy.uint8)
+
+    def test_decode(self):
+        codec = AmpPhaseCodec(self.lookup_table)
+        expected = reference_decode(self.lookup_table, self.codes)
+        data = codec.decode(self.codes)
+        self.assertEqual(data.dtype, numpy.complex64)
+        self.assertTrue(numpy.allclose(data, expected, rtol=1e-6, atol=1e-5))
+        # non-contiguous input, and decoding into a provided array
+        out = numpy.zeros((12, 8, 1), dtype=numpy.complex64)
+        self.assertTrue(codec.decode(self.codes[30:6:-2, ::3], out=out) is out)
+        self.assertTrue(numpy.allclose(out, expected[30:6:-2, ::3], rtol=1e-6, atol=1e-5))
+        with self.assertRaises(ValueError):
+            codec.decode(self.codes[:, :, 0])
+        with self.assertRaises(ValueError):
+            codec.decode(self.codes, out=numpy.zeros((37, 23, 1), dtype=numpy.complex128))
+
+    def test_round_trip(self):
+        for name, lookup_table in [('default', None), ('increasing', self.lookup_table),
+                                   ('unordered', numpy.random.permutation(self.lookup_table))]:
+            codec = AmpPhaseCodec(lookup_table)
+            with self.subTest(msg=name):
+                decoded = codec.decode(self.codes)[:, :, 0]
+                for dtype in [numpy.complex64, numpy.complex128]:
+                    codes = codec.encode(decoded.astype(dtype))
+                    self.assertTrue(numpy.allclose(codec.decode(codes)[:, :, 0], decoded, rtol=1e-5, atol=1e-5))
+
+    def test_nearest(self):
+        codec = AmpPhaseCodec(self.lookup_table)
+        amplitude = numpy.random.uniform(0, 30, size=(11, 13))
+        phase = numpy.random.uniform(-numpy.pi, numpy.pi, size=(11, 13))
+        codes = codec.encode(amplitude*numpy.exp(1j*phase))
+        # brute force nearest amplitude, and nearest phase (modulo 2*pi)
+        expected = numpy.argmin(numpy.abs(amplitude[:, :, numpy.newaxis] - self.lookup_table), axis=2)
+        self.assertTrue(numpy.all(codes[:, :, 0] == expected))
+        phase_error = numpy.angle(numpy.exp(1j*(phase - codes[:, :, 1]*(2*numpy.pi/256))))
+        self.assertTrue(numpy.all(numpy.abs(phase_error) <= numpy.pi/256 + 1e-9))
+
+    def test_pickle(self):
+        codec = pickle.loads(pickle.dumps(AmpPhaseCodec(self.lookup_table)))
+        self.assertTrue(numpy.all(codec.amplitude_table == self.lookup_table))
+        self.assertTrue(numpy.allclose(
+            codec.decode(self.codes), reference_decode(self.lookup_table, self.codes), rtol=1e-6, atol=1e-5))
+
+
+class TestAmpPhaseFiles(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.codec = AmpPhaseCodec(numpy.linspace(0, 5, 256)**2)
+        codes = numpy.random.randint(0, 256, size=(41, 27, 2)).astype(numpy.uint8)
+        cls.data = cls.codec.decode(codes)[:, :, 0]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_sicd(self):
+        file_name = os.path.join(self.directory, 'amp_phase.nitf')
+        sicd = generate_sicd(file_name, self.data, pixel_type='AMP8I_PHS8I', amp_table=self.codec.amplitude_table)
+        reader = SICDReader(file_name)
+        self.assertTrue(numpy.allclose(reader[:, :], self.data, rtol=1e-5, atol=1e-5))
+        self.assertTrue(numpy.allclose(reader[30:3:-2, 5:20], self.data[30:3:-2, 5:20], rtol=1e-5, atol=1e-5))
+
+        sio_file = os.path.join(self.directory, 'amp_phase.sio')
+        with SIOWriter(sio_file, sicd) as writer:
+            writer(self.data, (0, 0))
+        self.assertTrue(numpy.allclose(SIOReader(sio_file)[:, :], self.data, rtol=1e-5, atol=1e-5))
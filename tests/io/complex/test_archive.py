@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from sarpy.io.complex.archive import SICDArchiveReader, SICDArchiveWriter, h5py
+from sarpy.io.complex.converter import open_complex, conversion_utility
+from sarpy.io.complex.sicd import SICDReader, amp_phase_to_complex, complex_to_amp_phase
+
+from . import unittest
+from .test_sicd import generate_sicd
+
+
+@unittest.skipIf(h5py is None, 'h5py is not available')
+class TestSICDArchive(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        shape = (123, 77)
+        # smooth data, which is compressible
+        rows, cols = numpy.meshgrid(numpy.arange(shape[0]), numpy.arange(shape[1]), indexing='ij')
+        cls.data = (numpy.round(100*numpy.cos(rows/10.)) + 1j*numpy.round(100*numpy.sin(cols/7.))).astype(
+            numpy.complex64)
+        cls.sicd = generate_sicd(os.path.join(cls.directory, 'template.nitf'), cls.data)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def write_archive(self, name, pixel_type='RE32F_IM32F', blocks=None, **kwargs):
+        sicd = self.sicd.copy()
+        sicd.ImageData.PixelType = pixel_type
+        if pixel_type == 'AMP8I_PHS8I':
+            sicd.ImageData.AmpTable = numpy.arange(256, dtype=numpy.float64)
+        file_name = os.path.join(self.directory, name)
+        if blocks is None:
+            blocks = [(slice(0, 50), slice(0, 30)), (slice(0, 50), slice(30, 77)), (slice(50, 123), slice(0, 77))]
+        with SICDArchiveWriter(file_name, sicd, chunk_shape=(16, 32), **kwargs) as writer:
+            for row_slice, col_slice in blocks:
+                writer(self.data[row_slice, col_slice], (row_slice.start, col_slice.start))
+            self.assertTrue(writer.fully_written)
+            self.assertEqual(len(writer._pending), 0)
+        return file_name
+
+    def test_round_trip(self):
+        for pixel_type in ['RE32F_IM32F', 'RE16I_IM16I', 'AMP8I_PHS8I']:
+            for options in [{'max_workers': 1}, {'max_workers': 4, 'shuffle': False}, {'compression_level': 0}]:
+                with self.subTest(msg='pixel_type={}, options={}'.format(pixel_type, options)):
+                    file_name = self.write_archive('round_trip.h5', pixel_type=pixel_type, **options)
+                    reader = open_complex(file_name)
+                    self.assertIsInstance(reader, SICDArchiveReader)
+                    self.assertEqual(reader.sicd_meta.ImageData.PixelType, pixel_type)
+                    expected = self.data
+                    if pixel_type == 'AMP8I_PHS8I':
+                        # this is lossy, so compare with the SICD conversion
+                        table = numpy.arange(256, dtype=numpy.float64)
+                        expected = amp_phase_to_complex(table)(complex_to_amp_phase(table)(self.data))[:, :, 0]
+                    self.assertTrue(numpy.all(reader[:, :] == expected))
+                    self.assertTrue(numpy.all(reader[100:10:-3, 5:70:4] == expected[100:10:-3, 5:70:4]))
+                    with h5py.File(file_name, 'r') as hf:
+                        self.assertEqual(hf['image'].chunks, (16, 32, 2))
+                    os.remove(file_name)
+
+    def test_compression(self):
+        compressed = self.write_archive('compressed.h5')
+        uncompressed = self.write_archive('uncompressed.h5', compression_level=0)
+        self.assertLess(os.path.getsize(compressed), os.path.getsize(uncompressed)/2)
+
+    def test_unaligned_blocks(self):
+        # many small blocks, which each only partially fill chunks
+        blocks = [(slice(start, min(start + 7, 123)), slice(col, min(col + 11, 77)))
+                  for start in range(0, 123, 7) for col in range(0, 77, 11)]
+        numpy.random.shuffle(blocks)
+        reader = SICDArchiveReader(self.write_archive('unaligned.h5', blocks=blocks))
+        self.assertTrue(numpy.all(reader[:, :] == self.data))
+
+    def test_conversion(self):
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        conversion_utility(
+            os.path.join(self.directory, 'template.nitf'), output_directory, output_files='output.h5',
+            output_format='ARCHIVE')
+        reader = open_complex(os.path.join(output_directory, 'output.h5'))
+        self.assertIsInstance(reader, SICDArchiveReader)
+        self.assertTrue(numpy.all(reader[:, :] == SICDReader(os.path.join(self.directory, 'template.nitf'))[:, :]))
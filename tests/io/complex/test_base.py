@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+import shutil
+import tempfile
+
+import numpy
+
+from sarpy.io.complex.base import BaseReader, SubsetChipper
+from sarpy.io.complex.bip import BIPChipper
+from sarpy.io.complex.sicd import MultiSegmentChipper
+
+from . import unittest
+from .test_chippers import generate_segmented_file
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class TestIterBlocks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        shape = (67, 29)
+        cls.data = (numpy.random.randn(*shape) + 1j*numpy.random.randn(*shape)).astype(numpy.complex64)
+        file_name, _, offsets = generate_segmented_file(cls.directory, cls.data, [shape[0], ])
+        cls.reader = BaseReader(
+            None, BIPChipper(file_name, '>f4', shape, complex_type=True, data_offset=int(offsets[0])))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def check_coverage(self, blocks, row_limits, col_limits):
+        covered = numpy.zeros(self.data.shape, dtype=numpy.int64)
+        for row_slice, col_slice, data in blocks:
+            self.assertTrue(numpy.all(data == self.data[row_slice, col_slice]))
+            covered[row_slice, col_slice] += 1
+        self.assertTrue(numpy.all(covered[row_limits[0]:row_limits[1], col_limits[0]:col_limits[1]] >= 1))
+        return covered
+
+    def test_blocks(self):
+        for prefetch in [0, 1, 3]:
+            with self.subTest(msg='prefetch={}'.format(prefetch)):
+                blocks = list(self.reader.iter_blocks(block_shape=(10, None), prefetch=prefetch))
+                self.assertEqual(len(blocks), 7)
+                covered = self.check_coverage(blocks, (0, 67), (0, 29))
+                self.assertTrue(numpy.all(covered == 1))
+
+    def test_max_bytes(self):
+        blocks = list(self.reader.iter_blocks(max_bytes=8*29*20))
+        self.assertEqual([entry[0] for entry in blocks], [slice(0, 20), slice(20, 40), slice(40, 60), slice(60, 67)])
+
+    def test_overlap_and_limits(self):
+        blocks = list(self.reader.iter_blocks(
+            block_shape=(8, 9), overlap=(2, 1), row_limits=(5, 50), col_limits=(3, 28)))
+        covered = self.check_coverage(blocks, (5, 50), (3, 28))
+        self.assertTrue(numpy.all(covered[:5] == 0) and numpy.all(covered[:, 28:] == 0))
+        self.assertEqual(blocks[0][0], slice(5, 15))
+        self.assertEqual(blocks[0][1], slice(3, 13))
+        with self.assertRaises(ValueError):
+            list(self.reader.iter_blocks(row_limits=(50, 5)))
+
+    def test_early_exit(self):
+        for i, (row_slice, col_slice, data) in enumerate(self.reader.iter_blocks(block_shape=(1, None), prefetch=2)):
+            if i == 3:
+                break
+        self.assertEqual(row_slice, slice(3, 4))
+
+    def test_error(self):
+        # an exception while reading on the background thread is raised to the consumer
+        with mock.patch.object(BaseReader, 'read_chip', side_effect=ValueError('failed')):
+            with self.assertRaises(ValueError):
+                list(self.reader.iter_blocks(block_shape=(10, None)))
+
+
+class TestReadPoints(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        shape = (600, 700)
+        cls.data = (numpy.random.randn(*shape) + 1j*numpy.random.randn(*shape)).astype(numpy.complex64)
+        file_name, data_sizes, data_offsets = generate_segmented_file(cls.directory, cls.data, [250, 250, 100])
+        cls.chipper = MultiSegmentChipper(
+            file_name, data_sizes, data_offsets, numpy.dtype('>f4'), symmetry=(False, False, False),
+            complex_type=True)
+        cls.reader = BaseReader(None, cls.chipper)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    @staticmethod
+    def get_expected(data, rows, cols, window, fill_value=0):
+        padded = numpy.full((data.shape[0] + 2*window[0], data.shape[1] + 2*window[1]), fill_value,
+                            dtype=numpy.complex64)
+        padded[window[0]:-window[0], window[1]:-window[1]] = data
+        return numpy.array(
+            [padded[row - window[0]//2 + window[0]:row - window[0]//2 + 2*window[0],
+                    col - window[1]//2 + window[1]:col - window[1]//2 + 2*window[1]]
+             for row, col in zip(rows, cols)])
+
+    def test_points(self):
+        rows = numpy.random.randint(0, 600, size=500)
+        cols = numpy.random.randint(0, 700, size=500)
+        with mock.patch.object(BaseReader, 'read_chip', autospec=True, side_effect=BaseReader.read_chip) as reader:
+            values = self.reader.read_points(rows, cols)
+        self.assertTrue(numpy.all(values == self.data[rows, cols]))
+        # the reads are coalesced
+        self.assertTrue(reader.call_count < 50)
+        # the shape of the input is preserved
+        values = self.reader.read_points(rows.reshape((20, 25)), cols.reshape((20, 25)))
+        self.assertTrue(numpy.all(values == self.data[rows, cols].reshape((20, 25))))
+        self.assertEqual(self.reader.read_points([], []).shape, (0, ))
+
+    def test_windows(self):
+        rows = numpy.array([0, 5, 249, 250, 251, 300, 599, 420])
+        cols = numpy.array([0, 699, 10, 10, 10, 350, 3, 698])
+        for window in [(3, 3), (4, 5), 1]:
+            with self.subTest(msg='window={}'.format(window)):
+                values = self.reader.read_points(rows, cols, window=window, fill_value=numpy.nan)
+                the_window = (window, window) if isinstance(window, int) else window
+                expected = self.get_expected(self.data, rows, cols, the_window, fill_value=numpy.nan)
+                self.assertEqual(values.shape, (rows.size, ) + the_window)
+                self.assertTrue(numpy.array_equal(values, expected, equal_nan=True))
+
+    def test_segments(self):
+        # the groups do not span the image segment boundaries
+        rows = numpy.array([240, 245, 251, 253])
+        cols = numpy.array([3, 4, 5, 6])
+        with mock.patch.object(BaseReader, 'read_chip', autospec=True, side_effect=BaseReader.read_chip) as reader:
+            self.reader.read_points(rows, cols)
+        self.assertEqual(reader.call_count, 2)
+
+    def test_subset(self):
+        subset = SubsetChipper(self.chipper, (200, 480), (100, 650))
+        self.assertEqual(list(subset._get_segment_row_starts()), [0, 50])
+        reader = BaseReader(None, subset)
+        rows = numpy.random.randint(0, 280, size=100)
+        cols = numpy.random.randint(0, 550, size=100)
+        values = reader.read_points(rows, cols, window=(3, 3))
+        expected = self.get_expected(self.data[200:480, 100:650], rows, cols, (3, 3))
+        self.assertTrue(numpy.all(values == expected))
+        with self.assertRaises(ValueError):
+            reader.read_points([280, ], [0, ])
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import tempfile
+
+import numpy
+
+from sarpy.io.complex.batch import get_jobs, load_manifest, run_job, batch_conversion
+from sarpy.io.complex.sicd import SICDReader, SICDWriter
+from sarpy.io.complex.sio import SIOReader
+
+from . import unittest
+from .test_sicd import generate_sicd
+
+
+class TestBatchConversion(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.input_directory = os.path.join(cls.directory, 'input')
+        os.mkdir(cls.input_directory)
+        cls.data = []
+        for i in range(3):
+            data = (numpy.random.randn(31 + i, 17) + 1j*numpy.random.randn(31 + i, 17)).astype(numpy.complex64)
+            generate_sicd(os.path.join(cls.input_directory, 'input_{}.nitf'.format(i)), data,
+                          core_name='TEST{}'.format(i))
+            cls.data.append(data)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def get_jobs(self, output_directory):
+        return get_jobs(output_directory, patterns=[os.path.join(self.input_directory, 'input_*.nitf')])
+
+    def check_outputs(self, summary, status):
+        for data, result in zip(self.data, summary['results']):
+            self.assertEqual(result['status'], status)
+            self.assertEqual(len(result['outputs']), 1)
+            self.assertTrue(numpy.all(SICDReader(result['outputs'][0]['output_file'])[:, :] == data))
+
+    def test_manifest(self):
+        file_name = os.path.join(self.directory, 'manifest.txt')
+        with open(file_name, 'w') as fi:
+            fi.write('# comment\n\n/first/file\n/second/file\n')
+        self.assertEqual([entry['input_file'] for entry in load_manifest(file_name, 'output')],
+                         ['/first/file', '/second/file'])
+
+        file_name = os.path.join(self.directory, 'manifest.json')
+        with open(file_name, 'w') as fi:
+            json.dump(['/first/file', {'input_file': '/second/file', 'output_format': 'sio', 'frames': 0}], fi)
+        jobs = load_manifest(file_name, 'output')
+        self.assertEqual(jobs[1], {'input_file': '/second/file', 'output_directory': 'output',
+                                   'frames': [0, ], 'output_format': 'SIO'})
+        with self.assertRaises(ValueError):
+            get_jobs(None, entries=['/first/file'])
+
+    def test_transcode(self):
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        summary = batch_conversion(self.get_jobs(output_directory), max_workers=1, transcode=True)
+        self.assertEqual(summary['counts'], {'converted': 3, 'skipped': 0, 'failed': 0})
+        self.check_outputs(summary, 'converted')
+        for result in summary['results']:
+            self.assertNotIn('stages', result['outputs'][0])
+            self.assertFalse(result['outputs'][0]['transcode']['swapped'])
+
+    def test_serial(self):
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        summary_file = os.path.join(self.directory, 'summary.json')
+        summary = batch_conversion(self.get_jobs(output_directory), max_workers=1, summary_file=summary_file)
+        self.assertEqual(summary['counts'], {'converted': 3, 'skipped': 0, 'failed': 0})
+        self.assertEqual(summary['bytes_read'], sum(entry.nbytes for entry in self.data))
+        self.check_outputs(summary, 'converted')
+        with open(summary_file, 'r') as fi:
+            self.assertEqual(json.load(fi)['counts'], summary['counts'])
+
+        # the complete outputs are skipped, and an incomplete output is replaced
+        result = summary['results'][0]['outputs'][0]
+        with open(result['output_file'], 'r+b') as fi:
+            fi.truncate(100)
+        summary = batch_conversion(self.get_jobs(output_directory), max_workers=1)
+        self.assertEqual(summary['counts'], {'converted': 1, 'skipped': 2, 'failed': 0})
+        self.assertTrue(numpy.all(SICDReader(result['output_file'])[:, :] == self.data[0]))
+        self.assertEqual(sorted(os.listdir(output_directory)),
+                         sorted(os.path.basename(entry['outputs'][0]['output_file']) + suffix
+                                for entry in summary['results'] for suffix in ['', '.complete']))
+
+    def test_incomplete_output(self):
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        input_file = os.path.join(self.input_directory, 'input_2.nitf')
+        reader = SICDReader(input_file)
+        file_name = os.path.join(output_directory, reader.get_suggestive_name(frame=0))
+        # an output of the correct size, but only partially written by another process
+        with SICDWriter(file_name, reader.sicd_meta) as writer:
+            writer(self.data[2][:5, :], (0, 0))
+        self.assertFalse(writer.fully_written)
+
+        result = run_job(get_jobs(output_directory, entries=[input_file])[0])
+        self.assertEqual(result['status'], 'converted')
+        self.assertEqual(result['outputs'][0]['output_file'], file_name)
+        self.assertTrue(numpy.all(SICDReader(file_name)[:, :] == self.data[2]))
+        self.assertEqual(run_job(get_jobs(output_directory, entries=[input_file])[0])['status'], 'skipped')
+
+    def test_failure(self):
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        junk_file = os.path.join(self.directory, 'junk.bin')
+        with open(junk_file, 'wb') as fi:
+            fi.write(b'junk'*100)
+        jobs = get_jobs(output_directory, entries=[junk_file, os.path.join(self.input_directory, 'input_0.nitf')])
+        summary = batch_conversion(jobs, max_workers=1)
+        self.assertEqual(summary['counts'], {'converted': 1, 'skipped': 0, 'failed': 1})
+        self.assertIn('IOError', summary['results'][0]['error'].replace('OSError', 'IOError'))
+
+    def test_output_format(self):
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        job = get_jobs(output_directory, entries=[os.path.join(self.input_directory, 'input_1.nitf')],
+                       output_format='SIO')[0]
+        result = run_job(job)
+        self.assertEqual(result['status'], 'converted')
+        self.assertTrue(numpy.all(SIOReader(result['outputs'][0]['output_file'])[:, :] == self.data[1]))
+
+    def test_process_pool(self):
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        summary = batch_conversion(self.get_jobs(output_directory), max_workers=2, memory_limit=2**32)
+        self.check_outputs(summary, 'converted')
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy
+
+from sarpy.io.complex.base import ThreadPoolExecutor
+from sarpy.io.complex.bip import BIPChipper, BIPWriter, _validate_engine, _write_from
+from sarpy.io.complex.hdf5 import HDF5Chipper, h5py
+from sarpy.io.complex.sicd import MultiSegmentChipper
+from sarpy.io.complex.tile_cache import TileCache
+
+from . import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+def generate_segmented_file(directory, data, segment_rows, header_size=17):
+    """
+    Writes complex data as big-endian interleaved float32 image segments, in the
+    manner of a multiple image segment SICD.
+    """
+
+    file_name = os.path.join(directory, 'segmented.bin')
+    row_ends = numpy.cumsum(segment_rows)
+    row_starts = row_ends - numpy.array(segment_rows)
+    offsets = []
+    with open(file_name, 'wb') as fi:
+        for start, end in zip(row_starts, row_ends):
+            fi.write(b'\x00'*header_size)
+            offsets.append(fi.tell())
+            raw = numpy.empty((end - start, data.shape[1], 2), dtype='>f4')
+            raw[:, :, 0] = data[start:end].real
+            raw[:, :, 1] = data[start:end].imag
+            fi.write(raw.tobytes())
+    data_sizes = numpy.array([(entry, data.shape[1]) for entry in segment_rows], dtype=numpy.int64)
+    return file_name, data_sizes, numpy.array(offsets, dtype=numpy.int64)
+
+
+class TestMultiSegmentChipper(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        shape = (97, 43)
+        cls.data = (numpy.random.randn(*shape) + 1j*numpy.random.randn(*shape)).astype(numpy.complex64)
+        cls.file_name, cls.data_sizes, cls.data_offsets = generate_segmented_file(
+            cls.directory, cls.data, [30, 30, 37])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def get_chipper(self, **kwargs):
+        return MultiSegmentChipper(
+            self.file_name, self.data_sizes, self.data_offsets, numpy.dtype('>f4'),
+            symmetry=(False, False, False), complex_type=True, **kwargs)
+
+    def test_read(self):
+        for max_workers in [None, 1, 3]:
+            chipper = self.get_chipper(max_workers=max_workers)
+            with self.subTest(msg='full read, max_workers={}'.format(max_workers)):
+                self.assertTrue(numpy.all(chipper[:, :] == self.data))
+            with self.subTest(msg='strided read, max_workers={}'.format(max_workers)):
+                self.assertTrue(numpy.all(chipper[5:90:7, 2:40:3] == self.data[5:90:7, 2:40:3]))
+            with self.subTest(msg='reversed read, max_workers={}'.format(max_workers)):
+                self.assertTrue(numpy.all(chipper[88:3:-4, 40:2:-3] == self.data[88:3:-4, 40:2:-3]))
+
+    def test_max_workers_override(self):
+        chipper = self.get_chipper()
+        data = chipper((10, 80, 2), (0, 43, 1), max_workers=4)
+        self.assertTrue(numpy.all(data == self.data[10:80:2, :]))
+        with self.assertRaises(ValueError):
+            chipper((10, 80, 2), (0, 43, 1), max_workers=0)
+
+    def test_tile_cache(self):
+        chipper = self.get_chipper(max_workers=2)
+        cache = TileCache(tile_shape=(16, 16), max_bytes=2**16)
+        chipper.tile_cache = cache
+        for _ in range(2):
+            self.assertTrue(numpy.all(chipper[5:90:7, 2:40:3] == self.data[5:90:7, 2:40:3]))
+        self.assertTrue(cache.hits > 0)
+        self.assertTrue(cache.current_bytes <= cache.max_bytes)
+
+    def test_out(self):
+        chipper = self.get_chipper(max_workers=3)
+        out = numpy.empty((25, 43), dtype=numpy.complex64)
+        for _ in range(2):
+            result = chipper((90, 15, -3), (0, 43, 1), out=out)
+            self.assertTrue(result is out)
+            self.assertTrue(numpy.all(out == self.data[90:15:-3, :]))
+
+    def test_view(self):
+        chipper = self.get_chipper()
+        data = chipper((35, 50, 2), (0, 43, 1), copy=False)
+        self.assertFalse(data.flags.owndata)
+        self.assertTrue(numpy.all(data == self.data[35:50:2, :]))
+        # spanning image segments requires a copy
+        data = chipper((25, 50, 2), (0, 43, 1), copy=False)
+        self.assertTrue(data.flags.owndata)
+        self.assertTrue(numpy.all(data == self.data[25:50:2, :]))
+
+    def test_raw(self):
+        chipper = self.get_chipper(max_workers=3)
+        expected = self.data[88:3:-4, 40:2:-3]
+        data = chipper((88, 3, -4), (40, 2, -3), raw=True)
+        self.assertEqual(data.dtype, numpy.dtype('float32'))
+        self.assertEqual(data.shape, expected.shape + (2, ))
+        self.assertTrue(numpy.all(data[:, :, 0] == expected.real) and numpy.all(data[:, :, 1] == expected.imag))
+        self.assertTrue(numpy.all(chipper.raw_to_complex(data) == expected))
+        # a view of a single image segment preserves the file byte order
+        data = chipper((35, 50, 2), (0, 43, 1), copy=False, raw=True)
+        self.assertEqual(data.dtype, numpy.dtype('>f4'))
+        self.assertTrue(numpy.all(chipper.raw_to_complex(data) == self.data[35:50:2, :]))
+
+
+class TestBIPChipper(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        shape = (61, 37)
+        cls.data = (numpy.random.randn(*shape) + 1j*numpy.random.randn(*shape)).astype(numpy.complex64)
+        cls.file_name, _, offsets = generate_segmented_file(cls.directory, cls.data, [shape[0], ])
+        cls.data_offset = int(offsets[0])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def get_chipper(self, symmetry=(False, False, False)):
+        return BIPChipper(self.file_name, numpy.dtype('>f4'), self.data.shape, symmetry=symmetry,
+                          complex_type=True, data_offset=self.data_offset)
+
+    @staticmethod
+    def get_expected(data, symmetry):
+        if symmetry[2]:
+            data = data.T
+        if symmetry[0]:
+            data = data[::-1, :]
+        if symmetry[1]:
+            data = data[:, ::-1]
+        return data
+
+    def test_tile_cache(self):
+        for symmetry in [(False, False, False), (True, False, True), (False, True, True)]:
+            chipper = self.get_chipper(symmetry=symmetry)
+            expected = self.get_expected(self.data, symmetry)
+            self.assertTrue(numpy.all(chipper[:, :] == expected))
+            cache = TileCache(tile_shape=(10, 7), max_bytes=2**20)
+            chipper.tile_cache = cache
+            with self.subTest(msg='cached read, symmetry={}'.format(symmetry)):
+                self.assertTrue(numpy.all(chipper[:, :] == expected))
+                self.assertTrue(numpy.all(chipper[3:30:4, 30:2:-5] == expected[3:30:4, 30:2:-5]))
+                self.assertTrue(cache.hits > 0 and cache.misses > 0)
+
+    def test_tile_cache_empty(self):
+        for symmetry in [(False, False, False), (True, False, True)]:
+            chipper = self.get_chipper(symmetry=symmetry)
+            expected = self.get_expected(self.data, symmetry)
+            chipper.tile_cache = TileCache(tile_shape=(10, 7), max_bytes=2**20)
+            with self.subTest(msg='cached empty range, symmetry={}'.format(symmetry)):
+                self.assertEqual(chipper[:, 7:7].shape, expected[:, 7:7].shape)
+                self.assertEqual(chipper((0, 30, 1), (7, 7, 1)).shape, (30, 0))
+                self.assertEqual(chipper((0, 30, 1), (7, 7, 1), copy=False).shape, (30, 0))
+                self.assertEqual(chipper((0, 30, 1), (7, 7, 1), raw=True).shape, (30, 0, 2))
+
+    def test_out(self):
+        for symmetry in [(False, False, False), (True, True, True)]:
+            chipper = self.get_chipper(symmetry=symmetry)
+            expected = self.get_expected(self.data, symmetry)[2:20:3, 1:30]
+            out = numpy.zeros(expected.shape, dtype=numpy.complex64)
+            with self.subTest(msg='read into out, symmetry={}'.format(symmetry)):
+                result = chipper((2, 20, 3), (1, 30, 1), out=out)
+                self.assertTrue(result is out)
+                self.assertTrue(numpy.all(out == expected))
+        with self.assertRaises(ValueError):
+            self.get_chipper()((2, 20, 3), (1, 30, 1), out=numpy.zeros((2, 2), dtype=numpy.complex64))
+
+    def test_view(self):
+        for symmetry in [(False, False, False), (True, False, True)]:
+            chipper = self.get_chipper(symmetry=symmetry)
+            expected = self.get_expected(self.data, symmetry)[2:20:3, 1:30]
+            with self.subTest(msg='view, symmetry={}'.format(symmetry)):
+                data = chipper((2, 20, 3), (1, 30, 1), copy=False)
+                self.assertFalse(data.flags.owndata)
+                self.assertFalse(data.flags.writeable)
+                self.assertTrue(numpy.all(data == expected))
+
+    def test_raw(self):
+        for symmetry in [(False, False, False), (True, False, True)]:
+            chipper = self.get_chipper(symmetry=symmetry)
+            expected = self.get_expected(self.data, symmetry)[2:20:3, 1:30]
+            with self.subTest(msg='raw, symmetry={}'.format(symmetry)):
+                data = chipper((2, 20, 3), (1, 30, 1), raw=True)
+                self.assertEqual(data.dtype, numpy.dtype('float32'))
+                self.assertTrue(numpy.all(data[:, :, 0] == expected.real))
+                self.assertTrue(numpy.all(data[:, :, 1] == expected.imag))
+                # the conversion may be performed for any block
+                self.assertTrue(numpy.all(chipper.raw_to_complex(data[1:4, 5:20]) == expected[1:4, 5:20]))
+                out = numpy.zeros(expected.shape, dtype=numpy.complex64)
+                self.assertTrue(chipper.raw_to_complex(data, out=out) is out)
+                self.assertTrue(numpy.all(out == expected))
+                # the tile cache holds the raw data
+                chipper.tile_cache = TileCache(tile_shape=(8, 8), max_bytes=2**20)
+                self.assertTrue(numpy.all(chipper((2, 20, 3), (1, 30, 1), raw=True) == data))
+        with self.assertRaises(ValueError):
+            self.get_chipper().raw_to_complex(numpy.zeros((3, 4), dtype=numpy.float32))
+
+    def test_file_fallback(self):
+        # force the failure of the memory map, so that positional reads are used
+        for symmetry in [(False, False, False), (True, True, True)]:
+            with mock.patch('numpy.memmap', side_effect=OSError):
+                chipper = self.get_chipper(symmetry=symmetry)
+            expected = self.get_expected(self.data, symmetry)
+            with self.subTest(msg='file fallback, symmetry={}'.format(symmetry)):
+                self.assertTrue(numpy.all(chipper[:, :] == expected))
+                self.assertTrue(numpy.all(chipper[3:30:4, 30:2:-5] == expected[3:30:4, 30:2:-5]))
+                self.assertTrue(numpy.all(chipper[20:2:-1, 4:9] == expected[20:2:-1, 4:9]))
+        with mock.patch('sarpy.io.complex.bip._MAX_READ_GAP', 0):
+            self.assertTrue(numpy.all(chipper[3:30:4, 30:2:-5] == expected[3:30:4, 30:2:-5]))
+
+    def test_pickle(self):
+        chipper = self.get_chipper(symmetry=(True, False, True))
+        expected = self.get_expected(self.data, (True, False, True))
+        unpickled = pickle.loads(pickle.dumps(chipper))
+        self.assertIsNone(unpickled._memory_map)
+        self.assertTrue(numpy.all(unpickled[3:30:4, 30:2:-5] == expected[3:30:4, 30:2:-5]))
+        self.assertIsNotNone(unpickled._memory_map)
+        # the fallback file handle is likewise reopened
+        with mock.patch('numpy.memmap', side_effect=OSError):
+            chipper = self.get_chipper()
+            unpickled = pickle.loads(pickle.dumps(chipper))
+            self.assertTrue(numpy.all(unpickled[:, :] == self.data))
+            self.assertIsNotNone(unpickled._fid)
+
+    def test_close(self):
+        chipper = self.get_chipper()
+        chipper.close()
+        self.assertIsNone(chipper._memory_map)
+        # the file is reopened upon the next read
+        self.assertTrue(numpy.all(chipper[3:30:4, 30:2:-5] == self.data[3:30:4, 30:2:-5]))
+        with mock.patch('numpy.memmap', side_effect=OSError):
+            chipper = self.get_chipper()
+        fid = chipper._fid
+        chipper.close()
+        self.assertTrue(fid.closed)
+        self.assertIsNone(chipper._fid)
+
+
+class TestBIPWriter(unittest.TestCase):
+    def test_file_fallback(self):
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, 'written.bin')
+            data = (numpy.random.randn(23, 17) + 1j*numpy.random.randn(23, 17)).astype(numpy.complex64)
+            with mock.patch('numpy.memmap', side_effect=OSError):
+                with BIPWriter(file_name, data.shape, '>f4', True, data_offset=5) as writer:
+                    writer(data[:10, :], (0, 0))
+                    writer(data[10:, :4], (10, 0))
+                    writer(data[10:, 4:], (10, 4))
+            chipper = BIPChipper(file_name, '>f4', data.shape, complex_type=True, data_offset=5)
+            self.assertTrue(numpy.all(chipper[:, :] == data))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    @unittest.skipIf(ThreadPoolExecutor is None, 'concurrent.futures is not available')
+    def test_pwrite(self):
+        directory = tempfile.mkdtemp()
+        try:
+            data = (numpy.random.randn(41, 17) + 1j*numpy.random.randn(41, 17)).astype(numpy.complex64)
+            for options in [None, {'max_in_flight': 100}, {'sync_bytes': 1000, 'fadvise': True}]:
+                file_name = os.path.join(directory, 'written_{}.bin'.format(len(os.listdir(directory))))
+                with self.subTest(msg='engine_options={}'.format(options)):
+                    with BIPWriter(file_name, data.shape, '>f4', True, data_offset=5,
+                                   engine='pwrite', engine_options=options) as writer:
+                        self.assertIsNone(writer._memory_map)
+                        with ThreadPoolExecutor(max_workers=4) as executor:
+                            futures = [executor.submit(writer, data[start:start+5, :], (start, 0))
+                                       for start in range(0, 40, 5)]
+                            for future in futures:
+                                future.result()
+                        writer(data[40:, :9], (40, 0))
+                        writer(data[40:, 9:], (40, 9))
+                        self.assertEqual(writer._output.bytes_written, data.size*8)
+                        if options is not None and 'sync_bytes' in options:
+                            self.assertGreater(writer._output.sync_count, 1)
+                    chipper = BIPChipper(file_name, '>f4', data.shape, complex_type=True, data_offset=5)
+                    self.assertTrue(numpy.all(chipper[:, :] == data))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    @unittest.skipIf(not hasattr(os, 'pwrite'), 'os.pwrite is not available')
+    def test_pwrite_no_progress(self):
+        with tempfile.TemporaryFile() as fid:
+            with mock.patch('os.pwrite', return_value=0):
+                with self.assertRaises(IOError):
+                    _write_from(fid, numpy.zeros((10, ), dtype=numpy.float32), 0)
+
+    def test_engine_validation(self):
+        with self.assertRaises(ValueError):
+            _validate_engine('unknown', None)
+        with self.assertRaises(ValueError):
+            _validate_engine('memmap', {'sync_bytes': 100})
+        with self.assertRaises(ValueError):
+            _validate_engine('pwrite', {'unknown': 100})
+        self.assertEqual(_validate_engine(None, None), ('memmap', {}))
+
+
+@unittest.skipIf(h5py is None, 'h5py is not available')
+class TestHDF5Chipper(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.file_name = os.path.join(cls.directory, 'chunked.h5')
+        cls.raw = numpy.random.randint(-2**15, 2**15, size=(83, 59, 2)).astype(numpy.int16)
+        cls.data = cls.raw[:, :, 0].astype(numpy.float32) + 1j*cls.raw[:, :, 1].astype(numpy.float32)
+        with h5py.File(cls.file_name, 'w') as hf:
+            hf.create_dataset('chunked', data=cls.raw, chunks=(8, 16, 2), compression='gzip')
+            hf.create_dataset('contiguous', data=cls.raw)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_read(self):
+        for dataset_name in ['chunked', 'contiguous']:
+            for symmetry in [(False, False, False), (True, False, True), (False, True, False)]:
+                chipper = HDF5Chipper(self.file_name, dataset_name, self.data.shape,
+                                      symmetry=symmetry, complex_type=True)
+                expected = TestBIPChipper.get_expected(self.data, symmetry)
+                with self.subTest(msg='dataset={}, symmetry={}'.format(dataset_name, symmetry)):
+                    self.assertTrue(numpy.all(chipper[:, :] == expected))
+                    self.assertTrue(numpy.all(chipper[3:50:4, 40:2:-5] == expected[3:50:4, 40:2:-5]))
+                    self.assertTrue(numpy.all(chipper[50:1:-20, 1:55:17] == expected[50:1:-20, 1:55:17]))
+                    self.assertTrue(numpy.all(chipper[7:9, 5:6] == expected[7:9, 5:6]))
+                chipper.close()
+
+    def test_persistent_handle(self):
+        chipper = HDF5Chipper(self.file_name, 'chunked', self.data.shape, complex_type=True, chunk_cache_bytes=2**16)
+        with mock.patch('sarpy.io.complex.hdf5.h5py.File', wraps=h5py.File) as opener:
+            for _ in range(3):
+                self.assertTrue(numpy.all(chipper[10:20, 30:40] == self.data[10:20, 30:40]))
+            self.assertEqual(opener.call_count, 1)
+            chipper.close()
+            self.assertTrue(numpy.all(chipper[10:20, 30:40] == self.data[10:20, 30:40]))
+            self.assertEqual(opener.call_count, 2)
+        chipper.close()
+
+    def test_band_alignment(self):
+        # force many small, chunk aligned, reads
+        chipper = HDF5Chipper(self.file_name, 'chunked', self.data.shape, complex_type=True)
+        with mock.patch('sarpy.io.complex.hdf5._MAX_BAND_BYTES', 1):
+            self.assertTrue(numpy.all(chipper[:, :] == self.data))
+            self.assertTrue(numpy.all(chipper[80:0:-3, 2:50:2] == self.data[80:0:-3, 2:50:2]))
+        chipper.close()
+
+    def test_pickle(self):
+        chipper = HDF5Chipper(self.file_name, 'chunked', self.data.shape, complex_type=True)
+        self.assertTrue(numpy.all(chipper[10:20, 30:40] == self.data[10:20, 30:40]))
+        unpickled = pickle.loads(pickle.dumps(chipper))
+        self.assertIsNone(unpickled._handle)
+        self.assertTrue(numpy.all(unpickled[50:1:-20, 1:55:17] == self.data[50:1:-20, 1:55:17]))
+        unpickled.close()
+        chipper.close()
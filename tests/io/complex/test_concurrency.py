@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import shutil
+import tempfile
+
+import numpy
+
+from sarpy.io.complex.base import ThreadPoolExecutor
+from sarpy.io.complex.bip import BIPChipper
+from sarpy.io.complex.hdf5 import HDF5Chipper, h5py
+from sarpy.io.complex.sicd import SICDReader
+from sarpy.io.complex.tiff import BlockTiffChipper
+
+from . import unittest
+from .test_chippers import generate_segmented_file
+from .test_sicd import generate_sicd
+from .test_tiff import generate_tiff
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+def get_random_reads(shape, count, seed=0):
+    """
+    Gets random (and possibly reversed, strided) slices within the given shape.
+    """
+
+    state = numpy.random.RandomState(seed)
+    reads = []
+    for _ in range(count):
+        item = []
+        for size in shape:
+            start, stop = sorted(state.randint(0, size, size=2))
+            stop += 1
+            step = int(state.randint(1, 5))
+            if start > 0 and state.rand() < 0.3:
+                item.append(slice(stop - 1, start - 1, -step))
+            else:
+                item.append(slice(start, stop, step))
+        reads.append(tuple(item))
+    return reads
+
+
+@unittest.skipIf(ThreadPoolExecutor is None, 'concurrent.futures is not available')
+class TestConcurrentReads(unittest.TestCase):
+    """
+    Stress tests in which many threads read from a single chipper or reader instance.
+    """
+
+    thread_count = 8
+    read_count = 200
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        shape = (97, 83)
+        cls.data = (numpy.random.randint(-2**15, 2**15, size=shape) +
+                    1j*numpy.random.randint(-2**15, 2**15, size=shape)).astype(numpy.complex64)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        # switch threads as often as possible, to provoke any interleaving
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def check_concurrent(self, reader, msg):
+        reads = get_random_reads(self.data.shape, self.read_count)
+
+        def read(item):
+            return reader[item]
+
+        with ThreadPoolExecutor(max_workers=self.thread_count) as executor:
+            results = list(executor.map(read, reads))
+        with self.subTest(msg=msg):
+            for item, result in zip(reads, results):
+                self.assertTrue(numpy.all(result == self.data[item]), msg='{} read {}'.format(msg, item))
+
+    def test_sicd(self):
+        file_name = os.path.join(self.directory, 'concurrent.nitf')
+        generate_sicd(file_name, self.data)
+        reader = SICDReader(file_name)
+        self.check_concurrent(reader, 'sicd')
+        reader.enable_tile_cache(tile_shape=(16, 16), max_bytes=2**14)
+        self.check_concurrent(reader, 'sicd with tile cache')
+
+    def test_bip_file(self):
+        file_name, _, offsets = generate_segmented_file(self.directory, self.data, [self.data.shape[0], ])
+        with mock.patch('numpy.memmap', side_effect=OSError):
+            chipper = BIPChipper(file_name, '>f4', self.data.shape, complex_type=True, data_offset=int(offsets[0]))
+        self.check_concurrent(chipper, 'positional reads')
+        # force many small reads, and the pread or seek and read fallbacks
+        with mock.patch('sarpy.io.complex.bip._MAX_READ_GAP', 0), \
+                mock.patch('sarpy.io.complex.bip._HAS_PREADV', False):
+            self.check_concurrent(chipper, 'pread')
+            with mock.patch('sarpy.io.complex.bip._HAS_PREAD', False):
+                self.check_concurrent(chipper, 'locked seek and read')
+
+    def test_block_tiff(self):
+        file_name = os.path.join(self.directory, 'concurrent.tiff')
+        generate_tiff(file_name, self.data, block_shape=(16, 16), tiled=True, compress=True)
+        chipper = BlockTiffChipper(file_name, symmetry=(False, False, False), max_workers=2)
+        self.check_concurrent(chipper, 'block tiff')
+        with mock.patch('sarpy.io.complex.bip._HAS_PREADV', False), \
+                mock.patch('sarpy.io.complex.bip._HAS_PREAD', False):
+            self.check_concurrent(chipper, 'block tiff, locked seek and read')
+
+    @unittest.skipIf(h5py is None, 'h5py is not available')
+    def test_hdf5(self):
+        file_name = os.path.join(self.directory, 'concurrent.h5')
+        raw = numpy.stack((self.data.real, self.data.imag), axis=2).astype(numpy.int16)
+        with h5py.File(file_name, 'w') as hf:
+            hf.create_dataset('chunked', data=raw, chunks=(8, 16, 2), compression='gzip')
+        chipper = HDF5Chipper(file_name, 'chunked', self.data.shape, complex_type=True)
+        self.check_concurrent(chipper, 'hdf5')
+        chipper.close()
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+
+import os
+import errno
+import shutil
+import tempfile
+
+import numpy
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from sarpy.io.complex.converter import open_complex, get_signature_formats, conversion_utility, \
+    Converter, _run_pipeline
+from sarpy.io.complex.base import BaseReader
+from sarpy.io.complex.sicd import SICDReader, SICDWriter
+from sarpy.io.complex.sio import SIOReader
+from sarpy.io.complex.tiff import TiffReader
+
+from . import unittest
+from .test_sicd import generate_sicd
+from .test_tiff import generate_tiff
+
+
+class TestSignatureDispatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def write_file(self, name, contents):
+        file_name = os.path.join(self.directory, name)
+        with open(file_name, 'wb') as fi:
+            fi.write(contents)
+        return file_name
+
+    def test_signatures(self):
+        cases = [
+            ('file.ntf', b'NITF02.10' + b' '*100, ['SICD', ]),
+            ('file.nsif', b'NSIF01.00' + b' '*100, ['SICD', ]),
+            ('big.sio', b'\xff\x02\x7f\xfd' + b'\x00'*16, ['SIO', ]),
+            ('little.sio', b'\xfe\x7f\x01\xff' + b'\x00'*16, ['SIO', ]),
+            ('file.h5', b'\x89HDF\r\n\x1a\n' + b'\x00'*100, ['CSK', 'SICDArchive']),
+            ('offset.h5', b'\x00'*512 + b'\x89HDF\r\n\x1a\n' + b'\x00'*100, ['CSK', 'SICDArchive']),
+            ('little.tiff', b'II*\x00' + b'\x00'*100, ['TIFF', ]),
+            ('big.tiff', b'MM\x00+' + b'\x00'*100, ['TIFF', ]),
+            ('product.xml', b'<?xml version="1.0"?><product/>', ['Sentinel', 'RadarSat']),
+            ('junk.bin', b'junk'*100, []),
+            ('empty.bin', b'', [])]
+        for name, contents, expected in cases:
+            with self.subTest(msg=name):
+                self.assertEqual(get_signature_formats(self.write_file(name, contents)), expected)
+
+    def test_directories(self):
+        safe_directory = os.path.join(self.directory, 'S1.SAFE')
+        os.mkdir(safe_directory)
+        with open(os.path.join(safe_directory, 'manifest.safe'), 'w') as fi:
+            fi.write('<?xml version="1.0"?>')
+        self.assertEqual(get_signature_formats(safe_directory), ['Sentinel', ])
+
+        rcm_directory = os.path.join(self.directory, 'RCM')
+        os.makedirs(os.path.join(rcm_directory, 'metadata'))
+        with open(os.path.join(rcm_directory, 'metadata', 'product.xml'), 'w') as fi:
+            fi.write('<?xml version="1.0"?>')
+        self.assertEqual(get_signature_formats(rcm_directory), ['RadarSat', ])
+
+    def test_open_complex(self):
+        file_name = os.path.join(self.directory, 'opened.tiff')
+        data = (numpy.arange(12) + 1j*numpy.arange(12)).reshape((3, 4)).astype(numpy.complex64)
+        generate_tiff(file_name, data)
+        reader = open_complex(file_name)
+        self.assertIsInstance(reader, TiffReader)
+
+        with self.assertRaises(IOError):
+            open_complex(self.write_file('unknown.bin', b'junk'*100))
+
+
+class TestConversion(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.file_name = os.path.join(cls.directory, 'input.nitf')
+        cls.data = (numpy.random.randn(71, 37) + 1j*numpy.random.randn(71, 37)).astype(numpy.complex64)
+        generate_sicd(cls.file_name, cls.data)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_conversion(self):
+        for output_format, reader_type in [('SICD', SICDReader), ('SIO', SIOReader)]:
+            output_directory = tempfile.mkdtemp(dir=self.directory)
+            with self.subTest(msg='output_format={}'.format(output_format)):
+                conversion_utility(
+                    self.file_name, output_directory, output_files='output', output_format=output_format,
+                    row_limits=(3, 66), column_limits=(2, 30))
+                reader = reader_type(os.path.join(output_directory, 'output'))
+                self.assertTrue(numpy.all(reader[:, :] == self.data[3:66, 2:30]))
+
+    def test_pipelined(self):
+        for pixel_type in ['RE32F_IM32F', 'RE16I_IM16I', 'AMP8I_PHS8I']:
+            input_file = os.path.join(self.directory, 'input_{}.nitf'.format(pixel_type))
+            generate_sicd(input_file, self.data*100, pixel_type=pixel_type)
+            reader = SICDReader(input_file)
+            outputs = []
+            for pipelined in [False, True]:
+                output_directory = tempfile.mkdtemp(dir=self.directory)
+                # force several small blocks
+                with mock.patch.object(Converter, '_get_rows_per_block', lambda self, max_block_size: 10), \
+                        Converter(reader, output_directory, output_file='output', row_limits=(3, 66)) as converter:
+                    stats = converter.write_data(pipelined=pipelined)
+                outputs.append(SICDReader(os.path.join(output_directory, 'output'))[:, :])
+            with self.subTest(msg='pixel_type={}'.format(pixel_type)):
+                self.assertTrue(numpy.all(outputs[0] == reader[3:66, :]))
+                self.assertTrue(numpy.all(outputs[1] == outputs[0]))
+                for stage in ['read', 'convert', 'write']:
+                    self.assertEqual(stats[stage]['blocks'], 7)
+                    self.assertGreaterEqual(stats[stage]['stall_time'], 0)
+                self.assertEqual(stats['write']['bytes'], stats['convert']['bytes'])
+
+    def test_multiple_frames(self):
+        readers = [SICDReader(self.file_name), SICDReader(self.file_name)]
+        reader = BaseReader(
+            tuple(entry.sicd_meta for entry in readers), tuple(entry._chipper for entry in readers))
+        # track the number of simultaneously open converters
+        counts = {'open': 0, 'max': 0}
+        original_init, original_exit = Converter.__init__, Converter.__exit__
+
+        def init(converter, *args, **kwargs):
+            original_init(converter, *args, **kwargs)
+            counts['open'] += 1
+            counts['max'] = max(counts['max'], counts['open'])
+
+        def exit_(converter, *args):
+            counts['open'] -= 1
+            return original_exit(converter, *args)
+
+        for pipelined in [False, True]:
+            output_directory = tempfile.mkdtemp(dir=self.directory)
+            with self.subTest(msg='pipelined={}'.format(pipelined)):
+                with mock.patch.object(Converter, '__init__', init), mock.patch.object(Converter, '__exit__', exit_):
+                    stats = conversion_utility(
+                        reader, output_directory, output_files=['first', 'second'], output_format='SIO',
+                        row_limits=[(0, 71), (10, 20)], pipelined=pipelined)
+                self.assertEqual(counts['max'], 1)
+                self.assertTrue(numpy.all(SIOReader(os.path.join(output_directory, 'first'))[:, :] == self.data))
+                self.assertTrue(
+                    numpy.all(SIOReader(os.path.join(output_directory, 'second'))[:, :] == self.data[10:20]))
+                self.assertEqual(len(stats), 2)
+                for entry in stats:
+                    if pipelined:
+                        self.assertEqual(entry['write']['blocks'], 1)
+                    else:
+                        self.assertIsNone(entry)
+
+
+class TestResumableConversion(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.file_name = os.path.join(cls.directory, 'input.nitf')
+        cls.data = (numpy.random.randn(71, 37) + 1j*numpy.random.randn(71, 37)).astype(numpy.complex64)
+        generate_sicd(cls.file_name, cls.data)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def interrupt(self, reader, output_directory, pipelined):
+        original = SICDWriter.__call__
+
+        def write(writer, data, start_indices=(0, 0), **kwargs):
+            if start_indices[0] >= 30:
+                raise KeyboardInterrupt('interrupted')
+            original(writer, data, start_indices=start_indices, **kwargs)
+
+        converter = Converter(reader, output_directory, output_file='output', row_limits=(3, 66), resume=True)
+        with mock.patch.object(Converter, '_get_rows_per_block', lambda self, max_block_size: 10), \
+                mock.patch.object(SICDWriter, '__call__', write):
+            with self.assertRaises(KeyboardInterrupt):
+                converter.write_data(pipelined=pipelined)
+
+    def test_resume(self):
+        for pipelined in [False, True]:
+            reader = SICDReader(self.file_name)
+            output_directory = tempfile.mkdtemp(dir=self.directory)
+            output_file = os.path.join(output_directory, 'output')
+            journal_file = output_file + '.journal'
+            with self.subTest(msg='pipelined={}'.format(pipelined)):
+                self.interrupt(reader, output_directory, pipelined)
+                self.assertTrue(os.path.exists(journal_file))
+
+                with Converter(
+                        reader, output_directory, output_file='output', row_limits=(3, 66), resume=True) as converter:
+                    self.assertEqual(converter.get_row_slices()[0].start, 33)
+                    converter.write_data(pipelined=pipelined)
+                    self.assertTrue(converter.writer.fully_written)
+                self.assertFalse(os.path.exists(journal_file))
+                self.assertTrue(numpy.all(SICDReader(output_file)[:, :] == self.data[3:66]))
+
+    def test_invalid_resume(self):
+        reader = SICDReader(self.file_name)
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        self.interrupt(reader, output_directory, True)
+        with self.assertRaises(ValueError):
+            Converter(reader, output_directory, output_file='output', row_limits=(4, 66), resume=True)
+        with self.assertRaises(IOError):
+            Converter(reader, output_directory, output_file='output', row_limits=(3, 66))
+        with self.assertRaises(ValueError):
+            Converter(reader, output_directory, output_file='other', output_format='SIO', resume=True)
+
+        # a truncated output file is rejected
+        output_file = os.path.join(output_directory, 'output')
+        with open(output_file, 'r+b') as fi:
+            fi.truncate(os.path.getsize(output_file)//2)
+        with self.assertRaises(ValueError):
+            Converter(reader, output_directory, output_file='output', row_limits=(3, 66), resume=True)
+
+
+class TestTranscoding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.data = (100*numpy.random.randn(71, 37) + 100j*numpy.random.randn(71, 37)).astype(numpy.complex64)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def transcode(self, reader, output_format, **kwargs):
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        with Converter(reader, output_directory, output_file='output', output_format=output_format,
+                       **kwargs) as converter:
+            self.assertTrue(converter.can_transcode)
+            stats = converter.transcode_data()
+        reader_type = SICDReader if output_format == 'SICD' else SIOReader
+        return reader_type(os.path.join(output_directory, 'output')), stats
+
+    def test_round_trip(self):
+        for pixel_type in ['RE32F_IM32F', 'RE16I_IM16I', 'AMP8I_PHS8I']:
+            input_file = os.path.join(self.directory, 'input_{}.nitf'.format(pixel_type))
+            generate_sicd(input_file, self.data, pixel_type=pixel_type)
+            reader = SICDReader(input_file)
+            with self.subTest(msg='pixel_type={}'.format(pixel_type)):
+                sio_reader, stats = self.transcode(reader, 'SIO')
+                self.assertEqual(stats['swapped'], pixel_type != 'AMP8I_PHS8I')
+                self.assertEqual(stats['bytes'], reader.read_chip(None, None, raw=True).nbytes)
+                self.assertTrue(numpy.all(sio_reader[:, :] == reader[:, :]))
+
+                sicd_reader, stats = self.transcode(sio_reader, 'SICD', row_limits=(5, 60), col_limits=(3, 30))
+                self.assertTrue(numpy.all(sicd_reader[:, :] == reader[5:60, 3:30]))
+                self.assertTrue(numpy.all(
+                    sicd_reader.read_chip(None, None, raw=True) == reader.read_chip((5, 60, 1), (3, 30, 1), raw=True)))
+
+    def test_segments(self):
+        input_file = os.path.join(self.directory, 'input_segments.nitf')
+        generate_sicd(input_file, self.data)
+        reader = SICDReader(input_file)
+        # small image segments for the output, so that the copies span several segments
+        with mock.patch('sarpy.io.complex.sicd._IM_SEG_LIMIT', 20*37*8):
+            sicd_reader, _ = self.transcode(reader, 'SICD', row_limits=(1, 70))
+        self.assertTrue(len(sicd_reader._chipper._child_chippers) > 2)
+        sio_reader, _ = self.transcode(sicd_reader, 'SIO')
+        self.assertTrue(numpy.all(sio_reader[:, :] == self.data[1:70]))
+
+    def test_fallback(self):
+        input_file = os.path.join(self.directory, 'input_fallback.nitf')
+        generate_sicd(input_file, self.data, pixel_type='AMP8I_PHS8I')
+        reader = SICDReader(input_file)
+
+        def unsupported(*args):
+            raise OSError(errno.ENOSYS, 'unsupported')
+
+        with mock.patch.object(os, 'copy_file_range', unsupported, create=True), \
+                mock.patch.object(os, 'sendfile', unsupported, create=True):
+            sio_reader, stats = self.transcode(reader, 'SIO')
+        self.assertEqual(stats['methods']['buffered'], stats['bytes'])
+        self.assertTrue(numpy.all(sio_reader[:, :] == reader[:, :]))
+
+    def test_partial_fallback(self):
+        input_file = os.path.join(self.directory, 'input_partial.nitf')
+        generate_sicd(input_file, self.data)
+        reader = SICDReader(input_file)
+        calls = []
+
+        def partial_copy(src_fd, dst_fd, count, source_offset, destination_offset):
+            # copy a little, then fail as unsupported part way through the copy
+            calls.append(count)
+            if len(calls) > 2:
+                raise OSError(errno.ENOSYS, 'unsupported')
+            data = os.pread(src_fd, min(count, 100), source_offset)
+            return os.pwrite(dst_fd, data, destination_offset)
+
+        def unsupported(*args):
+            raise OSError(errno.ENOSYS, 'unsupported')
+
+        with mock.patch.object(os, 'copy_file_range', partial_copy, create=True), \
+                mock.patch.object(os, 'sendfile', unsupported, create=True):
+            sicd_reader, stats = self.transcode(reader, 'SICD')
+        # the buffered copy resumes from the progress made, so no bytes are counted twice
+        self.assertEqual(stats['methods']['copy_file_range'], 200)
+        self.assertEqual(stats['bytes'], self.data.nbytes)
+        self.assertTrue(numpy.all(sicd_reader[:, :] == self.data))
+
+    def test_unsupported(self):
+        input_file = os.path.join(self.directory, 'input_utility.nitf')
+        generate_sicd(input_file, self.data)
+        sicd_reader = SICDReader(input_file)
+        # only readers of known formats are transcoded
+        reader = BaseReader(sicd_reader.sicd_meta, sicd_reader._chipper)
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        with Converter(reader, output_directory, output_file='output') as converter:
+            self.assertFalse(converter.can_transcode)
+            with self.assertRaises(ValueError):
+                converter.transcode_data()
+            converter.write_data()
+
+        # conversion_utility transcodes where possible, and converts otherwise
+        output_directory = tempfile.mkdtemp(dir=self.directory)
+        stats = conversion_utility(
+            input_file, output_directory, output_files='output', output_format='SIO', transcode=True)
+        self.assertEqual(len(stats), 1)
+        self.assertGreater(stats[0]['bytes'], 0)
+        self.assertTrue(numpy.all(SIOReader(os.path.join(output_directory, 'output'))[:, :] == self.data))
+
+
+class TestPipeline(unittest.TestCase):
+    def test_order(self):
+        written = []
+        stats = _run_pipeline(
+            list(range(20)), lambda block: numpy.full((3, ), block),
+            lambda block, data: data*2, lambda block, data: written.append((block, data[0])), queue_size=1)
+        self.assertEqual(written, [(i, 2*i) for i in range(20)])
+        self.assertEqual(stats['read']['bytes'], 20*24)
+        self.assertGreater(stats['elapsed'], 0)
+
+    def test_exceptions(self):
+        def fail(block, data=None):
+            if block == 5:
+                raise ValueError('block 5')
+            return data
+
+        written = []
+        for stages in [(fail, lambda block, data: data), (lambda block: block, fail)]:
+            with self.subTest(msg=stages[0].__name__):
+                with self.assertRaises(ValueError):
+                    _run_pipeline(
+                        list(range(20)), stages[0], stages[1], lambda block, data: written.append(block))
+        with self.assertRaises(ValueError):
+            _run_pipeline(list(range(20)), lambda block: block, lambda block, data: data, fail)
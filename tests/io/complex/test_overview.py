@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from sarpy.io.complex.sicd import SICDReader
+from sarpy.io.complex.overview import build_overviews, get_default_levels, Overviews
+
+from . import unittest
+from .test_sicd import generate_sicd
+
+
+def block_reduce(data, level):
+    # brute force amplitude and complex mean over level x level blocks
+    rows, cols = (data.shape[0] + level - 1)//level, (data.shape[1] + level - 1)//level
+    amplitude = numpy.empty((rows, cols), dtype=numpy.float64)
+    mean = numpy.empty((rows, cols), dtype=numpy.complex128)
+    for i in range(rows):
+        for j in range(cols):
+            block = data[i*level:(i+1)*level, j*level:(j+1)*level]
+            amplitude[i, j] = numpy.sqrt(numpy.mean(numpy.abs(block)**2))
+            mean[i, j] = numpy.mean(block)
+    return amplitude, mean
+
+
+class TestOverviews(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.file_name = os.path.join(cls.directory, 'image.nitf')
+        cls.data = (numpy.random.randn(75, 61) + 1j*numpy.random.randn(75, 61)).astype(numpy.complex64)
+        generate_sicd(cls.file_name, cls.data)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_default_levels(self):
+        self.assertEqual(get_default_levels((100, 50)), (2, ))
+        self.assertEqual(get_default_levels((30000, 2100)), (2, 4, 8))
+
+    def test_build(self):
+        overview_file = os.path.join(self.directory, 'build.ovr')
+        reader = SICDReader(self.file_name)
+        # small blocks, so that the levels are assembled over several reads
+        build_overviews(reader, overview_file, levels=(2, 3, 4, 8), complex_data=True, max_bytes=1)
+        overviews = Overviews(overview_file)
+        self.assertEqual(len(overviews), 1)
+        self.assertEqual(overviews[0].levels, (2, 3, 4, 8))
+        for level in overviews[0].levels:
+            amplitude, mean = block_reduce(self.data, level)
+            with self.subTest(msg='level {}'.format(level)):
+                self.assertTrue(numpy.allclose(overviews[0].get_level(level), amplitude, rtol=1e-5))
+                self.assertTrue(numpy.allclose(
+                    overviews[0].get_level(level, complex_data=True), mean, rtol=1e-4, atol=1e-6))
+
+    def test_decimated_read(self):
+        overview_file = os.path.join(self.directory, 'read.ovr')
+        reader = SICDReader(self.file_name)
+        build_overviews(reader, overview_file, levels=(2, 4))
+        amplitude = {level: block_reduce(self.data, level)[0] for level in [2, 4]}
+
+        # full resolution reads are unaffected
+        self.assertTrue(numpy.all(reader[10:20, 5:30] == self.data[10:20, 5:30]))
+        self.assertTrue(numpy.all(reader[10:20:2, 5:30] == self.data[10:20:2, 5:30]))
+
+        data = reader[::4, ::4]
+        self.assertEqual(data.dtype, numpy.complex64)
+        self.assertTrue(numpy.allclose(data, amplitude[4], rtol=1e-5))
+        # the nearest level not exceeding the step is used
+        data = reader[70:3:-3, 1:60:5]
+        rows, cols = numpy.arange(70, 3, -3)//2, numpy.arange(1, 60, 5)//2
+        self.assertTrue(numpy.allclose(data, amplitude[2][numpy.ix_(rows, cols)], rtol=1e-5))
+
+        out = numpy.zeros((19, 16), dtype=numpy.complex64)
+        self.assertTrue(reader((0, 75, 4), (0, 61, 4), out=out) is out)
+        self.assertTrue(numpy.allclose(out, amplitude[4], rtol=1e-5))
+
+        reader.disable_overviews()
+        self.assertTrue(numpy.all(reader[::4, ::4] == self.data[::4, ::4]))
+
+    def test_serve_complex(self):
+        overview_file = os.path.join(self.directory, 'amplitude.ovr')
+        reader = SICDReader(self.file_name)
+        build_overviews(reader, overview_file, levels=2, attach=False)
+        self.assertTrue(numpy.all(reader[::2, ::2] == self.data[::2, ::2]))
+        with self.assertRaises(ValueError):
+            reader.enable_overviews(overview_file, serve_complex=True)
+
+        overview_file = os.path.join(self.directory, 'complex.ovr')
+        build_overviews(reader, overview_file, levels=2, complex_data=True)
+        mean = block_reduce(self.data, 2)[1]
+        self.assertTrue(numpy.allclose(reader[::2, ::2], mean, rtol=1e-4, atol=1e-6))
+
+    def test_source_file(self):
+        overview_file = os.path.join(self.directory, 'source.ovr')
+        reader = SICDReader(self.file_name)
+        build_overviews(reader, overview_file, levels=2, source_file=self.file_name)
+        self.assertFalse(os.path.exists('{}.{}.tmp'.format(overview_file, os.getpid())))
+        Overviews(overview_file, source_file=self.file_name)
+        reader.enable_overviews(overview_file, source_file=self.file_name)
+
+        # a modified source file makes the sidecar stale
+        stat = os.stat(self.file_name)
+        os.utime(self.file_name, (stat.st_atime, stat.st_mtime + 10))
+        try:
+            with self.assertRaises(IOError):
+                reader.enable_overviews(overview_file, source_file=self.file_name)
+        finally:
+            os.utime(self.file_name, (stat.st_atime, stat.st_mtime))
+        # a sidecar without a source record is not accepted when the source is checked
+        build_overviews(reader, overview_file, levels=2, attach=False)
+        with self.assertRaises(IOError):
+            Overviews(overview_file, source_file=self.file_name)
+
+    def test_invalid(self):
+        junk_file = os.path.join(self.directory, 'junk.ovr')
+        with open(junk_file, 'wb') as fi:
+            fi.write(b'junk'*10)
+        reader = SICDReader(self.file_name)
+        with self.assertRaises(IOError):
+            reader.enable_overviews(junk_file)
+        with self.assertRaises(ValueError):
+            build_overviews(reader, os.path.join(self.directory, 'invalid.ovr'), levels=(1, 2))
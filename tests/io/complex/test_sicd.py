@@ -1,11 +1,50 @@
 import os
+import pickle
+import shutil
+import tempfile
 import time
 import logging
 
+import numpy
+
 from . import unittest
 
-from sarpy.io.complex.sicd import SICDDetails, SICDReader
+try:
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+    ThreadPoolExecutor = None
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from sarpy.io.complex.sicd import SICDDetails, SICDReader, SICDWriter
 from sarpy.io.complex.converter import open_complex
+from sarpy.io.complex.sicd_elements.SICD import SICDType
+from sarpy.io.complex.sicd_elements.ImageData import ImageDataType, FullImageType
+from sarpy.io.complex.sicd_elements.GeoData import GeoDataType
+from sarpy.io.complex.sicd_elements.CollectionInfo import CollectionInfoType
+from sarpy.io.complex.sicd_elements.blocks import RowColType
+
+
+def generate_sicd(file_name, data, pixel_type='RE32F_IM32F', amp_table=None, core_name='TEST'):
+    """
+    Writes the complex data to a SICD file, with minimal metadata.
+    """
+
+    rows, cols = data.shape
+    sicd = SICDType(
+        CollectionInfo=CollectionInfoType(
+            CollectorName='TEST', CoreName=core_name, Classification='UNCLASSIFIED', CollectType='MONOSTATIC'),
+        ImageData=ImageDataType(
+            NumRows=rows, NumCols=cols, FirstRow=0, FirstCol=0, PixelType=pixel_type, AmpTable=amp_table,
+            FullImage=FullImageType(NumRows=rows, NumCols=cols), SCPPixel=RowColType(Row=rows//2, Col=cols//2)),
+        GeoData=GeoDataType(ImageCorners=[[0, 0], [0, 1], [1, 1], [1, 0]]))
+    with SICDWriter(file_name, sicd) as writer:
+        writer(data, (0, 0))
+    return sicd
 
 
 def generic_sicd_check(instance, test_file):
@@ -91,3 +130,198 @@ class TestSICDReader(unittest.TestCase):
                 logging.info('No file {} found'.format(test_file))
 
         self.assertTrue(tested > 0, msg="No files for testing found")
+
+
+class TestLazySICD(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.file_name = os.path.join(cls.directory, 'lazy.nitf')
+        cls.data = (numpy.random.randn(31, 23) + 1j*numpy.random.randn(31, 23)).astype(numpy.complex64)
+        generate_sicd(cls.file_name, cls.data)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_details(self):
+        details = SICDDetails(self.file_name, lazy=True)
+        self.assertTrue(details.is_sicd)
+        self.assertFalse(details.is_sicd_parsed)
+
+        partial = details.parse_sicd_branches(['ImageData', 'GeoData'])
+        self.assertEqual(partial.ImageData.NumRows, 31)
+        self.assertIsNotNone(partial.GeoData)
+        self.assertIsNone(partial.CollectionInfo)
+        self.assertFalse(details.is_sicd_parsed)
+        with self.assertRaises(ValueError):
+            details.parse_sicd_branches('NotABranch')
+
+        eager = SICDDetails(self.file_name)
+        self.assertTrue(eager.is_sicd_parsed)
+        self.assertEqual(details.sicd_meta.to_xml_string(), eager.sicd_meta.to_xml_string())
+        self.assertTrue(details.is_sicd_parsed)
+
+    def test_reader(self):
+        reader = SICDReader(self.file_name, lazy=True)
+        self.assertFalse(reader._nitf_details.is_sicd_parsed)
+        self.assertTrue(numpy.all(reader[:, :] == self.data))
+        self.assertEqual(reader.data_size, (31, 23))
+        self.assertFalse(reader._nitf_details.is_sicd_parsed)
+        self.assertEqual(reader.sicd_meta.CollectionInfo.CollectorName, 'TEST')
+        self.assertTrue(reader._nitf_details.is_sicd_parsed)
+
+    def test_trusted(self):
+        with mock.patch.object(SICDType, 'is_valid', return_value=True) as is_valid:
+            reader = SICDReader(self.file_name, trusted=True)
+            is_valid.assert_not_called()
+            SICDReader(self.file_name)
+            is_valid.assert_called_once_with(recursive=True)
+        eager = SICDDetails(self.file_name)
+        self.assertEqual(reader.sicd_meta.to_xml_string(), eager.sicd_meta.to_xml_string())
+        self.assertTrue(numpy.all(reader[:, :] == self.data))
+
+
+class TestRawSICD(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.file_name = os.path.join(cls.directory, 'int16.nitf')
+        shape = (43, 29)
+        cls.data = (numpy.random.randint(-2**15, 2**15, size=shape) +
+                    1j*numpy.random.randint(-2**15, 2**15, size=shape)).astype(numpy.complex64)
+        generate_sicd(cls.file_name, cls.data, pixel_type='RE16I_IM16I')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_raw(self):
+        reader = SICDReader(self.file_name)
+        data = reader.read_chip((3, 40, 2), (25, 1, -3), raw=True)
+        expected = self.data[3:40:2, 25:1:-3]
+        self.assertEqual(data.dtype, numpy.dtype('int16'))
+        self.assertEqual(data.shape, expected.shape + (2, ))
+        self.assertTrue(numpy.all(data[:, :, 0] == expected.real) and numpy.all(data[:, :, 1] == expected.imag))
+        self.assertTrue(numpy.all(reader.raw_to_complex(data) == expected))
+        blocks = list(reader.iter_blocks(block_shape=(10, None), raw=True, prefetch=0))
+        self.assertTrue(numpy.all(numpy.concatenate([entry[2] for entry in blocks]) == reader(None, None, raw=True)))
+
+
+def _read_pickled_chip(reader, range1, range2):
+    # NB: module level, so that this may be used in a process pool
+    return reader(range1, range2)
+
+
+class TestPickleSICD(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.file_name = os.path.join(cls.directory, 'pickled.nitf')
+        cls.data = (numpy.random.randn(67, 45) + 1j*numpy.random.randn(67, 45)).astype(numpy.complex64)
+        generate_sicd(cls.file_name, cls.data)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_pickle(self):
+        for lazy in [False, True]:
+            reader = SICDReader(self.file_name, lazy=lazy)
+            reader.enable_tile_cache(tile_shape=(16, 16))
+            self.assertTrue(numpy.all(reader[:, :] == self.data))
+            pickled = pickle.dumps(reader)
+            # the memory mapped data is not pickled
+            self.assertTrue(len(pickled) < self.data.nbytes)
+            unpickled = pickle.loads(pickled)
+            with self.subTest(msg='lazy={}'.format(lazy)):
+                self.assertTrue(unpickled._chipper._child_chippers[0]._memory_map is None)
+                self.assertTrue(numpy.all(unpickled[3:60:2, 40:1:-3] == self.data[3:60:2, 40:1:-3]))
+                self.assertEqual(unpickled.sicd_meta.to_xml_string(), reader.sicd_meta.to_xml_string())
+
+    def test_process_pool(self):
+        if ProcessPoolExecutor is None:
+            raise unittest.SkipTest('concurrent.futures is not available')
+        reader = SICDReader(self.file_name)
+        ranges = [((start, start + 16, 1), (0, 45, 1)) for start in range(0, 64, 16)]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(
+                _read_pickled_chip, [reader, ]*len(ranges), [entry[0] for entry in ranges],
+                [entry[1] for entry in ranges]))
+        for (range1, _), result in zip(ranges, results):
+            self.assertTrue(numpy.all(result == self.data[range1[0]:range1[1], :]))
+
+
+class TestParallelSICDWriter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        shape = (123, 47)
+        cls.data = (numpy.random.randint(-2**10, 2**10, size=shape) +
+                    1j*numpy.random.randint(-2**10, 2**10, size=shape)).astype(numpy.complex64)
+        cls.sicd = generate_sicd(os.path.join(cls.directory, 'template.nitf'), cls.data)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def get_writer(self, name, pixel_type='RE32F_IM32F', **kwargs):
+        sicd = self.sicd.copy()
+        sicd.ImageData.PixelType = pixel_type
+        # small image segments, so that blocks span several segments
+        with mock.patch('sarpy.io.complex.sicd._IM_SEG_LIMIT', 50*47*4):
+            writer = SICDWriter(os.path.join(self.directory, name), sicd, **kwargs)
+        self.assertTrue(writer._image_segment_limits.shape[0] > 2)
+        return writer
+
+    def check_written(self, writer, file_name):
+        self.assertTrue(numpy.all(writer._pixels_written*writer._pixel_size == writer._image_segment_limits[:, 4]))
+        writer.close()
+        reader = SICDReader(file_name)
+        self.assertTrue(numpy.all(reader[:, :] == self.data))
+
+    def test_segments(self):
+        for pixel_type in ['RE32F_IM32F', 'RE16I_IM16I']:
+            for max_workers in [None, 4]:
+                name = 'segments_{}_{}.nitf'.format(pixel_type, max_workers)
+                writer = self.get_writer(name, pixel_type=pixel_type, max_workers=max_workers)
+                with self.subTest(msg='pixel_type={}, max_workers={}'.format(pixel_type, max_workers)):
+                    # the blocks each span image segment boundaries
+                    writer(self.data[:70, :20], (0, 0))
+                    writer(self.data[:70, 20:], (0, 20))
+                    writer(self.data[70:, :], (70, 0), max_workers=3)
+                    self.check_written(writer, writer._file_name)
+
+    def test_pwrite_engine(self):
+        writer = self.get_writer(
+            'pwrite.nitf', max_workers=3, engine='pwrite', engine_options={'max_in_flight': 2**10, 'sync_bytes': 2**12})
+        writer(self.data[:70, :], (0, 0))
+        writer(self.data[70:, :], (70, 0))
+        self.assertTrue(all(entry._output.sync_count > 0 for entry in writer._writing_chippers))
+        self.check_written(writer, writer._file_name)
+
+    def test_resume(self):
+        writer = self.get_writer('resume.nitf', resume=True)
+        writer(self.data[:70, :], (0, 0))
+        writer.flush()
+        del writer
+
+        # the existing headers are validated and retained, and writing continues
+        writer = self.get_writer('resume.nitf', resume=True)
+        writer.prepare_for_writing()
+        writer.mark_written((0, 0), (70, 47))
+        writer(self.data[70:, :], (70, 0))
+        self.check_written(writer, writer._file_name)
+
+    def test_producer_threads(self):
+        writer = self.get_writer('producers.nitf', max_workers=2)
+        blocks = [(start, min(start + 9, 123)) for start in range(0, 123, 9)]
+        numpy.random.shuffle(blocks)
+
+        def write_block(start, stop):
+            writer(self.data[start:stop, :], (start, 0))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for future in [executor.submit(write_block, *block) for block in blocks]:
+                future.result()
+        self.check_written(writer, writer._file_name)
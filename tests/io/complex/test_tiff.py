@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import zlib
+
+import numpy
+
+from sarpy.io.complex.tiff import TiffDetails, TiffReader, NativeTiffChipper, BlockTiffChipper
+
+from . import unittest
+
+
+def generate_tiff(file_name, data, block_shape=None, tiled=False, compress=False, predictor=1, reverse=False):
+    """
+    Writes complex int16 data (sample format 5) to a little endian tiff, stored
+    in strips or tiles, which may be deflate compressed.
+    """
+
+    raw = numpy.empty(data.shape + (2, ), dtype='<i2')
+    raw[:, :, 0] = data.real
+    raw[:, :, 1] = data.imag
+    rows, cols = data.shape
+    if block_shape is None:
+        block_shape = (rows, cols)
+    if not tiled:
+        block_shape = (block_shape[0], cols)
+    grid = (int(numpy.ceil(rows/float(block_shape[0]))), int(numpy.ceil(cols/float(block_shape[1]))))
+
+    blocks = []
+    for i in range(grid[0]):
+        for j in range(grid[1]):
+            block = raw[i*block_shape[0]:(i+1)*block_shape[0], j*block_shape[1]:(j+1)*block_shape[1]]
+            if tiled:
+                padded = numpy.zeros(block_shape + (2, ), dtype='<i2')
+                padded[:block.shape[0], :block.shape[1]] = block
+                block = padded
+            if predictor == 2:
+                block = numpy.array(block)
+                block[:, 1:] = numpy.diff(block, axis=1)
+            block = block.tobytes()
+            blocks.append(zlib.compress(block) if compress else block)
+
+    order = list(range(len(blocks)))
+    if reverse:
+        order = order[::-1]
+    offsets = [0]*len(blocks)
+    with open(file_name, 'wb') as fi:
+        fi.write(b'II' + struct.pack('<HI', 42, 0))
+        for index in order:
+            offsets[index] = fi.tell()
+            fi.write(blocks[index])
+        counts = [len(entry) for entry in blocks]
+
+        tags = [
+            (256, 4, [cols, ]), (257, 4, [rows, ]), (258, 3, [32, ]), (259, 3, [8 if compress else 1, ]),
+            (277, 3, [1, ]), (284, 3, [1, ]), (317, 3, [predictor, ]), (339, 3, [5, ])]
+        if tiled:
+            tags.extend([(322, 4, [block_shape[1], ]), (323, 4, [block_shape[0], ]),
+                         (324, 4, offsets), (325, 4, counts)])
+        else:
+            tags.extend([(273, 4, offsets), (278, 4, [block_shape[0], ]), (279, 4, counts)])
+        tags = sorted(tags)
+        # write any arrays which do not fit in the entry itself
+        locations = {}
+        for tag, tag_type, values in tags:
+            if len(values) > 1:
+                locations[tag] = fi.tell()
+                fi.write(struct.pack('<{}I'.format(len(values)), *values))
+        ifd_offset = fi.tell()
+        fi.write(struct.pack('<H', len(tags)))
+        for tag, tag_type, values in tags:
+            if tag in locations:
+                fi.write(struct.pack('<HHII', tag, tag_type, len(values), locations[tag]))
+            elif tag_type == 3:
+                fi.write(struct.pack('<HHIHH', tag, tag_type, 1, values[0], 0))
+            else:
+                fi.write(struct.pack('<HHII', tag, tag_type, 1, values[0]))
+        fi.write(struct.pack('<I', 0))
+        fi.seek(4)
+        fi.write(struct.pack('<I', ifd_offset))
+
+
+class TestBlockTiffChipper(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        shape = (53, 41)
+        cls.data = (numpy.random.randint(-2**15, 2**15, size=shape) +
+                    1j*numpy.random.randint(-2**15, 2**15, size=shape)).astype(numpy.complex64)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def check_reads(self, chipper, msg):
+        with self.subTest(msg=msg):
+            self.assertTrue(numpy.all(chipper[:, :] == self.data))
+            self.assertTrue(numpy.all(chipper[3:50:4, 40:2:-5] == self.data[3:50:4, 40:2:-5]))
+            self.assertTrue(numpy.all(chipper[50:1:-20, 1:39:17] == self.data[50:1:-20, 1:39:17]))
+            self.assertTrue(numpy.all(chipper[17:19, 5:6] == self.data[17:19, 5:6]))
+
+    def test_contiguous(self):
+        file_name = os.path.join(self.directory, 'contiguous.tiff')
+        generate_tiff(file_name, self.data, block_shape=(8, 0))
+        reader = TiffReader(file_name)
+        self.assertIsInstance(reader._chipper, NativeTiffChipper)
+        self.check_reads(reader._chipper, 'contiguous strips')
+
+    def test_strips(self):
+        file_name = os.path.join(self.directory, 'strips.tiff')
+        generate_tiff(file_name, self.data, block_shape=(8, 0), reverse=True)
+        reader = TiffReader(file_name)
+        self.assertIsInstance(reader._chipper, BlockTiffChipper)
+        self.check_reads(reader._chipper, 'out of order strips')
+
+    def test_deflate(self):
+        for predictor in [1, 2]:
+            for tiled in [False, True]:
+                file_name = os.path.join(self.directory, 'deflate_{}_{}.tiff'.format(predictor, tiled))
+                generate_tiff(file_name, self.data, block_shape=(16, 16), tiled=tiled, compress=True,
+                              predictor=predictor)
+                for max_workers in [None, 3]:
+                    chipper = BlockTiffChipper(
+                        TiffDetails(file_name), symmetry=(False, False, False), max_workers=max_workers)
+                    self.check_reads(
+                        chipper, 'deflate, predictor={}, tiled={}, max_workers={}'.format(
+                            predictor, tiled, max_workers))
+
+    def test_symmetry(self):
+        file_name = os.path.join(self.directory, 'tiles.tiff')
+        generate_tiff(file_name, self.data, block_shape=(16, 16), tiled=True)
+        chipper = BlockTiffChipper(file_name, symmetry=(True, False, True))
+        expected = self.data.T[::-1, :]
+        self.assertTrue(numpy.all(chipper[:, :] == expected))
+        self.assertTrue(numpy.all(chipper[3:40:4, 50:2:-5] == expected[3:40:4, 50:2:-5]))
+
+    def test_pickle(self):
+        file_name = os.path.join(self.directory, 'pickled.tiff')
+        generate_tiff(file_name, self.data, block_shape=(16, 16), tiled=True, compress=True)
+        chipper = BlockTiffChipper(file_name, symmetry=(False, False, False), max_workers=2)
+        unpickled = pickle.loads(pickle.dumps(chipper))
+        self.assertIsNone(unpickled._fid)
+        self.check_reads(unpickled, 'unpickled')
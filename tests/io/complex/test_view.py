@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import shutil
+import tempfile
+
+import numpy
+
+from sarpy.io.complex.base import BaseReader
+from sarpy.io.complex.bip import BIPChipper
+from sarpy.io.complex.view import ImageView
+
+from . import unittest
+from .test_chippers import generate_segmented_file
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class TestImageView(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        shape = (47, 31)
+        cls.data = (numpy.random.randn(*shape) + 1j*numpy.random.randn(*shape)).astype(numpy.complex64)
+        file_name, _, offsets = generate_segmented_file(cls.directory, cls.data, [shape[0], ])
+        cls.reader = BaseReader(
+            None, BIPChipper(file_name, '>f4', shape, complex_type=True, data_offset=int(offsets[0])))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_lazy(self):
+        with mock.patch.object(BaseReader, 'read_chip', autospec=True) as read_chip:
+            view = ImageView(self.reader).crop((5, 40), (3, 30)).flip(1).transpose().decimate(2, 3).magnitude()
+            self.assertEqual(view.shape, (14, 12))
+            self.assertEqual(view.dtype, numpy.float32)
+            read_chip.assert_not_called()
+
+    def test_composition(self):
+        view = ImageView(self.reader)
+        self.assertTrue(numpy.all(numpy.asarray(view) == self.data))
+        cases = [
+            ('crop', view.crop((5, 40), (None, 20)), self.data[5:40, :20]),
+            ('flip', view.flip(0).flip(1), self.data[::-1, ::-1]),
+            ('transpose', view.T, self.data.T),
+            ('decimate', view.decimate(3, 2), self.data[::3, ::2]),
+            ('combined', view.crop((2, 45), (1, 30)).flip(0).decimate(4).transpose().flip(0),
+             self.data[2:45, 1:30][::-1][::4, ::4].T[::-1]),
+        ]
+        items = [
+            (slice(None), slice(None)), (slice(1, 6), slice(None, None, -2)), (3, slice(2, 5)),
+            (slice(None, None, -1), -1), (slice(4, 4), slice(None))]
+        for name, the_view, expected in cases:
+            with self.subTest(msg=name):
+                self.assertEqual(the_view.shape, expected.shape)
+                self.assertTrue(numpy.all(numpy.asarray(the_view) == expected))
+                for item in items:
+                    self.assertTrue(numpy.array_equal(the_view[item], expected[item]))
+        with self.assertRaises(IndexError):
+            _ = view[47, 0]
+
+    def test_transforms(self):
+        view = ImageView(self.reader).crop((10, 20), (10, 20))
+        expected = self.data[10:20, 10:20]
+        self.assertTrue(numpy.allclose(view.magnitude()[:, :], numpy.abs(expected)))
+        self.assertTrue(numpy.allclose(view.scale(2.5).magnitude()[:, :], 2.5*numpy.abs(expected)))
+        self.assertTrue(numpy.allclose(view.apply(numpy.angle).flip(0)[:, :], numpy.angle(expected[::-1])))
+        with self.assertRaises(TypeError):
+            view.apply('junk')
+
+    def test_iter_chunks(self):
+        view = ImageView(self.reader).flip(1).decimate(1, 2).magnitude()
+        expected = numpy.abs(self.data[:, ::-2])
+        covered = numpy.zeros(view.shape, dtype=numpy.int64)
+        for row_slice, col_slice, data in view.iter_chunks(chunk_shape=(10, 7)):
+            self.assertTrue(numpy.allclose(data, expected[row_slice, col_slice]))
+            covered[row_slice, col_slice] += 1
+        self.assertTrue(numpy.all(covered == 1))
+        chunks = list(view.iter_chunks(max_bytes=8*16*10))
+        self.assertEqual(len(chunks), 5)
@@ -0,0 +1,56 @@
+"""
+Script for converting many complex data products to SICD (or SIO) format, using
+a pool of processes, and writing a json summary of the results
+"""
+
+import argparse
+import logging
+
+from sarpy.io.complex.batch import get_jobs, load_manifest, batch_conversion
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Batch convert to SICD format.",
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument(
+        'output_directory', metavar='output_directory',
+        help='Path to the output directory, for any job which does not specify one.\n'
+             'This directory MUST exist.')
+    parser.add_argument(
+        'inputs', metavar='input', nargs='*',
+        help='Input files or directories, or glob patterns for these (quoted, to\n'
+             'prevent expansion by the shell).')
+    parser.add_argument(
+        '-m', '--manifest', default=None,
+        help='A job manifest. This is a json list of input file names or job objects\n'
+             'with keys "input_file", and optionally "output_directory", "frames" and\n'
+             '"output_format", or a text file with one input file name per line.')
+    parser.add_argument(
+        '-f', '--format', default='SICD', choices=['SICD', 'SIO', 'ARCHIVE'], help='The output format.')
+    parser.add_argument(
+        '-w', '--workers', type=int, default=None,
+        help='The number of worker processes. The default is the number of cpus.')
+    parser.add_argument(
+        '--memory-limit', type=int, default=None,
+        help='The memory limit for each worker process, in MB.')
+    parser.add_argument(
+        '-t', '--transcode', action='store_true',
+        help='Copy the raw data of SICD and SIO inputs directly, without decoding,\n'
+             'for SICD or SIO output.')
+    parser.add_argument(
+        '-s', '--summary', default=None, help='The file to which the json summary is written.')
+    parser.add_argument(
+        '-v', '--verbose', action='store_true', help='Log progress information.')
+
+    args = parser.parse_args()
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+    jobs = [] if args.manifest is None else load_manifest(
+        args.manifest, output_directory=args.output_directory, output_format=args.format)
+    jobs.extend(get_jobs(args.output_directory, patterns=args.inputs, output_format=args.format))
+    memory_limit = None if args.memory_limit is None else args.memory_limit*2**20
+    summary = batch_conversion(
+        jobs, max_workers=args.workers, memory_limit=memory_limit, summary_file=args.summary,
+        transcode=args.transcode)
+    print('{jobs} jobs: {converted} converted, {skipped} skipped, {failed} failed in {elapsed:.1f} s'.format(
+        jobs=summary['jobs'], elapsed=summary['elapsed'], **summary['counts']))
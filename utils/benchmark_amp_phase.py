@@ -0,0 +1,65 @@
+"""
+Script for benchmarking the AMP8I_PHS8I conversion of sarpy.io.complex.amp_phase
+against the previous per-pixel trigonometric decode and digitize based encode
+"""
+
+import argparse
+import time
+
+import numpy
+from sarpy.io.complex.amp_phase import AmpPhaseCodec
+
+
+def legacy_decode(lookup_table, data):
+    # the previous approach, evaluating cos and sin for each pixel
+    out = numpy.zeros(data.shape[:2] + (data.shape[2]//2, ), dtype=numpy.complex64)
+    amp = lookup_table[data[:, :, 0::2]]
+    theta = data[:, :, 1::2]*(2*numpy.pi/256)
+    out.real = amp*numpy.cos(theta)
+    out.imag = amp*numpy.sin(theta)
+    return out
+
+
+def legacy_encode(lookup_table, data):
+    # the previous approach, using digitize on the whole image
+    out = numpy.zeros(data.shape + (2, ), dtype=numpy.uint8)
+    out[:, :, 0] = numpy.digitize(numpy.abs(data).ravel(), lookup_table, right=False).reshape(data.shape)
+    out[:, :, 1] = numpy.arctan2(data.imag, data.real)*(256/(2*numpy.pi))
+    return out
+
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark(rows, cols, repeat):
+    lookup_table = numpy.linspace(0, 100, 256)**2
+    codec = AmpPhaseCodec(lookup_table)
+    codes = numpy.random.randint(0, 256, size=(rows, cols, 2)).astype(numpy.uint8)
+    data = codec.decode(codes)[:, :, 0]
+    out = numpy.empty((rows, cols, 1), dtype=numpy.complex64)
+    megapixels = rows*cols*1e-6
+
+    results = [
+        ('decode (legacy)', best_time(lambda: legacy_decode(lookup_table, codes), repeat)),
+        ('decode', best_time(lambda: codec.decode(codes), repeat)),
+        ('decode (into out)', best_time(lambda: codec.decode(codes, out=out), repeat)),
+        ('encode (legacy)', best_time(lambda: legacy_encode(lookup_table, data), repeat)),
+        ('encode', best_time(lambda: codec.encode(data), repeat))]
+    for name, elapsed in results:
+        print('{0:20s} {1:8.4f} s  {2:8.1f} Mpixel/s'.format(name, elapsed, megapixels/elapsed))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark AMP8I_PHS8I conversion.")
+    parser.add_argument('--rows', type=int, default=4096, help='The number of rows.')
+    parser.add_argument('--cols', type=int, default=4096, help='The number of columns.')
+    parser.add_argument('--repeat', type=int, default=3, help='The number of repetitions.')
+
+    args = parser.parse_args()
+    benchmark(args.rows, args.cols, args.repeat)
@@ -6,8 +6,8 @@ import argparse
 from sarpy.io.complex.converter import conversion_utility
 
 
-def convert(input_file, output_dir):
-    conversion_utility(input_file, output_dir)
+def convert(input_file, output_dir, resume=False):
+    conversion_utility(input_file, output_dir, resume=resume)
 
 
 if __name__ == '__main__':
@@ -26,6 +26,10 @@ if __name__ == '__main__':
              '* Depending on the input details, multiple SICD files may be produced.\n'
              '* The name for the ouput file(s) will be chosen based on CoreName and\n '
              '  transmit/collect polarization.\n')
+    parser.add_argument(
+        '-r', '--resume', action='store_true',
+        help='Record progress in a journal next to each output file, and continue\n'
+             'any interrupted conversion to the same output file.')
 
     args = parser.parse_args()
-    convert(args.input_file, args.output_directory)
+    convert(args.input_file, args.output_directory, resume=args.resume)